@@ -3,6 +3,7 @@ from __future__ import annotations
 import concurrent.futures
 import json
 import os
+import time
 from pathlib import Path
 from typing import Dict, List, Tuple
 
@@ -11,8 +12,8 @@ from tqdm import tqdm
 from unity_docs_mcp.bake.chunker import chunk_text_md
 from unity_docs_mcp.bake.extract_manual import extract_manual
 from unity_docs_mcp.bake.extract_scriptref import extract_scriptref
-from unity_docs_mcp.bake.html_to_md import HtmlToTextOptions
-from unity_docs_mcp.bake.link_graph import build_link_edges, doc_id_from_relpath, resolve_internal_link
+from unity_docs_mcp.bake.html_to_md import HtmlToTextOptions, index_text
+from unity_docs_mcp.bake.link_graph import LinkGraph, build_link_edges, doc_id_from_relpath, resolve_internal_link
 from unity_docs_mcp.config import Config, config_signature, load_config
 from unity_docs_mcp.paths import make_paths
 from unity_docs_mcp.setup.detect_version import detect_version_info
@@ -84,6 +85,7 @@ def _process_page(
             "title": chunk.title,
             "heading_path": chunk.heading_path,
             "text": chunk.text,
+            "index_text": index_text(chunk.text),
             "char_start": chunk.char_start,
             "char_end": chunk.char_end,
             "origin_path": chunk.origin_path,
@@ -150,6 +152,7 @@ def bake(config: Config) -> Dict[str, int]:
     corpus_path = baked_dir / "corpus.jsonl"
     chunks_path = baked_dir / "chunks.jsonl"
     link_graph_path = baked_dir / "link_graph.jsonl"
+    link_csr_path = baked_dir / "link_graph.npz"
     manifest_path = baked_dir / "manifest.json"
 
     with corpus_path.open("w", encoding="utf-8") as f_corpus, chunks_path.open(
@@ -162,10 +165,29 @@ def bake(config: Config) -> Dict[str, int]:
             f_chunks.write(json.dumps(chunk, ensure_ascii=False) + "\n")
         total_chunks = len(chunks_accum)
 
+    display_chars = sum(len(chunk["text"]) for chunk in chunks_accum)
+    index_chars = sum(len(chunk["index_text"]) for chunk in chunks_accum)
+
     edges = build_link_edges(pages)
     with link_graph_path.open("w", encoding="utf-8") as f_links:
         for edge in edges:
             f_links.write(json.dumps(edge, ensure_ascii=False) + "\n")
+    # Integer-id CSR copy of the same edges, so the server does not rebuild adjacency lists on start.
+    link_graph = LinkGraph.from_edges(
+        [page["doc_id"] for page in pages], ((edge["from_doc_id"], edge["to_doc_id"]) for edge in edges)
+    )
+    pagerank_start = time.perf_counter()
+    link_graph.pagerank, pagerank_iterations = link_graph.compute_pagerank(damping=config.bake.pagerank_damping)
+    pagerank_stats = {
+        "damping": config.bake.pagerank_damping,
+        "iterations": pagerank_iterations,
+        "ms": round((time.perf_counter() - pagerank_start) * 1000.0, 3),
+    }
+    link_graph_stats = {
+        **link_graph.stats(),
+        "pagerank": pagerank_stats,
+        "file_bytes": link_graph.save(link_csr_path),
+    }
 
     version_info = detect_version_info(paths.raw_unzipped)
     manifest = {
@@ -174,6 +196,13 @@ def bake(config: Config) -> Dict[str, int]:
         "built_on": version_info.get("built_on"),
         "pages": len(pages),
         "chunks": total_chunks,
+        # Chunk text served by ``open``/snippets vs the projection fed to FTS and embeddings.
+        "index_text": {
+            "display_chars": display_chars,
+            "index_chars": index_chars,
+            "reduction": round(1.0 - index_chars / display_chars, 4) if display_chars else 0.0,
+        },
+        "link_graph": link_graph_stats,
         "config_signature": config_signature(config),
     }
     with manifest_path.open("w", encoding="utf-8") as f_manifest:
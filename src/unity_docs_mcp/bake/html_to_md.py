@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import html
+import re
 import textwrap
 from dataclasses import dataclass
 from typing import Iterable, Optional
@@ -14,6 +15,18 @@ class HtmlToTextOptions:
     include_figure_captions: bool = True
 
 
+# ``text (href)`` as rendered for anchors: URLs, fragments, relative paths and *.html targets.
+_HREF_RE = re.compile(
+    r"\s\((?:[a-z][a-z0-9+.-]*:|#|\.{1,2}/|/)[^\s()]*\)"
+    r"|\s\([^\s()]+\.html?(?:#[^\s()]*)?\)",
+    re.IGNORECASE,
+)
+_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_FENCE_RE = re.compile(r"^```[\w+#.-]*$")
+_TABLE_RULE_RE = re.compile(r"^\|(?:\s*:?-{3,}:?\s*\|)+$")
+_LINE_MARKUP_RE = re.compile(r"^(?:#{1,6}\s+|[-*]\s+|\d+\.\s+)")
+
+
 def normalize_text(text: str) -> str:
     return " ".join(text.split())
 
@@ -122,3 +135,33 @@ def element_to_md(node, depth: int = 0, options: Optional[HtmlToTextOptions] = N
     # Generic container: render children
     rendered_children = [element_to_md(child, depth=depth, options=opts) for child in node.children]
     return " ".join([child for child in rendered_children if child])
+
+
+def index_text(text_md: str) -> str:
+    """
+    Lean projection of rendered markdown for FTS and embeddings: drops link
+    targets, image syntax, fence and table-rule lines, table pipes, heading
+    and list markers and inline backticks. Code inside fences is kept as is.
+    """
+    lines = []
+    in_fence = False
+    for line in (text_md or "").splitlines():
+        stripped = line.strip()
+        if _FENCE_RE.match(stripped):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            if stripped:
+                lines.append(stripped)
+            continue
+        if _TABLE_RULE_RE.match(stripped):
+            continue
+        if stripped.startswith("|") and stripped.endswith("|"):
+            stripped = stripped.strip("|").replace("|", " ")
+        stripped = _IMAGE_RE.sub(r"\1", stripped)
+        stripped = _HREF_RE.sub("", stripped)
+        stripped = _LINE_MARKUP_RE.sub("", stripped).replace("`", "")
+        stripped = normalize_text(stripped)
+        if stripped:
+            lines.append(stripped)
+    return "\n".join(lines)
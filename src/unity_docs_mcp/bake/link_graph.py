@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import hashlib
 import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 def doc_id_from_relpath(rel_path: str) -> str:
@@ -54,3 +57,200 @@ def build_link_edges(pages: List[Dict]) -> List[Dict[str, str]]:
                     }
                 )
     return edges
+
+
+def corpus_digest(doc_ids: Sequence[str]) -> str:
+    """Fingerprint of the corpus order that integer doc ids refer to."""
+    return hashlib.sha1("\n".join(doc_ids).encode("utf-8")).hexdigest()[:16]
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, weights: np.ndarray, first: np.ndarray, n_nodes: int):
+    # Rows in node order; within a row, targets in the order their first link appeared.
+    order = np.lexsort((first, rows))
+    indptr = np.zeros(n_nodes + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32), weights[order].astype(np.int32)
+
+
+def _gather(indptr: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Concatenated ``indptr[r]:indptr[r + 1]`` ranges for ``rows``, without a Python loop."""
+    starts = indptr[rows].astype(np.int64)
+    lengths = indptr[rows + 1] - starts
+    ends = np.cumsum(lengths)
+    return np.repeat(starts - ends + lengths, lengths) + np.arange(int(ends[-1]) if len(ends) else 0)
+
+
+class LinkGraph:
+    """
+    Doc-to-doc hyperlinks as CSR arrays over integer doc ids (corpus
+    positions). ``out_indptr[i]:out_indptr[i + 1]`` slices the docs page
+    ``i`` links to, in first-link order, with ``out_weights`` counting
+    repeated links; the ``in_*`` arrays hold the same edges reversed.
+    Links to docs outside the corpus are dropped. ``pagerank`` holds one
+    centrality score per doc once computed (bake stores it with the arrays).
+    """
+
+    _ARRAYS = ("out_indptr", "out_indices", "out_weights", "in_indptr", "in_indices", "in_weights")
+
+    def __init__(
+        self,
+        arrays: Dict[str, np.ndarray],
+        digest: str = "",
+        dangling: int = 0,
+        pagerank: Optional[np.ndarray] = None,
+    ):
+        for name in self._ARRAYS:
+            setattr(self, name, np.asarray(arrays[name], dtype=np.int32))
+        self.digest = digest
+        self.dangling = int(dangling)
+        self.pagerank = None if pagerank is None else np.asarray(pagerank, dtype=np.float32)
+
+    @classmethod
+    def from_edges(cls, doc_ids: Sequence[str], edges: Iterable[Tuple[str, str]]) -> "LinkGraph":
+        position = {doc_id: pos for pos, doc_id in enumerate(doc_ids)}
+        src: List[int] = []
+        dst: List[int] = []
+        dangling = 0
+        for from_doc_id, to_doc_id in edges:
+            i, j = position.get(from_doc_id), position.get(to_doc_id)
+            if i is None or j is None:
+                dangling += 1
+                continue
+            src.append(i)
+            dst.append(j)
+        n_nodes = len(position)
+        keys = np.asarray(src, dtype=np.int64) * n_nodes + np.asarray(dst, dtype=np.int64)
+        pairs, first, counts = np.unique(keys, return_index=True, return_counts=True)
+        rows, cols = (pairs // n_nodes, pairs % n_nodes) if n_nodes else (pairs, pairs)
+        arrays: Dict[str, np.ndarray] = {}
+        arrays["out_indptr"], arrays["out_indices"], arrays["out_weights"] = _csr(rows, cols, counts, first, n_nodes)
+        arrays["in_indptr"], arrays["in_indices"], arrays["in_weights"] = _csr(cols, rows, counts, first, n_nodes)
+        return cls(arrays, digest=corpus_digest(doc_ids), dangling=dangling)
+
+    @classmethod
+    def load(cls, path: Path) -> "LinkGraph":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                {name: data[name] for name in cls._ARRAYS},
+                digest=str(data["digest"]),
+                dangling=int(data["dangling"]),
+                pagerank=data["pagerank"] if "pagerank" in data.files else None,
+            )
+
+    def save(self, path: Path) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self._ARRAYS}
+        if self.pagerank is not None:
+            arrays["pagerank"] = self.pagerank
+        with path.open("wb") as f:
+            np.savez(f, digest=np.asarray(self.digest), dangling=np.asarray(self.dangling), **arrays)
+        return path.stat().st_size
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.out_indptr) - 1
+
+    def in_degree(self) -> np.ndarray:
+        """Number of distinct docs linking to each doc."""
+        return np.diff(self.in_indptr)
+
+    def compute_pagerank(self, damping: float = 0.85, tol: float = 1e-6, max_iter: int = 100) -> Tuple[np.ndarray, int]:
+        """
+        PageRank by power iteration over the forward arrays, following
+        repeated links in proportion to their weight. Rank held by docs
+        without outgoing links is spread uniformly. Returns the scores (they
+        sum to 1) and the number of iterations run.
+        """
+        n_nodes = self.n_nodes
+        if not n_nodes:
+            return np.zeros(0, dtype=np.float32), 0
+        sources = np.repeat(np.arange(n_nodes), np.diff(self.out_indptr))
+        out_weight = np.bincount(sources, weights=self.out_weights, minlength=n_nodes)
+        edge_share = self.out_weights / np.maximum(out_weight[sources], 1.0)
+        sinks = out_weight == 0
+        rank = np.full(n_nodes, 1.0 / n_nodes)
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            spread = np.bincount(self.out_indices, weights=rank[sources] * edge_share, minlength=n_nodes)
+            updated = (1.0 - damping) / n_nodes + damping * (spread + rank[sinks].sum() / n_nodes)
+            delta = float(np.abs(updated - rank).sum())
+            rank = updated
+            if delta < tol:
+                break
+        return rank.astype(np.float32), iterations
+
+    def pagerank_prior(self) -> np.ndarray:
+        """
+        PageRank rescaled to [0, 1] on a log scale: docs at or below the
+        uniform score ``1 / n`` get 0 and the most central doc gets 1.
+        """
+        if self.pagerank is None or not self.n_nodes:
+            return np.zeros(self.n_nodes, dtype=np.float32)
+        relative = self.pagerank.astype(np.float64) * self.n_nodes
+        top = float(relative.max())
+        if top <= 1.0:
+            return np.zeros(self.n_nodes, dtype=np.float32)
+        return np.clip(np.log(np.maximum(relative, 1e-12)) / np.log(top), 0.0, 1.0).astype(np.float32)
+
+    def traverse(
+        self,
+        seeds: Sequence[int],
+        direction: str = "outgoing",
+        depth: int = 1,
+        max_nodes: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Breadth-first walk from ``seeds`` up to ``depth`` hops along
+        ``outgoing``, ``incoming`` or ``bidirectional`` links, visiting at most
+        ``max_nodes`` docs. Returns ``(nodes, hops, weights)`` in visit order:
+        by hop, then in first-link order (outgoing before incoming). A node's
+        weight is the number of links reaching it from the previous hop.
+        """
+        graphs = {
+            "outgoing": [(self.out_indptr, self.out_indices, self.out_weights)],
+            "incoming": [(self.in_indptr, self.in_indices, self.in_weights)],
+        }
+        graphs["bidirectional"] = graphs["outgoing"] + graphs["incoming"]
+        visited = np.zeros(self.n_nodes, dtype=bool)
+        frontier = np.asarray(seeds, dtype=np.int64)
+        visited[frontier] = True
+        budget = self.n_nodes if max_nodes is None else max(int(max_nodes), 0)
+        found: List[Tuple[np.ndarray, np.ndarray]] = []
+        for _ in range(max(int(depth), 0)):
+            if not frontier.size or budget <= 0:
+                break
+            ranges = [(indices, weights, _gather(indptr, frontier)) for indptr, indices, weights in graphs[direction]]
+            targets = np.concatenate([indices[idx] for indices, _, idx in ranges])
+            counts = np.concatenate([weights[idx] for _, weights, idx in ranges])
+            fresh = ~visited[targets]
+            targets, counts = targets[fresh], counts[fresh]
+            # First occurrence of each target without sorting: O(len(targets) + n_nodes).
+            first = np.full(self.n_nodes, len(targets), dtype=np.int64)
+            np.minimum.at(first, targets, np.arange(len(targets)))
+            frontier = targets[first[targets] == np.arange(len(targets))][:budget]
+            node_weights = np.bincount(targets, weights=counts, minlength=self.n_nodes)[frontier]
+            visited[frontier] = True
+            budget -= len(frontier)
+            found.append((frontier, node_weights.astype(np.int32)))
+        if not found:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty, empty
+        hops = np.concatenate([np.full(len(nodes), hop, dtype=np.int32) for hop, (nodes, _) in enumerate(found, 1)])
+        return (
+            np.concatenate([nodes for nodes, _ in found]).astype(np.int32),
+            hops,
+            np.concatenate([weights for _, weights in found]),
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "nodes": self.n_nodes,
+            "edges": int(len(self.out_indices)),
+            "links": int(self.out_weights.sum()),
+            "dangling": self.dangling,
+            "pagerank": self.pagerank is not None,
+            "bytes": int(
+                sum(getattr(self, name).nbytes for name in self._ARRAYS)
+                + (self.pagerank.nbytes if self.pagerank is not None else 0)
+            ),
+        }
@@ -3,11 +3,14 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import time
+import tracemalloc
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any
 
 from unity_docs_mcp.config import UNITY_VERSION_ENV, load_config
+from unity_docs_mcp.latency import percentile
 from unity_docs_mcp.paths import make_paths
 from unity_docs_mcp.tools.ops import DocStore
 
@@ -55,16 +58,92 @@ def _mean(values: list[float]) -> float:
     return sum(values) / len(values) if values else 0.0
 
 
+def _run_cases(store: DocStore, cases: list[EvalCase], k: int) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    recall_scores: list[float] = []
+    mrr_scores: list[float] = []
+    latencies_ms: list[float] = []
+    case_results: list[dict[str, Any]] = []
+    if cases:
+        # Warm-up so lazy model/index loading is not billed to the first case.
+        store.search(query=cases[0].query, k=k, source_types=cases[0].source_types)
+    for case in cases:
+        started = time.perf_counter()
+        results = store.search(query=case.query, k=k, source_types=case.source_types)
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        found_doc_ids = [result.doc_id for result in results]
+        recall = _recall_at_k(found_doc_ids, case.expected_doc_ids)
+        mrr_score = _mrr(found_doc_ids, case.expected_doc_ids)
+        recall_scores.append(recall)
+        mrr_scores.append(mrr_score)
+        latencies_ms.append(latency_ms)
+        case_results.append(
+            {
+                **asdict(case),
+                "found_doc_ids": found_doc_ids,
+                "recall_at_k": recall,
+                "mrr": mrr_score,
+                "latency_ms": latency_ms,
+            }
+        )
+    metrics = {
+        "recall_at_k": _mean(recall_scores),
+        "mrr": _mean(mrr_scores),
+        "latency_ms": {
+            "p50": percentile(latencies_ms, 50),
+            "p95": percentile(latencies_ms, 95),
+            "mean": _mean(latencies_ms),
+        },
+    }
+    return case_results, metrics
+
+
+def _allocation_profile(store: DocStore, cases: list[EvalCase], k: int) -> dict[str, Any]:
+    """
+    Peak Python heap allocated per query, traced in a separate pass because
+    tracemalloc slows every allocation and would distort the latency numbers.
+    """
+    peaks_kib: list[float] = []
+    tracemalloc.start()
+    try:
+        for case in cases:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            store.search(query=case.query, k=k, source_types=case.source_types)
+            peaks_kib.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024.0)
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib": {
+            "p50": percentile(peaks_kib, 50),
+            "p95": percentile(peaks_kib, 95),
+            "mean": _mean(peaks_kib),
+        }
+    }
+
+
 def _write_json(path: Path, payload: dict[str, Any]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
 
 
+def _vector_store_summary(store: DocStore, index_manifest_path: Path) -> dict[str, Any]:
+    stats = store.vector_stats()
+    if not stats.get("enabled"):
+        return stats
+    build: dict[str, Any] = {}
+    if index_manifest_path.exists():
+        build = json.loads(index_manifest_path.read_text(encoding="utf-8")).get("vector_store", {})
+    return {**stats, "recall_at_10_vs_flat": build.get("recall_at_10_vs_flat")}
+
+
 def run_benchmark(args: argparse.Namespace) -> int:
     os.environ.setdefault(UNITY_VERSION_ENV, args.unity_version)
     cfg = load_config(args.config)
     if args.vector_mode == "none":
         cfg.index.vector = "none"
+    # Every case should pay for its own query embedding and retrieval.
+    cfg.index.query_cache_size = 0
+    cfg.mcp.result_cache_size = 0
 
     paths = make_paths(cfg)
     required = [paths.baked_dir / "corpus.jsonl", paths.baked_dir / "link_graph.jsonl", paths.index_dir / "fts.sqlite"]
@@ -90,24 +169,18 @@ def run_benchmark(args: argparse.Namespace) -> int:
     cases = _load_dataset(dataset_path)
     store = DocStore(cfg)
 
-    recall_scores: list[float] = []
-    mrr_scores: list[float] = []
-    case_results: list[dict[str, Any]] = []
-    for case in cases:
-        results = store.search(query=case.query, k=args.k, source_types=case.source_types)
-        found_doc_ids = [result.doc_id for result in results]
-        recall = _recall_at_k(found_doc_ids, case.expected_doc_ids)
-        mrr_score = _mrr(found_doc_ids, case.expected_doc_ids)
-        recall_scores.append(recall)
-        mrr_scores.append(mrr_score)
-        case_results.append(
-            {
-                **asdict(case),
-                "found_doc_ids": found_doc_ids,
-                "recall_at_k": recall,
-                "mrr": mrr_score,
-            }
-        )
+    searcher = store.searcher
+    case_results, metrics = _run_cases(store, cases, args.k)
+    encoder_comparison: dict[str, Any] = {}
+    if getattr(args, "compare_query_encoders", False) and searcher.use_vectors:
+        if not searcher.static_encoder_path.exists():
+            print("[benchmark] static encoder not built; set index.query_encoder: static and re-index to compare.")
+        else:
+            configured = searcher.query_encoder
+            for encoder in ("model", "static"):
+                searcher.query_encoder = encoder
+                encoder_comparison[encoder] = _run_cases(store, cases, args.k)[1]
+            searcher.query_encoder = configured
 
     summary = {
         "status": "ok",
@@ -115,15 +188,31 @@ def run_benchmark(args: argparse.Namespace) -> int:
         "dataset": str(dataset_path),
         "k": args.k,
         "cases": len(cases),
-        "recall_at_k": _mean(recall_scores),
-        "mrr": _mean(mrr_scores),
+        **metrics,
+        "query_encoder": searcher.query_encoder if searcher.use_vectors else None,
+        "vector_store": _vector_store_summary(store, paths.index_dir / "manifest.json"),
     }
+    if encoder_comparison:
+        summary["query_encoder_comparison"] = encoder_comparison
+    if getattr(args, "trace_allocations", False):
+        summary["allocations"] = _allocation_profile(store, cases, args.k)
     payload = {
         "summary": summary,
         "results": case_results,
     }
     _write_json(Path(args.output), payload)
-    print(f"[benchmark] cases={summary['cases']} recall@{args.k}={summary['recall_at_k']:.3f} mrr={summary['mrr']:.3f}")
+    print(
+        f"[benchmark] cases={summary['cases']} recall@{args.k}={summary['recall_at_k']:.3f} mrr={summary['mrr']:.3f} "
+        f"p50={summary['latency_ms']['p50']:.2f}ms p95={summary['latency_ms']['p95']:.2f}ms"
+    )
+    for encoder, block in encoder_comparison.items():
+        print(
+            f"[benchmark] query_encoder={encoder} recall@{args.k}={block['recall_at_k']:.3f} "
+            f"mrr={block['mrr']:.3f} p50={block['latency_ms']['p50']:.2f}ms"
+        )
+    if "allocations" in summary:
+        peak = summary["allocations"]["peak_kib"]
+        print(f"[benchmark] per-query peak allocation p50={peak['p50']:.1f}KiB p95={peak['p95']:.1f}KiB")
     print(f"[benchmark] wrote {Path(args.output).resolve()}")
     return 0
 
@@ -153,6 +242,16 @@ def main() -> int:
         default="config",
         help="Use configured vector mode or force FTS-only benchmark reads.",
     )
+    parser.add_argument(
+        "--compare-query-encoders",
+        action="store_true",
+        help="Also run the dataset with the transformer and static query encoders and report both.",
+    )
+    parser.add_argument(
+        "--trace-allocations",
+        action="store_true",
+        help="Also report per-query peak Python allocations (tracemalloc, separate pass).",
+    )
     parser.add_argument(
         "--require-artifacts",
         action="store_true",
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+from unity_docs_mcp.index.vector_store import build_coarse_codes, search_numpy, search_two_stage
+from unity_docs_mcp.latency import percentile
+
+
+def _synthetic_vectors(n: int, dim: int, seed: int, clusters: int = 256) -> np.ndarray:
+    # Clustered unit vectors: isotropic noise alone has no meaningful neighbourhoods.
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    data = centers[rng.integers(0, clusters, size=n)] + 0.7 * rng.standard_normal((n, dim)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def _synthetic_queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    # Perturbed copies of indexed rows, so each query has a meaningful neighbourhood.
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)
+    noisy = vectors[picks] + noise * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32) / np.sqrt(vectors.shape[1])
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+
+def _time_ms(fn: Callable[[], Any], repeats: int) -> list[float]:
+    timings: list[float] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+
+def _single_query_ms(fn: Callable[[np.ndarray], Any], query_vecs: np.ndarray) -> list[float]:
+    timings: list[float] = []
+    for query in query_vecs:
+        timings.extend(_time_ms(lambda: fn(query[None, :]), 1))
+    return timings
+
+
+def _recall(found: np.ndarray, exact: np.ndarray) -> float:
+    hits = sum(len(set(found[i]) & set(exact[i])) for i in range(len(exact)))
+    return hits / float(exact.size) if exact.size else 1.0
+
+
+def _latency_block(single: list[float], batched: list[float], n_queries: int) -> dict[str, float]:
+    return {
+        "single_query_p50_ms": percentile(single, 50),
+        "single_query_p95_ms": percentile(single, 95),
+        "batched_per_query_ms": percentile(batched, 50) / max(n_queries, 1),
+    }
+
+
+def run_vector_microbench(
+    n: int = 20000,
+    dim: int = 384,
+    queries: int = 64,
+    k: int = 80,
+    repeats: int = 5,
+    seed: int = 0,
+    rescore_pool: int = 256,
+    coarse_dims: int = 128,
+) -> dict[str, Any]:
+    """
+    Compare the NumPy backend (float16 and float32, flat and two-stage)
+    against FAISS ``IndexFlatIP`` on synthetic unit vectors: single-query and
+    batched latency plus recall@k against exact float32 inner product.
+    """
+    vectors = _synthetic_vectors(n, dim, seed)
+    query_vecs = _synthetic_queries(vectors, queries, noise=0.8, seed=seed + 1)
+    exact_scores = query_vecs @ vectors.T
+    exact_top = np.argsort(-exact_scores, axis=1)[:, :k]
+
+    report: dict[str, Any] = {"n": n, "dim": dim, "queries": queries, "k": k}
+    for name, dtype in (("numpy_fp16", np.float16), ("numpy_fp32", np.float32)):
+        matrix = vectors.astype(dtype)
+        _, numpy_top = search_numpy(matrix, query_vecs, k=k)
+        report[name] = {
+            **_latency_block(
+                _single_query_ms(lambda q: search_numpy(matrix, q, k=k), query_vecs),
+                _time_ms(lambda: search_numpy(matrix, query_vecs, k=k), repeats),
+                queries,
+            ),
+            "bytes": int(matrix.nbytes),
+            "recall_at_k": _recall(numpy_top, exact_top),
+        }
+
+    matrix = vectors.astype(np.float16)
+    for mode in ("binary", "truncate"):
+        codes = build_coarse_codes(matrix, mode, dims=coarse_dims)
+
+        def _two_stage(q: np.ndarray, codes: np.ndarray = codes, mode: str = mode):
+            return search_two_stage(matrix, codes, q, k=k, mode=mode, rescore_pool=rescore_pool)
+
+        _, two_stage_top = _two_stage(query_vecs)
+        report[f"two_stage_{mode}"] = {
+            **_latency_block(
+                _single_query_ms(_two_stage, query_vecs),
+                _time_ms(lambda: _two_stage(query_vecs), repeats),
+                queries,
+            ),
+            "bytes": int(matrix.nbytes + codes.nbytes),
+            "coarse_bytes": int(codes.nbytes),
+            "rescore_pool": rescore_pool,
+            "recall_at_k": _recall(two_stage_top, exact_top),
+        }
+
+    try:
+        import faiss
+    except Exception:
+        report["faiss_flat"] = {"available": False}
+        return report
+
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    _, faiss_top = index.search(query_vecs, k)
+    report["faiss_flat"] = {
+        "available": True,
+        **_latency_block(
+            _single_query_ms(lambda q: index.search(q, k), query_vecs),
+            _time_ms(lambda: index.search(query_vecs, k), repeats),
+            queries,
+        ),
+        "bytes": int(vectors.nbytes),
+        "recall_at_k": _recall(faiss_top, exact_top),
+    }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmark vector search backends on synthetic data.")
+    parser.add_argument("--n", type=int, default=20000, help="Number of indexed vectors.")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension.")
+    parser.add_argument("--queries", type=int, default=64, help="Number of queries.")
+    parser.add_argument("--k", type=int, default=80, help="Top-k depth (matches candidate_pool by default).")
+    parser.add_argument("--repeats", type=int, default=5, help="Timing repeats per measurement.")
+    parser.add_argument("--rescore-pool", type=int, default=256, help="Two-stage candidates rescored at full precision.")
+    parser.add_argument("--coarse-dims", type=int, default=128, help="Dimensions kept by the truncate coarse pass.")
+    parser.add_argument("--output", default="benchmarks/results/vector_microbench.json", help="Output JSON path.")
+    args = parser.parse_args()
+
+    report = run_vector_microbench(
+        n=args.n,
+        dim=args.dim,
+        queries=args.queries,
+        k=args.k,
+        repeats=args.repeats,
+        rescore_pool=args.rescore_pool,
+        coarse_dims=args.coarse_dims,
+    )
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    for name in ("numpy_fp16", "numpy_fp32", "two_stage_binary", "two_stage_truncate", "faiss_flat"):
+        block = report.get(name, {})
+        if block.get("available") is False:
+            print(f"[vector-bench] {name}: not installed")
+            continue
+        print(
+            f"[vector-bench] {name}: single p50={block['single_query_p50_ms']:.3f}ms "
+            f"batched={block['batched_per_query_ms']:.3f}ms/query recall@{args.k}={block['recall_at_k']:.3f}"
+        )
+    print(f"[vector-bench] wrote {output.resolve()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
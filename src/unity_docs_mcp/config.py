@@ -28,6 +28,7 @@ class BakeConfig:
     include_figure_captions: bool = True
     drop_sections: list[str] = field(default_factory=lambda: ["Additional resources"])
     min_page_chars: int = 400
+    pagerank_damping: float = 0.85  # link-graph PageRank stored with link_graph.npz
 
 
 @dataclass
@@ -44,13 +45,51 @@ class EmbedderConfig:
     device: str = "auto"  # auto|cpu|cuda
 
 
+_INDEX_CHOICES = {
+    "vector_storage": ("flat", "fp16", "sq8", "pq"),
+    "vector_numpy_dtype": ("float16", "float32"),
+    "vector_coarse": ("none", "binary", "truncate"),
+    "query_encoder": ("model", "static"),
+}
+
+
 @dataclass
 class IndexConfig:
     lexical: str = "sqlite_fts5"
     vector: str = "faiss"
     embedder: EmbedderConfig = field(default_factory=EmbedderConfig)
     rerank_enable: bool = True
-    candidate_pool: int = 80
+    candidate_pool: int = 20  # starting pool per retrieval leg (at least 2*k); widened x4 when filters/grouping leave < k
+    candidate_pool_max: int = 320
+    pagerank_weight: float = 0.05  # additive link-centrality prior in fused scores (0..weight); 0 disables
+    fts_profile: str = "full"  # full|prefix|compact|lean, see index.fts.FTS_PROFILES
+    fts_options: Dict[str, Any] = field(default_factory=dict)  # per-option overrides: detail, prefix, columnsize, content
+    fts_stemming: bool = False  # porter stemming for prose (identifier parts are indexed either way)
+    fts_trigram: bool = True  # substring index over titles, headings, doc_ids, paths and code identifiers
+    fts_prune_df_ratio: float = 0.25  # OR-query terms in more chunks than this fraction are pruned; 0 disables
+    vector_storage: str = "flat"  # flat|fp16|sq8|pq
+    vector_pq_m: int = 48
+    vector_mmap: bool = True
+    vector_numpy_dtype: str = "float16"  # float16|float32, used by vector: numpy
+    vector_coarse: str = "none"  # none|binary|truncate, two-stage search (vector: numpy)
+    vector_coarse_dims: int = 128
+    vector_rescore_pool: int = 256
+    retrieval_workers: int = 2  # threads running the vector leg beside the lexical leg; 0 runs them in sequence
+    vector_leg_timeout_ms: float = 2000.0  # answer from the lexical leg when the vector leg is slower; 0 waits
+    query_encoder: str = "model"  # model|static
+    query_batch_window_ms: float = 2.0  # 0 encodes each query inline
+    query_batch_max: int = 32
+    query_cache_size: int = 1024  # 0 disables the query-embedding cache
+    query_cache_persist: bool = False
+    similar_docs: int = 10  # neighbours precomputed per doc for related(mode="similar"); 0 disables
+
+    def __post_init__(self) -> None:
+        # Store the normalized spelling so callers can compare against it directly.
+        for key, choices in _INDEX_CHOICES.items():
+            value = str(getattr(self, key) or "").strip().lower()
+            if value not in choices:
+                raise ValueError(f"Unsupported index.{key}: {getattr(self, key)!r}. Expected one of: {', '.join(choices)}")
+            setattr(self, key, value)
 
 
 @dataclass
@@ -59,6 +98,13 @@ class MCPConfig:
     snippet_chars: int = 900
     min_score: float = 0.15
     open_max_chars: int = 12000
+    symbol_fuzzy_max_edits: int = 2  # resolve_symbol typo tolerance (1 up to 10 chars, none under 4); 0 disables
+    related_max_depth: int = 3  # link hops related(depth=...) may traverse
+    related_max_nodes: int = 500  # docs a related traversal may visit (also the default max_nodes)
+    deadline_ms: float = 0.0  # default per-call budget for search/resolve_symbol/related; 0 disables
+    result_cache_size: int = 256  # 0 disables the search/resolve_symbol/related result cache
+    result_cache_ttl_s: float = 300.0
+    result_cache_persist: bool = False
 
 
 def _require_unity_version() -> str:
@@ -133,6 +179,10 @@ def _validate_override_keys(overrides: Dict[str, Any], source: Optional[Path] =
     )
 
 
+def _index_config_dict(index_cfg: IndexConfig) -> Dict[str, Any]:
+    return {**vars(index_cfg), "embedder": dict(vars(index_cfg.embedder))}
+
+
 def merge_config(base: Config, overrides: Dict[str, Any]) -> Config:
     """
     Merge dictionary overrides into a Config instance, returning a new instance.
@@ -141,13 +191,7 @@ def merge_config(base: Config, overrides: Dict[str, Any]) -> Config:
     cfg_dict: Dict[str, Any] = {
         "bake": vars(base.bake),
         "chunking": vars(base.chunking),
-        "index": {
-            "lexical": base.index.lexical,
-            "vector": base.index.vector,
-            "embedder": vars(base.index.embedder),
-            "rerank_enable": base.index.rerank_enable,
-            "candidate_pool": base.index.candidate_pool,
-        },
+        "index": _index_config_dict(base.index),
         "mcp": vars(base.mcp),
     }
 
@@ -166,11 +210,10 @@ def merge_config(base: Config, overrides: Dict[str, Any]) -> Config:
         bake=BakeConfig(**merged["bake"]),
         chunking=ChunkConfig(**merged["chunking"]),
         index=IndexConfig(
-            lexical=merged["index"]["lexical"],
-            vector=merged["index"]["vector"],
-            embedder=EmbedderConfig(**merged["index"]["embedder"]),
-            rerank_enable=merged["index"]["rerank_enable"],
-            candidate_pool=merged["index"]["candidate_pool"],
+            **{
+                **merged["index"],
+                "embedder": EmbedderConfig(**merged["index"]["embedder"]),
+            }
         ),
         mcp=MCPConfig(**merged["mcp"]),
     )
@@ -229,6 +272,16 @@ def vector_enabled(vector_mode: str) -> bool:
     return mode not in {"", "none", "off", "disabled", "false"}
 
 
+def vector_backend(vector_mode: str) -> Optional[str]:
+    """
+    Map an ``index.vector`` value to the vector backend that serves it.
+    """
+    if not vector_enabled(vector_mode):
+        return None
+    mode = vector_mode.strip().lower()
+    return "numpy" if mode == "numpy" else "faiss"
+
+
 def retrieval_mode(vector_mode: str) -> str:
     return "hybrid" if vector_enabled(vector_mode) else "fts_only"
 
@@ -243,13 +296,7 @@ def config_signature(cfg: Config) -> str:
         "paths": vars(cfg.paths),
         "bake": vars(cfg.bake),
         "chunking": vars(cfg.chunking),
-        "index": {
-            "lexical": cfg.index.lexical,
-            "vector": cfg.index.vector,
-            "embedder": vars(cfg.index.embedder),
-            "rerank_enable": cfg.index.rerank_enable,
-            "candidate_pool": cfg.index.candidate_pool,
-        },
+        "index": _index_config_dict(cfg.index),
         "mcp": vars(cfg.mcp),
     }
     payload = json.dumps(as_dict, sort_keys=True)
@@ -14,6 +14,7 @@ from unity_docs_mcp.config import (
     config_signature,
     existing_config_layer_paths,
     load_config,
+    vector_backend,
     vector_enabled,
 )
 from unity_docs_mcp.paths import make_paths
@@ -118,9 +119,10 @@ def _check_dependencies(cfg: Config) -> CheckResult:
 
     checks = {
         "sentence_transformers": _import_optional("sentence_transformers"),
-        "faiss": _import_optional("faiss"),
         "torch": _import_optional("torch"),
     }
+    if vector_backend(cfg.index.vector) == "faiss":
+        checks["faiss"] = _import_optional("faiss")
     missing = [name for name, (ok, _, _) in checks.items() if not ok]
     details = {
         "vector_enabled": True,
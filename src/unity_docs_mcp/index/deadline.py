@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    Time budget for one tool call, shared by every stage that serves it.
+
+    ``budget_ms`` of ``None`` or ``<= 0`` never expires. Stages ask for the
+    remaining time (to bound waits) or check ``expired()`` between units of
+    work; the first stage that gives up is recorded in ``timed_out_stage`` so
+    the caller can flag its answer as partial and keep it out of caches.
+    A stage that gives up on its own timeout rather than the budget is
+    recorded in ``degraded_stage``: the answer is not partial, but it is not
+    cached either.
+    """
+
+    def __init__(self, budget_ms: Optional[float] = None):
+        self.budget_ms = float(budget_ms) if budget_ms and budget_ms > 0 else None
+        self._expires_at = time.monotonic() + self.budget_ms / 1000.0 if self.budget_ms else None
+        self.timed_out_stage: Optional[str] = None
+        self.degraded_stage: Optional[str] = None
+
+    @property
+    def partial(self) -> bool:
+        return self.timed_out_stage is not None
+
+    @property
+    def cacheable(self) -> bool:
+        return self.timed_out_stage is None and self.degraded_stage is None
+
+    def remaining_s(self) -> Optional[float]:
+        if self._expires_at is None:
+            return None
+        return max(0.0, self._expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self._expires_at is not None and time.monotonic() >= self._expires_at
+
+    def expire(self, stage: str) -> None:
+        if self.timed_out_stage is None:
+            self.timed_out_stage = stage
+
+    def degrade(self, stage: str) -> None:
+        if self.degraded_stage is None:
+            self.degraded_stage = stage
+
+    def check(self, stage: str) -> bool:
+        """True while time remains; otherwise records ``stage`` as the one that timed out."""
+        if self.expired():
+            self.expire(stage)
+            return False
+        return True
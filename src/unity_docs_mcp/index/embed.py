@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 import sys
-from typing import Iterable
+from typing import Iterable, List
 
 import numpy as np
 
@@ -52,3 +52,26 @@ def embed_texts(texts: Iterable[str], model_name: str, device: str = "auto") ->
             show_progress_bar=True,
         )
     )
+
+
+@lru_cache(maxsize=4)
+def _query_device(preference: str) -> str:
+    return _select_device(preference)
+
+
+def encode_queries(texts: List[str], model_name: str, device: str = "auto") -> np.ndarray:
+    """
+    Query-path encode: the device is resolved once per process and there is no
+    diagnostics print or progress bar, unlike the bulk :func:`embed_texts`.
+    """
+    model = _load_model(model_name, _query_device(device))
+    return np.asarray(
+        model.encode(
+            texts,
+            batch_size=max(len(texts), 1),
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        ),
+        dtype=np.float32,
+    )
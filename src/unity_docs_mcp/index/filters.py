@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """
+    Row filters pushed into both retrieval legs: the FTS statement joins the
+    ``chunks`` table on rowid, and the vector backends mask rows before top-k.
+    ``path_prefix`` matches ``origin_path`` case-insensitively.
+    """
+
+    source_types: Optional[Tuple[str, ...]] = None
+    path_prefix: Optional[str] = None
+    doc_ids: Optional[Tuple[str, ...]] = None
+    exclude_doc_ids: Optional[Tuple[str, ...]] = None
+
+    @classmethod
+    def build(
+        cls,
+        source_types: Optional[List[str]] = None,
+        path_prefix: Optional[str] = None,
+        doc_ids: Optional[List[str]] = None,
+        exclude_doc_ids: Optional[List[str]] = None,
+    ) -> "SearchFilters":
+        prefix = (path_prefix or "").strip().replace("\\", "/")
+        return cls(
+            source_types=tuple(sorted(set(source_types))) if source_types else None,
+            path_prefix=prefix or None,
+            doc_ids=tuple(sorted(set(doc_ids))) if doc_ids else None,
+            exclude_doc_ids=tuple(sorted(set(exclude_doc_ids))) if exclude_doc_ids else None,
+        )
+
+    def is_empty(self) -> bool:
+        return not (self.source_types or self.path_prefix or self.doc_ids or self.exclude_doc_ids)
+
+    def matches(self, meta: Dict[str, Any]) -> bool:
+        if self.source_types and meta.get("source_type") not in self.source_types:
+            return False
+        if self.path_prefix and not (meta.get("origin_path") or "").lower().startswith(self.path_prefix.lower()):
+            return False
+        doc_id = meta.get("doc_id")
+        if self.doc_ids and doc_id not in self.doc_ids:
+            return False
+        if self.exclude_doc_ids and doc_id in self.exclude_doc_ids:
+            return False
+        return True
+
+    def sql_where(self, alias: str = "c") -> Tuple[str, List[Any]]:
+        """``AND``-joined predicates over the ``chunks`` table and their parameters."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.source_types:
+            clauses.append(f"{alias}.source_type IN ({', '.join('?' * len(self.source_types))})")
+            params.extend(self.source_types)
+        if self.path_prefix:
+            clauses.append(f"{alias}.origin_path LIKE ? ESCAPE '\\'")
+            params.append(_escape_like(self.path_prefix) + "%")
+        if self.doc_ids:
+            clauses.append(f"{alias}.doc_id IN ({', '.join('?' * len(self.doc_ids))})")
+            params.extend(self.doc_ids)
+        if self.exclude_doc_ids:
+            clauses.append(f"{alias}.doc_id NOT IN ({', '.join('?' * len(self.exclude_doc_ids))})")
+            params.extend(self.exclude_doc_ids)
+        return " AND ".join(clauses), params
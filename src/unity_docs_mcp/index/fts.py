@@ -1,35 +1,154 @@
 from __future__ import annotations
 
+import json
 import sqlite3
+import time
 from pathlib import Path
 import re
-from typing import Iterable, List, Tuple
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from unity_docs_mcp.index.deadline import Deadline
+from unity_docs_mcp.index.filters import SearchFilters
+from unity_docs_mcp.latency import percentile
 
 # FTS column weights (lower bm25 score is better):
-# text, doc_id, heading_path, title, chunk_id
+# text, doc_id, heading_path, title, identifiers, chunk_id
+_RANK_FUNCTION = "bm25(1.0, 6.0, 3.0, 8.0, 2.0, 0.0)"
+# ``rank`` is configured to _RANK_FUNCTION at index time, so ``ORDER BY rank LIMIT``
+# takes FTS5's top-k path instead of sorting every match. FTS rowids are aligned
+# with ``chunks`` rowids at ingest time, so chunk ids come from a rowid lookup
+# (contentless profiles store no column values) and filters apply before the sort.
 _FTS_QUERY = (
-    "SELECT chunk_id, bm25(chunks_fts, 1.0, 6.0, 3.0, 8.0, 0.0) as score "
-    "FROM chunks_fts WHERE chunks_fts MATCH ? ORDER BY score LIMIT ?"
+    "SELECT c.chunk_id, chunks_fts.rank "
+    "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+    "WHERE chunks_fts MATCH ? ORDER BY chunks_fts.rank LIMIT ?"
+)
+_FTS_FILTERED_QUERY = (
+    "SELECT c.chunk_id, chunks_fts.rank "
+    "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+    "WHERE chunks_fts MATCH ? AND {where} ORDER BY chunks_fts.rank LIMIT ?"
+)
+# Doc-level retrieval: the best-ranked chunk of each doc, so grouped searches
+# get one candidate per doc from the same single statement. The window only
+# runs over the top ``limit * _PER_DOC_OVERFETCH`` matches, not every match.
+_FTS_PER_DOC_QUERY = (
+    "SELECT chunk_id, rank FROM ("
+    "SELECT chunk_id, rank, ROW_NUMBER() OVER (PARTITION BY doc_id ORDER BY rank) AS doc_rank FROM ("
+    "SELECT c.chunk_id, c.doc_id, chunks_fts.rank AS rank "
+    "FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid "
+    "WHERE chunks_fts MATCH ?{where} ORDER BY chunks_fts.rank LIMIT ?"
+    ")) WHERE doc_rank = 1 ORDER BY rank LIMIT ?"
 )
+_PER_DOC_OVERFETCH = 8
+_PROGRESS_STEPS = 1000
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+
+@dataclass(frozen=True)
+class FtsProfile:
+    """
+    FTS5 storage options for ``chunks_fts``.
+
+    ``detail`` trades positional data for size (``column`` and ``none`` cannot
+    answer phrase queries, so multi-word groups are planned as ANDs instead),
+    ``prefix`` adds prefix indexes for ``word*`` queries, ``columnsize=False``
+    drops the per-row length table, and ``content`` keeps column values in the
+    FTS table (``inline``), reads them from ``chunks`` (``external``) or does
+    not store them at all (``contentless``).
+    """
+
+    detail: str = "full"  # full|column|none
+    prefix: Tuple[int, ...] = ()
+    columnsize: bool = True
+    content: str = "inline"  # inline|external|contentless
+
+
+FTS_PROFILES: Dict[str, FtsProfile] = {
+    "full": FtsProfile(),
+    "prefix": FtsProfile(prefix=(2, 3)),
+    "compact": FtsProfile(detail="column", content="external"),
+    "lean": FtsProfile(detail="none", content="contentless"),
+}
+
+
+def resolve_fts_profile(name: str = "full", overrides: Optional[Dict[str, Any]] = None) -> FtsProfile:
+    """Look up a named profile and apply per-option ``overrides``."""
+    key = (name or "full").strip().lower()
+    if key not in FTS_PROFILES:
+        raise ValueError(f"Unknown FTS profile {name!r}; expected one of {', '.join(FTS_PROFILES)}.")
+    options = dict(overrides or {})
+    unknown = sorted(set(options) - set(asdict(FTS_PROFILES[key])))
+    if unknown:
+        raise ValueError(f"Unknown FTS option(s): {', '.join(unknown)}.")
+    if "prefix" in options:
+        options["prefix"] = tuple(sorted({int(p) for p in options["prefix"] or ()}))
+    profile = replace(FTS_PROFILES[key], **options)
+    if profile.detail not in {"full", "column", "none"}:
+        raise ValueError(f"FTS detail must be full, column or none (got {profile.detail!r}).")
+    if profile.content not in {"inline", "external", "contentless"}:
+        raise ValueError(f"FTS content must be inline, external or contentless (got {profile.content!r}).")
+    if any(p < 1 for p in profile.prefix):
+        raise ValueError("FTS prefix lengths must be positive.")
+    if profile.content == "contentless" and not profile.columnsize:
+        # bm25 needs row lengths, and a contentless table cannot recompute them.
+        raise ValueError("Contentless FTS profiles need columnsize.")
+    return profile
 
 
-def init_db(db_path: Path) -> sqlite3.Connection:
+def _fts_options_sql(profile: FtsProfile) -> str:
+    options = [f"detail = {profile.detail}"]
+    if profile.prefix:
+        options.append("prefix = '" + " ".join(str(p) for p in profile.prefix) + "'")
+    if not profile.columnsize:
+        options.append("columnsize = 0")
+    if profile.content == "external":
+        options.append("content = 'chunks', content_rowid = 'rowid'")
+    elif profile.content == "contentless":
+        options.append("content = ''")
+    return "".join(f",\n            {option}" for option in options)
+
+
+def load_fts_profile(conn: sqlite3.Connection) -> FtsProfile:
+    try:
+        row = conn.execute("SELECT value FROM fts_settings WHERE key = 'profile'").fetchone()
+    except sqlite3.OperationalError:
+        # Index built before storage profiles existed.
+        return FtsProfile()
+    if not row:
+        return FtsProfile()
+    options = json.loads(row[0])
+    return FtsProfile(**{**options, "prefix": tuple(options.get("prefix") or ())})
+
+
+def init_db(db_path: Path, stemming: bool = False, profile: Optional[FtsProfile] = None) -> sqlite3.Connection:
+    profile = profile or FtsProfile()
     db_path.parent.mkdir(parents=True, exist_ok=True)
     conn = sqlite3.connect(str(db_path))
     conn.execute("PRAGMA journal_mode=WAL;")
+    # Rebuilt together with chunks_fts so rowids stay aligned for filter joins.
+    conn.execute("DROP TABLE IF EXISTS chunks;")
     conn.execute(
         """
-        CREATE TABLE IF NOT EXISTS chunks (
+        CREATE TABLE chunks (
             chunk_id TEXT PRIMARY KEY,
             doc_id TEXT,
             source_type TEXT,
             title TEXT,
             heading_path TEXT,
-            origin_path TEXT,
-            canonical_url TEXT
+            origin_path TEXT COLLATE NOCASE,
+            canonical_url TEXT{content_columns}
         );
-        """
+        """.format(content_columns=",\n            text TEXT,\n            identifiers TEXT" if profile.content == "external" else "")
     )
+    conn.execute("CREATE INDEX idx_chunks_source_type ON chunks(source_type);")
+    conn.execute("CREATE INDEX idx_chunks_origin_path ON chunks(origin_path);")
+    conn.execute("CREATE INDEX idx_chunks_doc_id ON chunks(doc_id);")
+    conn.execute("DROP TABLE IF EXISTS fts_high_df_terms;")
+    conn.execute("CREATE TABLE fts_high_df_terms (term TEXT PRIMARY KEY, df INTEGER);")
+    conn.execute("DROP TABLE IF EXISTS fts_settings;")
+    conn.execute("CREATE TABLE fts_settings (key TEXT PRIMARY KEY, value TEXT);")
+    conn.execute("INSERT INTO fts_settings(key, value) VALUES ('profile', ?);", (json.dumps(asdict(profile)),))
     # Recreate FTS table to keep schema consistent with current indexed columns.
     conn.execute("DROP TABLE IF EXISTS chunks_fts;")
     conn.execute(
@@ -39,74 +158,286 @@ def init_db(db_path: Path) -> sqlite3.Connection:
             doc_id,
             heading_path,
             title,
-            chunk_id UNINDEXED
+            identifiers,
+            chunk_id UNINDEXED,
+            tokenize = '{tokenize}'{options}
         );
-        """
+        """.format(tokenize="porter unicode61" if stemming else "unicode61", options=_fts_options_sql(profile))
     )
+    conn.execute("INSERT INTO chunks_fts(chunks_fts, rank) VALUES('rank', ?);", (_RANK_FUNCTION,))
     return conn
 
 
 def ingest_chunks(conn: sqlite3.Connection, rows: Iterable[Tuple[str, str, str, str, str, str, str, str]]) -> None:
     data = list(rows)
+    fts_rows = [
+        (i, r[7], r[1], r[4], r[3], expand_identifiers(r[3], r[4], r[1], r[7]), r[0])
+        for i, r in enumerate(data, start=1)
+    ]
     with conn:
+        if load_fts_profile(conn).content == "external":
+            # chunks_fts reads its column values back from these rows.
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunks(rowid, chunk_id, doc_id, source_type, title, heading_path, origin_path, canonical_url, text, identifiers) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(i, r[0], r[1], r[2], r[3], r[4], r[5], r[6], r[7], f[5]) for (i, r), f in zip(enumerate(data, start=1), fts_rows)],
+            )
+        else:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunks(rowid, chunk_id, doc_id, source_type, title, heading_path, origin_path, canonical_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(i, r[0], r[1], r[2], r[3], r[4], r[5], r[6]) for i, r in enumerate(data, start=1)],
+            )
         conn.executemany(
-            "INSERT OR REPLACE INTO chunks(chunk_id, doc_id, source_type, title, heading_path, origin_path, canonical_url) VALUES (?, ?, ?, ?, ?, ?, ?)",
-            [(r[0], r[1], r[2], r[3], r[4], r[5], r[6]) for r in data],
-        )
-        conn.executemany(
-            "INSERT INTO chunks_fts(text, doc_id, heading_path, title, chunk_id) VALUES (?, ?, ?, ?, ?)",
-            [(r[7], r[1], r[3], r[2], r[0]) for r in data],
+            "INSERT INTO chunks_fts(rowid, text, doc_id, heading_path, title, identifiers, chunk_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            fts_rows,
         )
 
 
-def search_fts(conn: sqlite3.Connection, query: str, limit: int = 20) -> List[Tuple[str, float]]:
-    for candidate in _query_variants(query):
-        try:
-            cursor = conn.execute(_FTS_QUERY, (candidate, limit))
-            rows = cursor.fetchall()
-        except sqlite3.OperationalError:
-            # Keep trying normalized variants if a candidate is invalid syntax.
-            continue
-        if rows:
-            return rows
-    return []
+def _split_camel_tokens(token: str) -> List[str]:
+    token = re.sub(r"([A-Z]+)([A-Z][a-z])", r"\1 \2", token)
+    return re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", token).split()
 
 
-def _sanitize_fts_query(query: str) -> str:
-    tokens = re.findall(r"[A-Za-z0-9_]+", query)
-    return " ".join(tokens)
+def expand_identifiers(*texts: str) -> str:
+    """
+    Index-time identifier expansion for the ``identifiers`` column.
 
+    ``unicode61`` indexes ``Mesh.SetVertices`` as ``mesh`` + ``setvertices``;
+    this adds the camel-case and snake_case parts (``set``, ``vertices``) and
+    the whole segments, so both ``SetVertices`` and ``set vertices`` match in
+    a single query. Only identifiers with inner structure are expanded.
+    """
+    seen: Set[str] = set()
+    out: List[str] = []
+    for text in texts:
+        for identifier in _IDENTIFIER_RE.findall(text or ""):
+            for segment in identifier.split("."):
+                parts = [p for piece in segment.split("_") for p in _split_camel_tokens(piece)]
+                if len(parts) < 2 and "." not in identifier:
+                    continue
+                for term in (segment, *parts):
+                    key = term.lower()
+                    if key and key not in seen:
+                        seen.add(key)
+                        out.append(key)
+    return " ".join(out)
 
-def _split_camel_tokens(query: str) -> str:
-    if not query:
-        return ""
-    parts: List[str] = []
-    for token in query.split():
-        split = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", token)
-        parts.extend(split.split())
-    return " ".join(parts).strip()
+
+def build_term_stats(conn: sqlite3.Connection, prune_df_ratio: float, min_df: int = 64) -> Dict[str, int]:
+    """
+    Record terms that occur in more than ``prune_df_ratio`` of all chunks
+    (and in at least ``min_df`` chunks, so tiny corpora prune nothing). The
+    query planner keeps them out of the OR branch, where each would visit
+    most of the corpus without helping the ranking.
+    """
+    total = int(conn.execute("SELECT COUNT(*) FROM chunks_fts").fetchone()[0])
+    with conn:
+        conn.execute("DELETE FROM fts_high_df_terms")
+        if prune_df_ratio > 0 and total:
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.chunks_fts_vocab USING fts5vocab(main, chunks_fts, 'row')")
+            conn.execute(
+                "INSERT INTO fts_high_df_terms(term, df) SELECT term, doc FROM temp.chunks_fts_vocab WHERE doc > ?",
+                (max(prune_df_ratio * total, min_df - 1),),
+            )
+            conn.execute("DROP TABLE temp.chunks_fts_vocab")
+    pruned = int(conn.execute("SELECT COUNT(*) FROM fts_high_df_terms").fetchone()[0])
+    return {"rows": total, "high_df_terms": pruned}
 
 
-def _query_variants(query: str) -> List[str]:
-    raw = (query or "").strip()
-    variants: List[str] = []
-    if raw:
-        variants.append(raw)
+def load_high_df_terms(conn: sqlite3.Connection) -> Set[str]:
+    try:
+        return {row[0] for row in conn.execute("SELECT term FROM fts_high_df_terms")}
+    except sqlite3.OperationalError:
+        # Index built before term stats existed.
+        return set()
 
-    safe_query = _sanitize_fts_query(raw)
-    if safe_query:
-        variants.append(safe_query)
 
-    camel_split = _split_camel_tokens(safe_query)
-    if camel_split:
-        variants.append(camel_split)
+@dataclass
+class FtsQueryPlan:
+    expression: str
+    terms: List[str] = field(default_factory=list)
+    pruned_terms: List[str] = field(default_factory=list)
 
-    # Preserve order while deduplicating.
-    deduped: List[str] = []
-    seen = set()
-    for variant in variants:
-        if not variant or variant in seen:
+
+# Unicode-aware like the unicode61 tokenizer, so "Überblick" or "カメラ" survive planning.
+_QUERY_TOKEN_RE = re.compile(r'"([^"]*)"|(\w+)(\*?)', re.UNICODE)
+_WORD_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _group_expression(words: List[str], star: bool, phrases: bool) -> str:
+    if phrases or len(words) == 1:
+        return '"' + " ".join(words) + '"' + ("*" if star else "")
+    # detail=column/none indexes cannot answer phrases; require every word instead.
+    return "(" + " AND ".join(f'"{w}"' for w in words) + ("*" if star else "") + ")"
+
+
+def plan_fts_query(query: str, high_df_terms: Optional[Set[str]] = None, phrases: bool = True) -> FtsQueryPlan:
+    """
+    Build one MATCH expression for ``query``.
+
+    Every word becomes a quoted token (so FTS5 operators and punctuation in
+    the input can never cause a syntax error; camel-case parts are already
+    indexed by :func:`expand_identifiers`), quoted input stays a phrase and a
+    trailing ``*`` keeps prefix matching. The
+    expression is ``(g1 AND g2 ...) OR g1 OR g2 ...``: rows matching every
+    group rank first, and long natural-language queries still return OR
+    matches instead of failing an implicit AND. Groups made only of
+    high-document-frequency terms are pruned from the OR branch unless
+    nothing else is left. With ``phrases=False`` (indexes built without
+    positions) multi-word groups become ANDs of their words.
+    """
+    high_df = high_df_terms or set()
+    groups: List[Tuple[str, List[str]]] = []
+    seen: Set[str] = set()
+    for match in _QUERY_TOKEN_RE.finditer(query or ""):
+        phrase, word, star = match.groups()
+        if phrase is not None:
+            words = _WORD_RE.findall(phrase)
+            if not words:
+                continue
+            expr = _group_expression(words, False, phrases)
+            terms = [w.lower() for w in words]
+        else:
+            words = _WORD_RE.findall(word)
+            if not words:
+                continue
+            expr = _group_expression(words, bool(star), phrases)
+            terms = [w.lower() for w in words]
+        if expr.lower() in seen:
             continue
-        deduped.append(variant)
-        seen.add(variant)
-    return deduped
+        seen.add(expr.lower())
+        groups.append((expr, terms))
+
+    kept = [group for group in groups if not all(term in high_df for term in group[1])]
+    if not kept:
+        kept = groups
+    pruned = [term for expr, terms in groups if (expr, terms) not in kept for term in terms]
+    expression = " OR ".join(expr for expr, _ in kept)
+    if len(groups) > 1:
+        # Phrases only score when their sub-expression matches, so rows that
+        # satisfy the AND branch collect bm25 twice and rank above OR-only rows.
+        # High-df groups stay in the AND branch: intersections are driven by
+        # the rarest term, so only the OR branch pays for common terms.
+        expression = f"({' AND '.join(expr for expr, _ in groups)}) OR {expression}"
+    return FtsQueryPlan(
+        expression=expression,
+        terms=[term for _, terms in groups for term in terms],
+        pruned_terms=pruned,
+    )
+
+
+def search_fts(
+    conn: sqlite3.Connection,
+    query: str,
+    limit: int = 20,
+    filters: Optional[SearchFilters] = None,
+    high_df_terms: Optional[Set[str]] = None,
+    debug: Optional[Dict[str, Any]] = None,
+    phrases: bool = True,
+    deadline: Optional[Deadline] = None,
+    per_doc: bool = False,
+) -> List[Tuple[str, float]]:
+    """
+    Run the planned query as a single ``MATCH ... ORDER BY rank LIMIT``
+    statement. ``debug``, when given, receives the expression, statement and
+    row counts and the approximate number of VM steps spent. Pass
+    ``phrases=False`` for indexes built with ``detail`` other than ``full``.
+    A ``deadline`` interrupts the statement once it expires; the query then
+    returns no rows and the deadline records the ``lexical`` stage. A MATCH
+    expression SQLite rejects also returns no rows (with ``debug["error"]``);
+    any other ``sqlite3.OperationalError`` propagates.
+    ``per_doc`` returns only the best chunk of each doc (``limit`` docs),
+    chosen from the top ``limit * _PER_DOC_OVERFETCH`` matching chunks.
+    """
+    plan = plan_fts_query(query, high_df_terms, phrases=phrases)
+    if debug is not None:
+        debug.update(
+            {"expression": plan.expression, "pruned_terms": plan.pruned_terms, "statements": 0, "rows": 0, "vm_steps": 0}
+        )
+    if not plan.expression:
+        return []
+    sql = _FTS_QUERY
+    params: List[Any] = [plan.expression]
+    where = ""
+    if filters is not None and not filters.is_empty():
+        where, filter_params = filters.sql_where("c")
+        sql = _FTS_FILTERED_QUERY.format(where=where)
+        params.extend(filter_params)
+    if per_doc:
+        sql = _FTS_PER_DOC_QUERY.format(where=f" AND {where}" if where else "")
+        params.append(limit * _PER_DOC_OVERFETCH)
+    params.append(limit)
+
+    bounded = deadline is not None and deadline.budget_ms is not None
+    if bounded and not deadline.check("lexical"):
+        return []
+
+    steps = [0]
+
+    def _progress() -> int:
+        steps[0] += _PROGRESS_STEPS
+        # A non-zero return interrupts the statement.
+        return 1 if bounded and deadline.expired() else 0
+
+    watch = debug is not None or bounded
+    if watch:
+        conn.set_progress_handler(_progress, _PROGRESS_STEPS)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    except sqlite3.OperationalError as exc:
+        if bounded and deadline.expired():
+            deadline.expire("lexical")
+        elif not _is_match_error(exc):
+            raise
+        elif debug is not None:
+            debug["error"] = str(exc)
+        rows = []
+    finally:
+        if watch:
+            conn.set_progress_handler(None, 0)
+    if debug is not None:
+        debug.update({"statements": 1, "rows": len(rows), "vm_steps": steps[0]})
+    return rows
+
+
+def _is_match_error(exc: sqlite3.OperationalError) -> bool:
+    # Only a MATCH expression SQLite cannot parse means "no hits"; a missing
+    # table or a locked database is a real failure.
+    message = str(exc)
+    return message.startswith("fts5: syntax error") or "malformed MATCH" in message
+
+
+def fts_storage_stats(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Database size after a WAL checkpoint, with per-table bytes when ``dbstat`` is compiled in."""
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    page_size = int(conn.execute("PRAGMA page_size").fetchone()[0])
+    stats: Dict[str, Any] = {"size_bytes": page_size * int(conn.execute("PRAGMA page_count").fetchone()[0])}
+    try:
+        rows = conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY name").fetchall()
+    except sqlite3.OperationalError:
+        return stats
+    stats["table_bytes"] = {name: int(size) for name, size in rows}
+    return stats
+
+
+def measure_fts_latency(
+    conn: sqlite3.Connection,
+    queries: List[str],
+    limit: int = 20,
+    high_df_terms: Optional[Set[str]] = None,
+    phrases: bool = True,
+) -> Dict[str, Any]:
+    """Time :func:`search_fts` over ``queries`` (warm cache) and report percentiles in milliseconds."""
+    timings: List[float] = []
+    for query in queries:
+        start = time.perf_counter()
+        search_fts(conn, query, limit=limit, high_df_terms=high_df_terms, phrases=phrases)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    if not timings:
+        return {"queries": 0}
+    return {
+        "queries": len(timings),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+    }
@@ -2,11 +2,31 @@ from __future__ import annotations
 
 import argparse
 import json
+import time
+import uuid
+from dataclasses import asdict
 from pathlib import Path
-from typing import Dict, List
-
-from unity_docs_mcp.config import Config, config_signature, load_config, vector_enabled
-from unity_docs_mcp.index.fts import ingest_chunks, init_db
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from unity_docs_mcp.config import Config, config_signature, load_config, vector_backend, vector_enabled
+from unity_docs_mcp.index.fts import (
+    build_term_stats,
+    fts_storage_stats,
+    ingest_chunks,
+    init_db,
+    load_high_df_terms,
+    measure_fts_latency,
+    resolve_fts_profile,
+)
+from unity_docs_mcp.index.similar_docs import (
+    bm25_doc_terms,
+    doc_embeddings,
+    similar_from_embeddings,
+    similar_from_terms,
+)
+from unity_docs_mcp.index.trigram import ingest_trigram_docs, init_trigram
 from unity_docs_mcp.paths import make_paths
 
 
@@ -25,6 +45,58 @@ def _remove_if_exists(path: Path) -> None:
         path.unlink()
 
 
+def _write_vector_store(config: Config, vectors: np.ndarray, faiss_path: Path, numpy_path: Path) -> Dict[str, Any]:
+    from unity_docs_mcp.index import vector_store
+
+    float32_bytes = int(vectors.shape[0] * vectors.shape[1] * 4)
+    if vector_backend(config.index.vector) == "numpy":
+        _remove_if_exists(faiss_path)
+        vector_store.save_numpy_vectors(vectors, numpy_path, dtype=config.index.vector_numpy_dtype)
+        matrix = vector_store.load_numpy_vectors(numpy_path, mmap=False)
+        return {
+            **vector_store.numpy_vector_stats(matrix, numpy_path),
+            "backend": "numpy",
+            "storage": config.index.vector_numpy_dtype,
+            "float32_bytes": float32_bytes,
+            "recall_at_10_vs_flat": round(vector_store.storage_recall(matrix, vectors), 4),
+        }
+
+    _remove_if_exists(numpy_path)
+    storage = config.index.vector_storage
+    index = vector_store.build_faiss_index(vectors, storage=storage, pq_m=config.index.vector_pq_m)
+    vector_store.save_faiss(index, faiss_path)
+    return {
+        **vector_store.faiss_index_stats(index, faiss_path),
+        "backend": "faiss",
+        "storage": storage,
+        "float32_bytes": float32_bytes,
+        "recall_at_10_vs_flat": 1.0 if storage == "flat" else round(vector_store.storage_recall(index, vectors), 4),
+    }
+
+
+def _index_text(chunk: Dict) -> str:
+    # Bakes before the index_text projection only carry the display text.
+    return chunk.get("index_text") or chunk["text"]
+
+
+def _doc_texts(chunks: List[Dict]) -> List[Tuple[str, str]]:
+    """Each doc's title and chunk index text, in first-seen order."""
+    texts: Dict[str, List[str]] = {}
+    for c in chunks:
+        texts.setdefault(c["doc_id"], [c["title"]]).append(_index_text(c))
+    return [(doc_id, " ".join(parts)) for doc_id, parts in texts.items()]
+
+
+def _latency_queries(chunks: List[Dict], count: int = 50) -> List[str]:
+    """Deterministic sample of chunk titles plus their first heading, spread across the corpus."""
+    step = max(1, len(chunks) // count)
+    queries = []
+    for c in chunks[::step][:count]:
+        heading = (c.get("heading_path") or [""])[-1]
+        queries.append(f"{c['title']} {heading}".strip() if heading != c["title"] else c["title"])
+    return queries
+
+
 def index(config: Config, dry_run: bool = False) -> Dict[str, int | bool]:
     paths = make_paths(config)
     baked_dir = paths.baked_dir
@@ -45,7 +117,9 @@ def index(config: Config, dry_run: bool = False) -> Dict[str, int | bool]:
             print(f"[dry-run] Loaded {len(chunks)} chunks. Vector mode is disabled; would build FTS only.")
         return {"chunks": len(chunks), "vectors_enabled": use_vectors}
 
-    conn = init_db(fts_db)
+    fts_profile = resolve_fts_profile(config.index.fts_profile, config.index.fts_options)
+    build_start = time.perf_counter()
+    conn = init_db(fts_db, stemming=config.index.fts_stemming, profile=fts_profile)
     ingest_chunks(
         conn,
         (
@@ -57,44 +131,106 @@ def index(config: Config, dry_run: bool = False) -> Dict[str, int | bool]:
                 "/".join(c.get("heading_path", [])),
                 c.get("origin_path", ""),
                 c.get("canonical_url", "") or "",
-                c["text"],
+                _index_text(c),
             )
             for c in chunks
         ),
     )
+    fts_stats = {
+        **build_term_stats(conn, config.index.fts_prune_df_ratio),
+        "tokenize": "porter unicode61" if config.index.fts_stemming else "unicode61",
+        "text_source": "index_text" if chunks and "index_text" in chunks[0] else "text",
+        "profile": config.index.fts_profile,
+        "options": asdict(fts_profile),
+        "build_s": round(time.perf_counter() - build_start, 3),
+    }
+    fts_stats["latency_ms"] = measure_fts_latency(
+        conn,
+        _latency_queries(chunks),
+        high_df_terms=load_high_df_terms(conn),
+        phrases=fts_profile.detail == "full",
+    )
+    if config.index.fts_trigram and init_trigram(conn):
+        fts_stats["trigram_docs"] = ingest_trigram_docs(conn, chunks)
+    else:
+        conn.execute("DROP TABLE IF EXISTS docs_trigram;")
+    fts_stats.update(fts_storage_stats(conn))
     conn.close()
 
-    vectors_path = paths.index_dir / "vectors.faiss"
+    faiss_path = paths.index_dir / "vectors.faiss"
+    numpy_path = paths.index_dir / "vectors.npy"
     meta_path = paths.index_dir / "vectors_meta.jsonl"
+    static_encoder_path = paths.index_dir / "static_encoder.npz"
+    vector_store_stats: Dict[str, Any] = {}
+    static_encoder_stats: Dict[str, Any] = {}
     if use_vectors:
         from unity_docs_mcp.index.embed import embed_texts
-        from unity_docs_mcp.index.vector_store import build_faiss_index, save_faiss
 
         embed_texts_list = [
-            f"{c['title']} {' '.join(c.get('heading_path', []))} {c['text']}" for c in chunks
+            f"{c['title']} {' '.join(c.get('heading_path', []))} {_index_text(c)}" for c in chunks
         ]
         vectors = embed_texts(
             embed_texts_list,
             model_name=config.index.embedder.model,
             device=config.index.embedder.device,
         )
-        index = build_faiss_index(vectors.astype("float32"))
-        save_faiss(index, vectors_path)
+        vector_store_stats = _write_vector_store(config, vectors.astype("float32"), faiss_path, numpy_path)
+        if config.index.query_encoder == "static":
+            from unity_docs_mcp.index.static_encoder import build_static_encoder
+
+            static_encoder_stats = build_static_encoder(
+                config.index.embedder.model,
+                config.index.embedder.device,
+                embed_texts_list,
+                static_encoder_path,
+            )
+        else:
+            _remove_if_exists(static_encoder_path)
 
         paths.index_dir.mkdir(parents=True, exist_ok=True)
         with meta_path.open("w", encoding="utf-8") as f_meta:
             for c in chunks:
                 f_meta.write(json.dumps({"chunk_id": c["chunk_id"], "doc_id": c["doc_id"]}) + "\n")
     else:
-        _remove_if_exists(vectors_path)
+        _remove_if_exists(faiss_path)
+        _remove_if_exists(numpy_path)
         _remove_if_exists(meta_path)
+        _remove_if_exists(static_encoder_path)
+
+    # Top-N similar docs per doc for related(mode="similar"): doc-level embeddings
+    # when vectors are on, BM25 term overlap otherwise.
+    similar_path = paths.index_dir / "similar_docs.npz"
+    similar_stats: Dict[str, Any] = {}
+    if config.index.similar_docs > 0:
+        similar_start = time.perf_counter()
+        if use_vectors:
+            doc_ids, doc_matrix = doc_embeddings([c["doc_id"] for c in chunks], vectors)
+            table = similar_from_embeddings(doc_ids, doc_matrix, config.index.similar_docs)
+        else:
+            table = similar_from_terms(*bm25_doc_terms(_doc_texts(chunks)), config.index.similar_docs)
+        similar_stats = {
+            **table.stats(),
+            "build_s": round(time.perf_counter() - similar_start, 3),
+            "file_bytes": table.save(similar_path),
+        }
+    else:
+        _remove_if_exists(similar_path)
 
     manifest_path = paths.index_dir / "manifest.json"
     manifest = {
         "chunks": len(chunks),
         "config_signature": config_signature(config),
         "vector_enabled": use_vectors,
+        "fts": fts_stats,
+        # Unique per build so result caches keyed on the manifest invalidate on every rebuild.
+        "generation": uuid.uuid4().hex,
     }
+    if vector_store_stats:
+        manifest["vector_store"] = vector_store_stats
+    if static_encoder_stats:
+        manifest["static_encoder"] = static_encoder_stats
+    if similar_stats:
+        manifest["similar_docs"] = similar_stats
     with manifest_path.open("w", encoding="utf-8") as f_manifest:
         json.dump(manifest, f_manifest, indent=2)
 
@@ -104,9 +240,12 @@ def index(config: Config, dry_run: bool = False) -> Dict[str, int | bool]:
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--dry-run", action="store_true", help="Load chunks and report device/model, then exit.")
+    parser.add_argument("--fts-profile", default=None, help="Override index.fts_profile for this build.")
     args = parser.parse_args()
 
     config = load_config()
+    if args.fts_profile:
+        config.index.fts_profile = args.fts_profile
     stats = index(config, dry_run=args.dry_run)
     print(f"Indexed {stats['chunks']} chunks.")
 
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from unity_docs_mcp.tiered_cache import TieredLRU
+
+
+def normalize_query(query: str) -> str:
+    # Case is kept: a cased tokenizer embeds "Mesh" and "mesh" differently.
+    return " ".join((query or "").split())
+
+
+def query_cache_key(model_name: str, query: str) -> str:
+    return hashlib.sha1(f"{model_name}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+
+def _decode_vector(stored: bytes) -> np.ndarray:
+    return np.frombuffer(stored, dtype=np.float32).reshape(1, -1)
+
+
+class QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings keyed on model plus normalized query text
+    (whitespace collapsed, case kept), with an optional SQLite tier that
+    survives restarts (see :class:`~unity_docs_mcp.tiered_cache.TieredLRU`).
+    """
+
+    def __init__(self, max_entries: int = 1024, persist_path: Optional[Path] = None):
+        self.persist_path = persist_path
+        self._cache = TieredLRU(max_entries, persist_path, encode=np.ndarray.tobytes, decode=_decode_vector)
+        self.max_entries = self._cache.max_entries
+
+    def get(self, model_name: str, query: str) -> Optional[np.ndarray]:
+        return self._cache.get(query_cache_key(model_name, query))
+
+    def put(self, model_name: str, query: str, vec: np.ndarray) -> None:
+        if not self.max_entries:
+            return
+        data = np.ascontiguousarray(np.asarray(vec, dtype=np.float32).reshape(1, -1))
+        data.setflags(write=False)
+        self._cache.put(query_cache_key(model_name, query), data)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        # Embeddings never expire.
+        stats.pop("expired")
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+class QueryBatcher:
+    """
+    Long-lived query encoder that coalesces concurrent requests.
+
+    Callers block in :meth:`encode` while a single worker thread drains the
+    queue. A query that arrives alone is encoded straight away; when others
+    are already queued behind it the worker waits up to ``window_ms`` for
+    more (at most ``max_batch``) and encodes them in one forward pass. With
+    ``window_ms <= 0`` queries are encoded inline on the calling thread.
+    """
+
+    def __init__(self, encode_fn: EncodeFn, window_ms: float = 2.0, max_batch: int = 32):
+        self.encode_fn = encode_fn
+        self.window_s = max(float(window_ms), 0.0) / 1000.0
+        self.max_batch = max(int(max_batch), 1)
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"queries": 0, "batches": 0, "largest_batch": 0}
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="query-encoder", daemon=True)
+                self._thread.start()
+
+    def _record(self, size: int) -> None:
+        with self._lock:
+            self._stats["queries"] += size
+            self._stats["batches"] += 1
+            self._stats["largest_batch"] = max(self._stats["largest_batch"], size)
+
+    def encode(self, query: str) -> np.ndarray:
+        """Return the ``(1, dim)`` embedding of ``query``."""
+        if self.window_s <= 0:
+            self._record(1)
+            return self.encode_fn([query])
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((query, future))
+        return future.result()
+
+    def _collect(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        # A lone query is encoded at once; the window only applies when other
+        # queries are already waiting, i.e. while requests actually overlap.
+        if self._queue.empty():
+            return batch
+        deadline = time.perf_counter() + self.window_s
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                vectors = self.encode_fn([query for query, _ in batch])
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            self._record(len(batch))
+            for row, (_, future) in enumerate(batch):
+                future.set_result(vectors[row : row + 1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["mean_batch"] = stats["queries"] / stats["batches"] if stats["batches"] else 0.0
+        stats["window_ms"] = self.window_s * 1000.0
+        stats["max_batch"] = self.max_batch
+        return stats
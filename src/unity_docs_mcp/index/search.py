@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import concurrent.futures
 import json
 import sqlite3
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from unity_docs_mcp.config import Config, vector_enabled
-from unity_docs_mcp.index.fts import search_fts
+import numpy as np
+
+from unity_docs_mcp.config import Config, vector_backend, vector_enabled
+from unity_docs_mcp.index.deadline import Deadline
+from unity_docs_mcp.index.filters import SearchFilters
+from unity_docs_mcp.index.fts import load_fts_profile, load_high_df_terms, search_fts
+from unity_docs_mcp.index.query_cache import QueryEmbeddingCache
+from unity_docs_mcp.index.trigram import has_trigram, search_trigram
+
+# Each widening round multiplies the candidate pool by this factor.
+_POOL_GROWTH = 4
 
 
 @dataclass
@@ -23,21 +35,127 @@ class SearchResult:
     canonical_url: Optional[str]
 
 
+def top_k_indices(scores: np.ndarray, k: int, groups: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Indices of the ``k`` highest ``scores``, best first, with ties kept in
+    position order. ``argpartition``-style selection bounds the sort to the
+    survivors (plus ties at the cut). With ``groups`` only the first index
+    of each group in that order is kept.
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, dtype=np.int64)
+    if groups is not None:
+        order = np.argsort(-scores, kind="stable")
+        _, first = np.unique(groups[order], return_index=True)
+        return order[np.sort(first)][:k]
+    if n > k:
+        cut = np.partition(scores, n - k)[n - k]
+        pool = np.flatnonzero(scores >= cut)
+    else:
+        pool = np.arange(n)
+    return pool[np.argsort(-scores[pool], kind="stable")][:k]
+
+
 class HybridSearcher:
     def __init__(self, config: Config, base_path: Path):
         self.config = config
-        self.fts_conn = sqlite3.connect(str(base_path / "fts.sqlite"))
+        self.fts_path = base_path / "fts.sqlite"
+        self.fts_conn = sqlite3.connect(str(self.fts_path))
+        # SQLite connections are per thread; the constructing thread reuses fts_conn.
+        self._local = threading.local()
+        self._local.fts_conn = self.fts_conn
+        self._leg_pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._leg_pool_lock = threading.Lock()
+        # Timed-out legs that are still running and holding a pool worker.
+        self._abandoned_legs = 0
+        self._batcher_lock = threading.Lock()
+        self.high_df_terms = load_high_df_terms(self.fts_conn)
+        self.fts_profile = load_fts_profile(self.fts_conn)
+        self.has_trigram = has_trigram(self.fts_conn)
         self.use_vectors = vector_enabled(config.index.vector)
+        self.vector_backend = vector_backend(config.index.vector)
         self.faiss_index: Optional[Any] = None
+        self.vector_matrix: Optional[np.ndarray] = None
+        self.coarse_mode = (config.index.vector_coarse or "none").strip().lower()
+        self.coarse_codes: Optional[np.ndarray] = None
         self.vector_meta: List[str] = []
-        if self.use_vectors:
-            from unity_docs_mcp.index.vector_store import load_faiss
+        # Whether the vectors are actually memory-mapped, not just configured to be.
+        self.vectors_mapped = False
+        self.vectors_path = base_path / ("vectors.npy" if self.vector_backend == "numpy" else "vectors.faiss")
+        if self.vector_backend == "numpy":
+            from unity_docs_mcp.index.vector_store import load_numpy_vectors
 
-            self.faiss_index = load_faiss(base_path / "vectors.faiss")
+            self.vector_matrix = load_numpy_vectors(self.vectors_path, mmap=config.index.vector_mmap)
+            self.vectors_mapped = isinstance(self.vector_matrix, np.memmap)
             self.vector_meta = self._load_vector_meta(base_path / "vectors_meta.jsonl")
+            if self.coarse_mode != "none":
+                from unity_docs_mcp.index.vector_store import build_coarse_codes
+
+                self.coarse_codes = build_coarse_codes(
+                    self.vector_matrix, self.coarse_mode, dims=config.index.vector_coarse_dims
+                )
+        elif self.vector_backend == "faiss":
+            if self.coarse_mode != "none":
+                raise ValueError("index.vector_coarse requires index.vector: numpy (rescoring reads the full matrix).")
+            self.vector_meta = self._load_vector_meta(base_path / "vectors_meta.jsonl")
+        # A cold FAISS load can take seconds; it runs in the background so lexical
+        # results are available at once and deadlines bound the wait for vectors.
+        self._vectors_ready = threading.Event()
+        self._vector_load_error: Optional[BaseException] = None
+        if self.vector_backend == "faiss":
+            threading.Thread(target=self._load_faiss, name="unitydocs-faiss-load", daemon=True).start()
+        else:
+            self._vectors_ready.set()
         self.chunk_meta = self._load_chunk_meta(base_path.parent / "baked" / "chunks.jsonl")
+        self._doc_first_chunk: Dict[str, str] = {}
+        for cid, row in self.chunk_meta.items():
+            self._doc_first_chunk.setdefault(row.get("doc_id", ""), cid)
+        vector_rows = [self.chunk_meta.get(cid, {}) for cid in self.vector_meta]
+        self._vector_source_types = np.array([row.get("source_type", "") for row in vector_rows], dtype=object)
+        self._vector_doc_ids = np.array([row.get("doc_id", "") for row in vector_rows], dtype=object)
+        self._vector_origin_paths = np.array([(row.get("origin_path") or "").lower() for row in vector_rows], dtype=str)
+        # Read and filled by leg-pool threads; evictions iterate it, so guard it.
+        self._mask_cache: Dict[SearchFilters, np.ndarray] = {}
+        self._mask_lock = threading.Lock()
+        # doc_id -> link-centrality prior in (0, 1]; set by DocStore from the baked link graph.
+        self._doc_prior: Dict[str, float] = {}
         self.embed_model = config.index.embedder.model
         self.embed_device = config.index.embedder.device
+        self.query_encoder = (config.index.query_encoder or "model").strip().lower()
+        self.static_encoder_path = base_path / "static_encoder.npz"
+        self.query_encoder_fallback: Optional[str] = None
+        if self.use_vectors and self.query_encoder == "static" and not self.static_encoder_path.exists():
+            # An index built before query_encoder: static has no distilled table yet.
+            # Reported under query_encoder.fallback in status.
+            self.query_encoder_fallback = f"{self.static_encoder_path.name} missing; re-run index to build it"
+            self.query_encoder = "model"
+        self._static_encoder: Optional[Any] = None
+        self._query_batcher: Optional[Any] = None
+        self.query_cache = QueryEmbeddingCache(
+            config.index.query_cache_size,
+            persist_path=base_path / "query_cache.sqlite" if config.index.query_cache_persist else None,
+        )
+
+    def set_doc_prior(self, prior: Dict[str, float]) -> None:
+        """Per-doc prior added to fused scores, scaled by ``index.pagerank_weight``."""
+        self._doc_prior = prior
+
+    def _load_faiss(self) -> None:
+        try:
+            from unity_docs_mcp.index.vector_store import load_faiss
+
+            self.faiss_index, self.vectors_mapped = load_faiss(self.vectors_path, mmap=self.config.index.vector_mmap)
+        except BaseException as exc:  # searches go lexical-only; status reports it
+            self._vector_load_error = exc
+        finally:
+            self._vectors_ready.set()
+
+    def vectors_ready(self, timeout_s: Optional[float] = None) -> bool:
+        return self._vectors_ready.wait(timeout_s)
+
+    def _vector_load_failed(self) -> bool:
+        return self._vectors_ready.is_set() and self._vector_load_error is not None
 
     def _load_vector_meta(self, path: Path) -> List[str]:
         ids: List[str] = []
@@ -55,9 +173,193 @@ class HybridSearcher:
                 if not line.strip():
                     continue
                 row = json.loads(line)
+                # Only needed at index time; snippets come from the display text.
+                row.pop("index_text", None)
                 meta[row["chunk_id"]] = row
         return meta
 
+    def vector_stats(self) -> Dict[str, Any]:
+        if self.vector_backend == "numpy" and self.vector_matrix is not None:
+            from unity_docs_mcp.index.vector_store import numpy_vector_stats
+
+            return {
+                "enabled": True,
+                "backend": "numpy",
+                "storage": str(self.vector_matrix.dtype),
+                "mmap": self.vectors_mapped,
+                "coarse": self.coarse_mode,
+                "coarse_bytes": int(self.coarse_codes.nbytes) if self.coarse_codes is not None else 0,
+                **numpy_vector_stats(self.vector_matrix, self.vectors_path),
+            }
+        if self.vector_backend == "faiss" and not self._vectors_ready.is_set():
+            return {"enabled": True, "backend": "faiss", "loading": True}
+        if self.vector_backend == "faiss" and self._vector_load_error is not None:
+            return {"enabled": True, "backend": "faiss", "load_error": str(self._vector_load_error)}
+        if self.vector_backend == "faiss" and self.faiss_index is not None:
+            from unity_docs_mcp.index.vector_store import faiss_index_stats
+
+            return {
+                "enabled": True,
+                "backend": "faiss",
+                "mmap": self.vectors_mapped,
+                **faiss_index_stats(self.faiss_index, self.vectors_path),
+            }
+        return {"enabled": False}
+
+    def query_encoder_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {"encoder": self.query_encoder if self.use_vectors else None}
+        if self.query_encoder_fallback:
+            stats["fallback"] = self.query_encoder_fallback
+        if self._query_batcher is not None:
+            stats["batching"] = self._query_batcher.stats()
+        if self.query_encoder != "static":
+            stats["cache"] = self.query_cache.stats()
+        return stats
+
+    def embed_query(self, query: str) -> np.ndarray:
+        if self.query_encoder == "static":
+            if self._static_encoder is None:
+                from unity_docs_mcp.index.static_encoder import StaticQueryEncoder
+
+                self._static_encoder = StaticQueryEncoder.load(self.static_encoder_path)
+            return self._static_encoder.encode([query])
+
+        cached = self.query_cache.get(self.embed_model, query)
+        if cached is not None:
+            return cached
+        if self._query_batcher is None:
+            from unity_docs_mcp.index.embed import encode_queries
+            from unity_docs_mcp.index.query_encoder import QueryBatcher
+
+            with self._batcher_lock:
+                if self._query_batcher is None:
+                    self._query_batcher = QueryBatcher(
+                        lambda texts: encode_queries(texts, model_name=self.embed_model, device=self.embed_device),
+                        window_ms=self.config.index.query_batch_window_ms,
+                        max_batch=self.config.index.query_batch_max,
+                    )
+        query_vec = self._query_batcher.encode(query)
+        self.query_cache.put(self.embed_model, query, query_vec)
+        return query_vec
+
+    def _vector_mask(self, filters: SearchFilters) -> Optional[np.ndarray]:
+        if filters.is_empty():
+            return None
+        with self._mask_lock:
+            mask = self._mask_cache.get(filters)
+        if mask is not None:
+            return mask
+        mask = np.ones(len(self.vector_meta), dtype=bool)
+        if filters.source_types:
+            mask &= np.isin(self._vector_source_types, filters.source_types)
+        if filters.path_prefix:
+            mask &= np.char.startswith(self._vector_origin_paths, filters.path_prefix.lower())
+        if filters.doc_ids:
+            mask &= np.isin(self._vector_doc_ids, filters.doc_ids)
+        if filters.exclude_doc_ids:
+            mask &= ~np.isin(self._vector_doc_ids, filters.exclude_doc_ids)
+        with self._mask_lock:
+            if filters not in self._mask_cache and len(self._mask_cache) >= 64:
+                self._mask_cache.pop(next(iter(self._mask_cache)))
+            self._mask_cache[filters] = mask
+        return mask
+
+    def search_vectors(
+        self,
+        query_vecs: np.ndarray,
+        k: int,
+        source_types: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> List[Dict[str, float]]:
+        """
+        Batched vector search: one ``{chunk_id: score}`` map per query row.
+        Filters become a row mask applied before top-k selection (an ID
+        selector for FAISS, or over-fetching on builds without one).
+        """
+        self._vectors_ready.wait()
+        if self._vector_load_error is not None:
+            raise self._vector_load_error
+        mask = self._vector_mask(filters or SearchFilters.build(source_types=source_types))
+        if self.vector_backend == "numpy":
+            from unity_docs_mcp.index.vector_store import search_numpy, search_two_stage
+
+            if self.coarse_codes is not None:
+                distances, indices = search_two_stage(
+                    self.vector_matrix,
+                    self.coarse_codes,
+                    query_vecs,
+                    k=k,
+                    mode=self.coarse_mode,
+                    rescore_pool=self.config.index.vector_rescore_pool,
+                    mask=mask,
+                )
+            else:
+                distances, indices = search_numpy(self.vector_matrix, query_vecs, k=k, mask=mask)
+        else:
+            from unity_docs_mcp.index.vector_store import search_faiss
+
+            distances, indices = search_faiss(self.faiss_index, query_vecs, k=k, mask=mask)
+
+        per_query: List[Dict[str, float]] = []
+        for row_scores, row_indices in zip(distances, indices):
+            scores: Dict[str, float] = {}
+            for score, idx in zip(row_scores, row_indices):
+                if idx < 0 or idx >= len(self.vector_meta):
+                    continue
+                scores[self.vector_meta[idx]] = float(score)
+            per_query.append(scores)
+        return per_query
+
+    def _fts_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "fts_conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.fts_path))
+            self._local.fts_conn = conn
+        return conn
+
+    def _vector_leg_pool(self) -> Optional[concurrent.futures.ThreadPoolExecutor]:
+        workers = int(self.config.index.retrieval_workers)
+        if workers <= 0:
+            return None
+        if self._leg_pool is None:
+            with self._leg_pool_lock:
+                if self._leg_pool is None:
+                    self._leg_pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=workers, thread_name_prefix="unitydocs-vector"
+                    )
+        return self._leg_pool
+
+    def _abandon_leg(self, future: "concurrent.futures.Future[Any]") -> None:
+        if future.cancel():
+            return
+        with self._leg_pool_lock:
+            self._abandoned_legs += 1
+
+        def _finished(_: "concurrent.futures.Future[Any]") -> None:
+            with self._leg_pool_lock:
+                self._abandoned_legs -= 1
+
+        future.add_done_callback(_finished)
+
+    def _legs_saturated(self) -> bool:
+        # cancel() cannot stop a running leg, so timed-out legs keep their worker.
+        # Once they hold every worker, a new leg would only queue behind them.
+        with self._leg_pool_lock:
+            return self._abandoned_legs >= int(self.config.index.retrieval_workers)
+
+    def _vector_leg(self, query: str, filters: SearchFilters, pool: int) -> Tuple[Dict[str, float], Dict[str, Any]]:
+        started = time.perf_counter()
+        query_vec = self.embed_query(query)
+        embedded = time.perf_counter()
+        scores = self.search_vectors(query_vec, k=pool, filters=filters)[0]
+        info = {
+            "k": pool,
+            "rows": len(scores),
+            "embed_ms": round((embedded - started) * 1000.0, 3),
+            "ms": round((time.perf_counter() - started) * 1000.0, 3),
+        }
+        return scores, info
+
     def _make_snippet(self, text: str, max_chars: int) -> str:
         if len(text) <= max_chars:
             return text
@@ -69,82 +371,262 @@ class HybridSearcher:
         k: int = 6,
         source_types: Optional[List[str]] = None,
         snippet_chars: Optional[int] = None,
+        filters: Optional[SearchFilters] = None,
+        debug: Optional[Dict[str, Any]] = None,
+        group_by: str = "chunk",
+        deadline: Optional[Deadline] = None,
+        lexical_only: bool = False,
     ) -> List[SearchResult]:
+        """
+        Fused lexical + vector search. ``group_by="doc"`` keeps only the best
+        chunk per doc, so callers get ``k`` distinct docs without over-fetching.
+        When a stage runs out of time the rest are fused as they are:
+        ``deadline.timed_out_stage`` names a stage cut short by the deadline,
+        ``deadline.degraded_stage`` one cut short by the vector leg timeout.
+        ``lexical_only`` skips the query embedding and the vector leg.
+        """
+        deadline = deadline or Deadline()
+        use_vectors = self.use_vectors and not lexical_only
+        if filters is None:
+            filters = SearchFilters.build(source_types=source_types)
+        elif source_types:
+            filters = SearchFilters.build(
+                source_types=source_types,
+                path_prefix=filters.path_prefix,
+                doc_ids=list(filters.doc_ids or []),
+                exclude_doc_ids=list(filters.exclude_doc_ids or []),
+            )
         snippet_len = snippet_chars or self.config.mcp.snippet_chars
-        lexical_hits = search_fts(self.fts_conn, query, limit=self.config.index.candidate_pool)
-        lexical_scores = {cid: 1.0 / (idx + 1) for idx, (cid, _) in enumerate(lexical_hits)}
+        # Start from a small candidate pool and widen it geometrically only while
+        # filtering or doc grouping leaves fewer than k results and a leg came
+        # back full (so a wider pool can still surface new candidates).
+        pool_max = max(int(self.config.index.candidate_pool_max), 1)
+        pool = min(max(int(self.config.index.candidate_pool), 2 * k, 1), pool_max)
+        pool_debug = {"initial": pool, "max": pool_max, "rounds": 0}
+        while True:
+            pool_debug["rounds"] += 1
+            lexical_hits, vector_scores = self._retrieve(
+                query, filters, pool, debug, deadline, per_doc=group_by == "doc", use_vectors=use_vectors
+            )
+            combined, dropped = self._fuse(
+                lexical_hits, vector_scores, filters, k, group_by, snippet_len, debug, use_vectors=use_vectors
+            )
+            saturated = len(lexical_hits) >= pool or len(vector_scores) >= pool
+            if len(combined) >= k or not dropped or not saturated or pool >= pool_max:
+                break
+            if not deadline.cacheable or not deadline.check("candidate_pool"):
+                break
+            pool = min(pool * _POOL_GROWTH, pool_max)
+        pool_debug["used"] = pool
+        if debug is not None:
+            debug["candidate_pool"] = pool_debug
+        if len(combined) < k and self.has_trigram and len(query.split()) == 1 and deadline.check("substring"):
+            combined.extend(
+                self._substring_hits(query, k - len(combined), filters, {r.doc_id for r in combined}, snippet_len, debug)
+            )
+        return combined[:k]
 
-        vector_scores: Dict[str, float] = {}
-        if self.use_vectors:
-            from unity_docs_mcp.index.embed import embed_texts
-            from unity_docs_mcp.index.vector_store import search_faiss
+    def _retrieve(
+        self,
+        query: str,
+        filters: SearchFilters,
+        pool: int,
+        debug: Optional[Dict[str, Any]],
+        deadline: Deadline,
+        per_doc: bool = False,
+        use_vectors: bool = True,
+    ) -> Tuple[List[Tuple[str, float]], Dict[str, float]]:
+        """
+        Top-``pool`` candidates from the lexical and vector legs. ``per_doc``
+        makes the lexical leg return the best chunk of each of ``pool`` docs.
+        """
+        # The vector leg (query embedding + ANN search) runs on the leg pool while
+        # this thread runs the FTS statement; both release the GIL for most of it.
+        legs_started = time.perf_counter()
+        # A failed FAISS load will not succeed on a later call; answer lexically.
+        load_failed = use_vectors and self._vector_load_failed()
+        leg_pool = self._vector_leg_pool() if use_vectors and not load_failed else None
+        saturated = leg_pool is not None and self._legs_saturated()
+        vector_future = (
+            leg_pool.submit(self._vector_leg, query, filters, pool) if leg_pool is not None and not saturated else None
+        )
+        lexical_debug = debug.setdefault("lexical", {}) if debug is not None else None
+        lexical_hits = search_fts(
+            self._fts_connection(),
+            query,
+            limit=pool,
+            filters=filters,
+            high_df_terms=self.high_df_terms,
+            debug=lexical_debug,
+            phrases=self.fts_profile.detail == "full",
+            deadline=deadline,
+            per_doc=per_doc,
+        )
+        if lexical_debug is not None:
+            lexical_debug["ms"] = round((time.perf_counter() - legs_started) * 1000.0, 3)
 
-            query_vec = embed_texts([query], model_name=self.embed_model, device=self.embed_device)
-            distances, indices = search_faiss(self.faiss_index, query_vec, k=self.config.index.candidate_pool)
-            for rank, idx in enumerate(indices[0]):
-                if idx < 0 or idx >= len(self.vector_meta):
-                    continue
-                cid = self.vector_meta[idx]
-                vector_scores[cid] = float(distances[0][rank])
-
-        combined: List[SearchResult] = []
-        seen = set()
-        # combine lexical-first ordering in both modes
-        for cid, _ in lexical_hits:
-            meta = self.chunk_meta.get(cid)
-            if not meta:
-                continue
-            if source_types and meta.get("source_type") not in source_types:
-                continue
-            if self.use_vectors:
-                score = 0.4 * lexical_scores.get(cid, 0) + 0.6 * vector_scores.get(cid, 0)
+        vector_scores: Dict[str, float] = {}
+        vector_info: Dict[str, Any] = {}
+        if vector_future is not None:
+            timeout_s = self.config.index.vector_leg_timeout_ms / 1000.0
+            remaining = max(0.0, timeout_s - (time.perf_counter() - legs_started)) if timeout_s > 0 else None
+            deadline_s = deadline.remaining_s()
+            # Only a wait cut short by the call's deadline makes the answer partial.
+            by_deadline = deadline_s is not None and (remaining is None or deadline_s <= remaining)
+            if by_deadline:
+                remaining = deadline_s
+            try:
+                vector_scores, vector_info = vector_future.result(timeout=remaining)
+            except concurrent.futures.TimeoutError:
+                # Answer from the lexical leg; a queued leg is dropped, a running one finishes unobserved.
+                self._abandon_leg(vector_future)
+                stage = "vector" if self._vectors_ready.is_set() else "vector_load"
+                if by_deadline:
+                    deadline.expire(stage)
+                else:
+                    deadline.degrade(stage)
+                vector_info = {
+                    "timed_out" if by_deadline else "leg_timed_out": True,
+                    "stage": stage,
+                    "ms": round((time.perf_counter() - legs_started) * 1000.0, 3),
+                }
+            except BaseException as exc:
+                # The background load can also fail while the leg waits on it.
+                if exc is not self._vector_load_error:
+                    raise
+                load_failed = True
+        elif saturated:
+            deadline.degrade("vector")
+            vector_info = {"skipped": True, "stage": "vector", "abandoned_legs": self._abandoned_legs}
+        elif use_vectors and not load_failed:
+            if self.vectors_ready(deadline.remaining_s()) and deadline.check("vector"):
+                load_failed = self._vector_load_failed()
+                if not load_failed:
+                    vector_scores, vector_info = self._vector_leg(query, filters, pool)
             else:
-                score = lexical_scores.get(cid, 0)
-            if cid in seen:
-                continue
-            seen.add(cid)
-            combined.append(
-                SearchResult(
-                    chunk_id=cid,
-                    doc_id=meta["doc_id"],
-                    title=meta["title"],
-                    heading_path=meta.get("heading_path", []),
-                    snippet=self._make_snippet(meta["text"], snippet_len),
-                    origin_path=meta.get("origin_path", ""),
-                    source_type=meta.get("source_type", ""),
-                    score=score,
-                    canonical_url=meta.get("canonical_url"),
-                )
-            )
+                deadline.expire("vector_load")
+                vector_info = {"timed_out": True}
+        if load_failed:
+            deadline.degrade("vector_load")
+            vector_info = {"stage": "vector_load", "error": str(self._vector_load_error)}
+        if debug is not None and use_vectors:
+            debug["vector"] = vector_info
+            debug["parallel_legs"] = vector_future is not None
 
-        if self.use_vectors:
-            # add vector-only hits if needed
-            for cid, vscore in vector_scores.items():
-                if cid in seen:
-                    continue
-                meta = self.chunk_meta.get(cid)
-                if not meta:
-                    continue
-                if source_types and meta.get("source_type") not in source_types:
-                    continue
-                score = 0.6 * vscore
-                seen.add(cid)
-                combined.append(
-                    SearchResult(
-                        chunk_id=cid,
-                        doc_id=meta["doc_id"],
-                        title=meta["title"],
-                        heading_path=meta.get("heading_path", []),
-                        snippet=self._make_snippet(meta["text"], snippet_len),
-                        origin_path=meta.get("origin_path", ""),
-                        source_type=meta.get("source_type", ""),
-                        score=score,
-                        canonical_url=meta.get("canonical_url"),
-                    )
-                )
+        return lexical_hits, vector_scores
 
-        combined.sort(key=lambda x: x.score, reverse=True)
+    def _fuse(
+        self,
+        lexical_hits: List[Tuple[str, float]],
+        vector_scores: Dict[str, float],
+        filters: SearchFilters,
+        k: int,
+        group_by: str,
+        snippet_len: int,
+        debug: Optional[Dict[str, Any]],
+        use_vectors: bool = True,
+    ) -> Tuple[List[SearchResult], int]:
+        """
+        Fused top-``k`` results and the number of candidates that filtering or
+        doc grouping discarded.
+        """
+        # Fusion runs over parallel arrays in lexical-first order; results and
+        # snippets are only built for the rows that survive top-k selection.
+        candidate_ids = [cid for cid, _ in lexical_hits]
+        n_lexical = len(candidate_ids)
+        if use_vectors:
+            lexical_set = set(candidate_ids)
+            candidate_ids.extend(cid for cid in vector_scores if cid not in lexical_set)
+        n = len(candidate_ids)
+        scores = np.zeros(n, dtype=np.float64)
+        scores[:n_lexical] = 1.0 / np.arange(1, n_lexical + 1, dtype=np.float64)
+        if use_vectors:
+            vector = np.fromiter((vector_scores.get(cid, 0.0) for cid in candidate_ids), dtype=np.float64, count=n)
+            scores = 0.4 * scores + 0.6 * vector
+        metas = [self.chunk_meta.get(cid) for cid in candidate_ids]
+        check_filters = not filters.is_empty()
+        eligible = np.fromiter(
+            (meta is not None and (not check_filters or filters.matches(meta)) for meta in metas),
+            dtype=bool,
+            count=n,
+        )
+        dropped = n - int(eligible.sum())
         min_score = self.config.mcp.min_score
         if min_score is not None:
-            combined = [item for item in combined if item.score >= min_score]
-        return combined[:k]
+            eligible &= scores >= min_score
+        prior_weight = self.config.index.pagerank_weight
+        if prior_weight and self._doc_prior:
+            # Relevance alone decides min_score; the prior only reorders near-ties towards hub pages.
+            prior = np.fromiter(
+                (self._doc_prior.get(meta["doc_id"], 0.0) if meta else 0.0 for meta in metas), dtype=np.float64, count=n
+            )
+            scores = scores + prior_weight * prior
+        rows = np.flatnonzero(eligible)
+        groups = None
+        if group_by == "doc":
+            groups = np.array([metas[i]["doc_id"] for i in rows], dtype=object)
+        selected = rows[top_k_indices(scores[rows], k, groups)]
+        if groups is not None:
+            dropped += int(rows.size - len(np.unique(groups))) if rows.size else 0
+        combined = [self._result(candidate_ids[i], metas[i], float(scores[i]), snippet_len) for i in selected]
+        if debug is not None:
+            debug["fusion"] = {"candidates": n, "eligible": int(rows.size), "materialized": len(combined)}
+        return combined, dropped
+
+    def _result(self, cid: str, meta: Dict[str, Any], score: float, snippet_len: int) -> SearchResult:
+        return SearchResult(
+            chunk_id=cid,
+            doc_id=meta["doc_id"],
+            title=meta["title"],
+            heading_path=meta.get("heading_path", []),
+            snippet=self._make_snippet(meta["text"], snippet_len),
+            origin_path=meta.get("origin_path", ""),
+            source_type=meta.get("source_type", ""),
+            score=score,
+            canonical_url=meta.get("canonical_url"),
+        )
+
+    def doc_results(
+        self,
+        doc_scores: List[Tuple[str, float]],
+        filters: Optional[SearchFilters] = None,
+        snippet_chars: Optional[int] = None,
+    ) -> List[SearchResult]:
+        """Results for already-resolved docs (first chunk of each), keeping the given order and scores."""
+        snippet_len = snippet_chars or self.config.mcp.snippet_chars
+        hits: List[SearchResult] = []
+        for doc_id, score in doc_scores:
+            cid = self._doc_first_chunk.get(doc_id)
+            meta = self.chunk_meta.get(cid) if cid else None
+            if meta and (filters is None or filters.matches(meta)):
+                hits.append(self._result(cid, meta, score, snippet_len))
+        return hits
+
+    def _substring_hits(
+        self,
+        fragment: str,
+        limit: int,
+        filters: SearchFilters,
+        seen_doc_ids: set,
+        snippet_len: int,
+        debug: Optional[Dict[str, Any]],
+    ) -> List[SearchResult]:
+        """
+        Top up short result lists for identifier/path fragments (``NativeArr``,
+        ``Vertices(``) from the trigram table, one chunk per matching doc.
+        Hits score at ``min_score`` so they rank after every fused result.
+        """
+        doc_ids = search_trigram(self._fts_connection(), fragment, limit=limit * 4 + len(seen_doc_ids))
+        score = self.config.mcp.min_score or 0.0
+        hits: List[SearchResult] = []
+        for doc_id in doc_ids:
+            cid = self._doc_first_chunk.get(doc_id)
+            meta = self.chunk_meta.get(cid) if cid else None
+            if not meta or doc_id in seen_doc_ids or not filters.matches(meta):
+                continue
+            hits.append(self._result(cid, meta, score, snippet_len))
+            if len(hits) >= limit:
+                break
+        if debug is not None:
+            debug["substring"] = {"candidates": len(doc_ids), "added": len(hits)}
+        return hits
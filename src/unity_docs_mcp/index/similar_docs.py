@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import math
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+_TERM_RE = re.compile(r"[a-z][a-z0-9_]+")
+_BLOCK_ROWS = 512
+
+
+class SimilarDocTable:
+    """
+    Precomputed nearest docs: row ``i`` of ``neighbors`` holds the rows of
+    the ``top_n`` docs most similar to ``doc_ids[i]``, best first, padded
+    with ``-1``; ``scores`` holds their similarities. ``source`` records how
+    similarity was measured (``embeddings`` or ``bm25``).
+    """
+
+    def __init__(self, doc_ids: List[str], neighbors: np.ndarray, scores: np.ndarray, source: str):
+        self.doc_ids = doc_ids
+        self.neighbors = np.asarray(neighbors, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float16)
+        self.source = source
+
+    @classmethod
+    def load(cls, path: Path) -> "SimilarDocTable":
+        with np.load(path, allow_pickle=False) as data:
+            # doc_ids travel as one UTF-8 blob rather than a fixed-width unicode array.
+            doc_ids = bytes(data["doc_ids"]).decode("utf-8").split("\n") if data["doc_ids"].size else []
+            return cls(doc_ids, data["neighbors"], data["scores"], source=str(data["source"]))
+
+    def save(self, path: Path) -> int:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("wb") as f:
+            np.savez(
+                f,
+                doc_ids=np.frombuffer("\n".join(self.doc_ids).encode("utf-8"), dtype=np.uint8),
+                neighbors=self.neighbors,
+                scores=self.scores,
+                source=np.asarray(self.source),
+            )
+        return path.stat().st_size
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "source": self.source,
+            "docs": len(self.doc_ids),
+            "top_n": int(self.neighbors.shape[1]) if self.neighbors.ndim == 2 else 0,
+            "bytes": int(self.neighbors.nbytes + self.scores.nbytes),
+        }
+
+
+def _top_n_rows(similarity: np.ndarray, rows: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Best ``top_n`` columns per row of ``similarity``, excluding each row's own doc."""
+    similarity[np.arange(len(rows)), rows] = -np.inf
+    n_cols = similarity.shape[1]
+    take = min(top_n, n_cols - 1)
+    neighbors = np.full((len(rows), top_n), -1, dtype=np.int32)
+    scores = np.zeros((len(rows), top_n), dtype=np.float32)
+    if take <= 0:
+        return neighbors, scores
+    part = np.argpartition(-similarity, take - 1, axis=1)[:, :take]
+    part_scores = np.take_along_axis(similarity, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    best = np.take_along_axis(part, order, axis=1)
+    best_scores = np.take_along_axis(part_scores, order, axis=1)
+    # Docs with nothing in common (score 0) are not neighbours.
+    keep = best_scores > 0
+    neighbors[:, :take] = np.where(keep, best, -1)
+    scores[:, :take] = np.where(keep, best_scores, 0.0)
+    return neighbors, scores
+
+
+def doc_embeddings(chunk_doc_ids: Sequence[str], vectors: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    """Mean of each doc's chunk vectors, L2-normalized, with docs in first-seen order."""
+    doc_ids = list(dict.fromkeys(chunk_doc_ids))
+    row = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+    groups = np.fromiter((row[doc_id] for doc_id in chunk_doc_ids), dtype=np.int64, count=len(chunk_doc_ids))
+    order = np.argsort(groups, kind="stable")
+    starts = np.flatnonzero(np.r_[True, np.diff(groups[order]) != 0]) if len(order) else np.zeros(0, dtype=np.int64)
+    matrix = np.add.reduceat(vectors[order].astype(np.float32), starts, axis=0) if len(order) else vectors[:0]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return doc_ids, matrix / np.maximum(norms, 1e-12)
+
+
+def similar_from_embeddings(doc_ids: List[str], matrix: np.ndarray, top_n: int) -> SimilarDocTable:
+    """Cosine neighbours from normalized doc vectors, scored in row blocks."""
+    neighbors = np.full((len(doc_ids), top_n), -1, dtype=np.int32)
+    scores = np.zeros((len(doc_ids), top_n), dtype=np.float32)
+    for start in range(0, len(doc_ids), _BLOCK_ROWS):
+        rows = np.arange(start, min(start + _BLOCK_ROWS, len(doc_ids)))
+        similarity = matrix[rows] @ matrix.T
+        neighbors[rows], scores[rows] = _top_n_rows(similarity, rows, top_n)
+    return SimilarDocTable(doc_ids, neighbors, scores, source="embeddings")
+
+
+def bm25_doc_terms(
+    docs: Iterable[Tuple[str, str]],
+    k1: float = 1.2,
+    b: float = 0.75,
+    max_df_ratio: float = 0.1,
+    max_terms: int = 64,
+) -> Tuple[List[str], List[Dict[int, float]]]:
+    """
+    Per-doc BM25 term weights (tf saturation x idf), L2-normalized so that a
+    dot product is a cosine. Terms in fewer than two docs or in more than
+    ``max_df_ratio`` of them cannot separate neighbours and are dropped; each
+    doc keeps its ``max_terms`` heaviest terms.
+    """
+    doc_ids: List[str] = []
+    counts: List[Dict[str, int]] = []
+    for doc_id, text in docs:
+        tf: Dict[str, int] = {}
+        for term in _TERM_RE.findall((text or "").lower()):
+            tf[term] = tf.get(term, 0) + 1
+        doc_ids.append(doc_id)
+        counts.append(tf)
+    n_docs = len(doc_ids)
+    df: Dict[str, int] = {}
+    for tf in counts:
+        for term in tf:
+            df[term] = df.get(term, 0) + 1
+    max_df = max(2, int(max_df_ratio * n_docs))
+    vocab = {term: i for i, term in enumerate(t for t, n in df.items() if 2 <= n <= max_df)}
+    lengths = [sum(tf.values()) for tf in counts]
+    avg_len = (sum(lengths) / n_docs) if n_docs else 0.0
+    weights: List[Dict[int, float]] = []
+    for tf, length in zip(counts, lengths):
+        norm = k1 * (1.0 - b + b * length / avg_len) if avg_len else k1
+        doc_weights = {
+            vocab[term]: math.log(1.0 + (n_docs - df[term] + 0.5) / (df[term] + 0.5)) * n * (k1 + 1.0) / (n + norm)
+            for term, n in tf.items()
+            if term in vocab
+        }
+        top = sorted(doc_weights.items(), key=lambda item: -item[1])[:max_terms]
+        scale = math.sqrt(sum(w * w for _, w in top)) or 1.0
+        weights.append({term: w / scale for term, w in top})
+    return doc_ids, weights
+
+
+def similar_from_terms(doc_ids: List[str], weights: List[Dict[int, float]], top_n: int) -> SimilarDocTable:
+    """Cosine neighbours over sparse BM25 term weights, accumulated through term postings."""
+    n_docs = len(doc_ids)
+    postings: Dict[int, Tuple[List[int], List[float]]] = {}
+    for doc, doc_weights in enumerate(weights):
+        for term, weight in doc_weights.items():
+            entry = postings.setdefault(term, ([], []))
+            entry[0].append(doc)
+            entry[1].append(weight)
+    arrays = {term: (np.asarray(d, dtype=np.int64), np.asarray(w, dtype=np.float64)) for term, (d, w) in postings.items()}
+    neighbors = np.full((n_docs, top_n), -1, dtype=np.int32)
+    scores = np.zeros((n_docs, top_n), dtype=np.float32)
+    for doc, doc_weights in enumerate(weights):
+        if not doc_weights:
+            continue
+        docs = np.concatenate([arrays[term][0] for term in doc_weights])
+        contrib = np.concatenate([arrays[term][1] * weight for term, weight in doc_weights.items()])
+        similarity = np.bincount(docs, weights=contrib, minlength=n_docs)
+        similarity[doc] = 0.0
+        # Only docs sharing a term can score; rank those instead of the whole row.
+        shared = np.flatnonzero(similarity > 0)
+        if shared.size > top_n:
+            shared = shared[np.argpartition(-similarity[shared], top_n - 1)[:top_n]]
+        shared = shared[np.argsort(-similarity[shared], kind="stable")]
+        neighbors[doc, : shared.size] = shared
+        scores[doc, : shared.size] = similarity[shared]
+    return SimilarDocTable(doc_ids, neighbors, scores, source="bm25")
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+_SPECIAL_PREFIX = "["
+
+
+def _is_punctuation(char: str) -> bool:
+    code = ord(char)
+    if 33 <= code <= 47 or 58 <= code <= 64 or 91 <= code <= 96 or 123 <= code <= 126:
+        return True
+    return unicodedata.category(char).startswith("P")
+
+
+def _basic_tokens(text: str, lowercase: bool) -> List[str]:
+    if lowercase:
+        text = unicodedata.normalize("NFD", text.lower())
+        text = "".join(ch for ch in text if unicodedata.category(ch) != "Mn")
+    tokens: List[str] = []
+    current: List[str] = []
+    for char in text:
+        if char.isspace():
+            if current:
+                tokens.append("".join(current))
+                current = []
+        elif _is_punctuation(char):
+            if current:
+                tokens.append("".join(current))
+                current = []
+            tokens.append(char)
+        else:
+            current.append(char)
+    if current:
+        tokens.append("".join(current))
+    return tokens
+
+
+class StaticQueryEncoder:
+    """
+    Token-to-vector lookup table distilled from the configured embedder.
+
+    Queries are WordPiece-tokenized in pure Python, the matching rows are
+    averaged with IDF weights, and the result is L2-normalized, so no torch
+    import or transformer forward pass happens at query time.
+    """
+
+    def __init__(self, tokens: List[str], table: np.ndarray, weights: np.ndarray, lowercase: bool = True):
+        self.vocab = {token: idx for idx, token in enumerate(tokens)}
+        self.table = table
+        self.weights = weights
+        self.lowercase = lowercase
+        self.dim = int(table.shape[1])
+
+    @classmethod
+    def load(cls, path: Path) -> "StaticQueryEncoder":
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                tokens=[str(t) for t in data["tokens"]],
+                table=np.asarray(data["table"]),
+                weights=np.asarray(data["weights"], dtype=np.float32),
+                lowercase=bool(data["lowercase"]),
+            )
+
+    def tokenize(self, text: str) -> List[int]:
+        ids: List[int] = []
+        for word in _basic_tokens(text, self.lowercase):
+            if len(word) > 100:
+                continue
+            start = 0
+            pieces: List[int] = []
+            while start < len(word):
+                end = len(word)
+                match: Optional[int] = None
+                while start < end:
+                    piece = word[start:end] if start == 0 else "##" + word[start:end]
+                    match = self.vocab.get(piece)
+                    if match is not None:
+                        break
+                    end -= 1
+                if match is None:
+                    pieces = []
+                    break
+                pieces.append(match)
+                start = end
+            ids.extend(pieces)
+        return ids
+
+    def encode(self, texts: Iterable[str]) -> np.ndarray:
+        rows = []
+        for text in texts:
+            ids = self.tokenize(text)
+            vec = np.zeros(self.dim, dtype=np.float32)
+            if ids:
+                weights = self.weights[ids]
+                vec = weights @ np.asarray(self.table[ids], dtype=np.float32)
+            norm = float(np.linalg.norm(vec))
+            rows.append(vec / norm if norm > 0 else vec)
+        return np.vstack(rows) if rows else np.zeros((0, self.dim), dtype=np.float32)
+
+
+def build_static_encoder(
+    model_name: str,
+    device: str,
+    corpus_texts: List[str],
+    out_path: Path,
+    batch_size: int = 512,
+) -> dict:
+    """
+    Distil ``model_name`` into a static table: every WordPiece vocabulary
+    entry is embedded once by the transformer, and token IDF over the
+    corpus becomes the pooling weight.
+    """
+    from unity_docs_mcp.index.embed import _load_model, _select_device
+
+    model = _load_model(model_name, _select_device(device))
+    tokenizer = model.tokenizer
+    vocab = tokenizer.get_vocab()
+    if not any(token.startswith("##") for token in vocab):
+        raise RuntimeError(f"Static query encoder supports WordPiece tokenizers only; {model_name} is not one.")
+
+    tokens = [token for token, _ in sorted(vocab.items(), key=lambda item: item[1])]
+    surface = [token[2:] if token.startswith("##") else token for token in tokens]
+    usable = [i for i, token in enumerate(tokens) if token and not token.startswith(_SPECIAL_PREFIX)]
+    embedded = model.encode(
+        [surface[i] for i in usable],
+        batch_size=batch_size,
+        normalize_embeddings=True,
+        convert_to_numpy=True,
+        show_progress_bar=False,
+    )
+    table = np.zeros((len(tokens), embedded.shape[1]), dtype=np.float16)
+    table[usable] = embedded.astype(np.float16)
+
+    doc_freq = np.zeros(len(tokens), dtype=np.int64)
+    for start in range(0, len(corpus_texts), batch_size):
+        encoded = tokenizer(corpus_texts[start : start + batch_size], add_special_tokens=False)["input_ids"]
+        for ids in encoded:
+            doc_freq[np.unique(np.asarray(ids, dtype=np.int64))] += 1
+    weights = np.log1p(max(len(corpus_texts), 1) / (doc_freq + 1)).astype(np.float32)
+    special = np.ones(len(tokens), dtype=bool)
+    special[usable] = False
+    weights[special] = 0.0
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(
+        out_path,
+        tokens=np.asarray(tokens),
+        table=table,
+        weights=weights,
+        lowercase=np.asarray(bool(getattr(tokenizer, "do_lower_case", True))),
+    )
+    return {
+        "model": model_name,
+        "vocab_size": len(tokens),
+        "dim": int(table.shape[1]),
+        "table_bytes": int(table.nbytes),
+        "file_bytes": out_path.stat().st_size if out_path.exists() else 0,
+    }
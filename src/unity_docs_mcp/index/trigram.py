@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Column weights for the trigram table (doc_id, title, heading_paths, origin_path, identifiers).
+_TRIGRAM_RANK = "bm25(4.0, 6.0, 1.0, 2.0, 1.0)"
+TRIGRAM_COLUMNS = ("doc_id", "title", "heading_paths", "origin_path", "identifiers")
+_CODE_IDENTIFIER_RE = re.compile(
+    r"[A-Za-z_][A-Za-z0-9_]+(?:\.[A-Za-z_][A-Za-z0-9_]+)+"  # dotted: Mesh.SetVertices
+    r"|[A-Za-z_]*(?:[a-z0-9][A-Z]|[A-Z]{2}[a-z])[A-Za-z0-9_]*"  # camel/acronym: NativeArray, URPAsset
+)
+# Trimmed from fragment ends: call parentheses, generic brackets, quotes and punctuation.
+_FRAGMENT_STRIP = " \t\r\n()[]{}<>\"'`,;:!?"
+
+
+def init_trigram(conn: sqlite3.Connection) -> bool:
+    """Create the per-doc trigram table. Returns False when SQLite lacks the trigram tokenizer."""
+    conn.execute("DROP TABLE IF EXISTS docs_trigram;")
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE docs_trigram USING fts5("
+            "doc_id, title, heading_paths, origin_path, identifiers, tokenize = 'trigram');"
+        )
+    except sqlite3.OperationalError:
+        # The trigram tokenizer needs SQLite 3.34+.
+        return False
+    conn.execute("INSERT INTO docs_trigram(docs_trigram, rank) VALUES('rank', ?);", (_TRIGRAM_RANK,))
+    return True
+
+
+def code_identifiers(text: str) -> List[str]:
+    """Dotted or camel-case identifiers in ``text``, in first-seen order."""
+    seen: Dict[str, None] = {}
+    for identifier in _CODE_IDENTIFIER_RE.findall(text or ""):
+        seen.setdefault(identifier, None)
+    return list(seen)
+
+
+def ingest_trigram_docs(conn: sqlite3.Connection, chunks: Iterable[Dict]) -> int:
+    """Aggregate chunk rows into one trigram row per doc."""
+    docs: Dict[str, Dict] = {}
+    for chunk in chunks:
+        doc = docs.setdefault(
+            chunk["doc_id"],
+            {"title": chunk.get("title", ""), "origin_path": chunk.get("origin_path", ""), "headings": {}, "identifiers": {}},
+        )
+        heading = "/".join(chunk.get("heading_path", []))
+        if heading:
+            doc["headings"].setdefault(heading, None)
+        for identifier in code_identifiers(chunk.get("index_text") or chunk.get("text", "")):
+            doc["identifiers"].setdefault(identifier, None)
+    with conn:
+        conn.executemany(
+            "INSERT INTO docs_trigram(doc_id, title, heading_paths, origin_path, identifiers) VALUES (?, ?, ?, ?, ?)",
+            [
+                (doc_id, doc["title"], "\n".join(doc["headings"]), doc["origin_path"], " ".join(doc["identifiers"]))
+                for doc_id, doc in docs.items()
+            ],
+        )
+    return len(docs)
+
+
+def has_trigram(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'docs_trigram'").fetchone()
+    return row is not None
+
+
+def normalize_fragment(fragment: str) -> str:
+    return (fragment or "").strip(_FRAGMENT_STRIP)
+
+
+def search_trigram(
+    conn: sqlite3.Connection,
+    fragment: str,
+    limit: Optional[int] = 50,
+    columns: Sequence[str] = TRIGRAM_COLUMNS,
+) -> List[str]:
+    """
+    Case-insensitive substring lookup: doc_ids whose ``columns`` contain
+    ``fragment``, best bm25 first. Fragments shorter than three characters
+    cannot be answered by a trigram index and return nothing.
+    """
+    text = normalize_fragment(fragment)
+    if len(text) < 3:
+        return []
+    expression = "{" + " ".join(columns) + '} : "' + text.replace('"', '""') + '"'
+    sql = "SELECT doc_id FROM docs_trigram WHERE docs_trigram MATCH ? ORDER BY rank"
+    params: List[object] = [expression]
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    try:
+        return [row[0] for row in conn.execute(sql, params)]
+    except sqlite3.OperationalError:
+        return []
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+VECTOR_STORAGE_MODES = ("flat", "fp16", "sq8", "pq")
+
 
 def _import_faiss() -> Any:
     try:
@@ -14,11 +16,33 @@ def _import_faiss() -> Any:
     return faiss
 
 
-def build_faiss_index(vectors: np.ndarray) -> Any:
+def _storage_mode(storage: str) -> str:
+    mode = (storage or "flat").strip().lower()
+    if mode not in VECTOR_STORAGE_MODES:
+        raise ValueError(f"Unsupported vector_storage: {storage}. Expected one of: {', '.join(VECTOR_STORAGE_MODES)}")
+    return mode
+
+
+def build_faiss_index(vectors: np.ndarray, storage: str = "flat", pq_m: int = 48) -> Any:
     faiss = _import_faiss()
-    dim = vectors.shape[1]
-    index = faiss.IndexFlatIP(dim)
-    index.add(vectors.astype("float32"))
+    data = np.ascontiguousarray(vectors.astype("float32"))
+    dim = data.shape[1]
+    mode = _storage_mode(storage)
+    if mode == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif mode == "fp16":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_INNER_PRODUCT)
+    elif mode == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+    else:
+        if dim % pq_m != 0:
+            raise ValueError(f"vector_pq_m={pq_m} must divide the embedding dimension ({dim}).")
+        # 8 bits per sub-quantizer needs 256 centroids; fall back to fewer bits on tiny corpora.
+        nbits = 8 if len(data) >= 256 else max(1, int(np.log2(max(len(data), 2))))
+        index = faiss.IndexPQ(dim, pq_m, nbits, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(data)
+    index.add(data)
     return index
 
 
@@ -28,10 +52,254 @@ def save_faiss(index: Any, path: Path) -> None:
     faiss.write_index(index, str(path))
 
 
-def load_faiss(path: Path) -> Any:
+def load_faiss(path: Path, mmap: bool = False) -> Tuple[Any, bool]:
+    """
+    Load a FAISS index. With ``mmap`` the flat/SQ/PQ code arrays are mapped
+    read-only, so every server process shares one copy via the page cache.
+    Returns ``(index, mapped)``; ``mapped`` is False when the index was read
+    into memory, including when this FAISS build could not map it.
+    """
     faiss = _import_faiss()
-    return faiss.read_index(str(path))
+    if mmap:
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+        try:
+            return faiss.read_index(str(path), flags), True
+        except Exception:
+            # Older FAISS builds cannot map every index type; read into memory instead.
+            pass
+    return faiss.read_index(str(path)), False
+
+
+def search_faiss(
+    index: Any,
+    query_vec: np.ndarray,
+    k: int = 10,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k FAISS search. ``mask`` restricts hits to allowed rows through an ID
+    selector; builds without selector support over-fetch and filter instead.
+    """
+    queries = np.ascontiguousarray(np.atleast_2d(query_vec), dtype=np.float32)
+    if mask is None:
+        return index.search(queries, k)
+    faiss = _import_faiss()
+    allowed = np.flatnonzero(mask).astype(np.int64)
+    try:
+        params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(len(allowed), faiss.swig_ptr(allowed)))
+        return index.search(queries, k, params=params)
+    except Exception:
+        pass
+    fetch = min(int(index.ntotal), max(k, int(k * len(mask) / max(len(allowed), 1))))
+    distances, indices = index.search(queries, fetch)
+    out_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    out_indices = np.full((len(queries), k), -1, dtype=np.int64)
+    for row in range(len(queries)):
+        keep = [i for i, idx in enumerate(indices[row]) if idx >= 0 and mask[idx]][:k]
+        out_scores[row, : len(keep)] = distances[row, keep]
+        out_indices[row, : len(keep)] = indices[row, keep]
+    return out_scores, out_indices
+
+
+def storage_recall(index: Any, vectors: np.ndarray, k: int = 10, sample: int = 256, seed: int = 0) -> float:
+    """
+    Estimate recall@k of ``index`` (a FAISS index or a stored NumPy matrix)
+    against exact inner product, using a sample of the indexed vectors as
+    queries.
+    """
+    data = vectors.astype("float32")
+    if len(data) == 0:
+        return 1.0
+    k = min(k, len(data))
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(data), size=min(sample, len(data)), replace=False)
+    queries = data[picks]
+    exact_scores = queries @ data.T
+    exact_top = np.argpartition(-exact_scores, k - 1, axis=1)[:, :k]
+    if isinstance(index, np.ndarray):
+        _, approx_top = search_numpy(index, queries, k=k)
+    else:
+        _, approx_top = search_faiss(index, queries, k=k)
+    hits = sum(len(set(exact_top[i]) & set(approx_top[i])) for i in range(len(queries)))
+    return hits / float(len(queries) * k)
+
+
+def faiss_storage_mode(index: Any) -> str:
+    """The ``vector_storage`` mode an index was built with, read from its type."""
+    name = type(index).__name__
+    if name == "IndexPQ":
+        return "pq"
+    if name == "IndexScalarQuantizer":
+        faiss = _import_faiss()
+        return "fp16" if index.sq.qtype == faiss.ScalarQuantizer.QT_fp16 else "sq8"
+    return "flat"
+
+
+def faiss_index_stats(index: Any, path: Path) -> Dict[str, Any]:
+    code_size = int(getattr(index, "code_size", 0) or 0)
+    ntotal = int(getattr(index, "ntotal", 0) or 0)
+    return {
+        "index_type": type(index).__name__,
+        "storage": faiss_storage_mode(index),
+        "ntotal": ntotal,
+        "dim": int(getattr(index, "d", 0) or 0),
+        "bytes_per_vector": code_size,
+        "code_bytes": code_size * ntotal,
+        "file_bytes": path.stat().st_size if path.exists() else 0,
+    }
+
+
+NUMPY_VECTOR_DTYPES = ("float16", "float32")
+
+
+def save_numpy_vectors(vectors: np.ndarray, path: Path, dtype: str = "float16") -> None:
+    if dtype not in NUMPY_VECTOR_DTYPES:
+        raise ValueError(f"Unsupported vector_numpy_dtype: {dtype}. Expected one of: {', '.join(NUMPY_VECTOR_DTYPES)}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, np.ascontiguousarray(vectors, dtype=dtype))
+
+
+def load_numpy_vectors(path: Path, mmap: bool = True) -> np.ndarray:
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def search_numpy(
+    matrix: np.ndarray,
+    query_vecs: np.ndarray,
+    k: int = 10,
+    mask: Optional[np.ndarray] = None,
+    block_rows: int = 16384,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact inner-product top-k over a (possibly memory-mapped float16) matrix.
+
+    Rows are scored block by block so at most ``block_rows`` float16 rows are
+    upcast to float32 at a time (float32 matrices are used in place); each
+    block keeps its own ``argpartition`` top-k and the survivors are merged at
+    the end. ``mask`` is a boolean row filter. Returns ``(scores, indices)``
+    shaped like FAISS output, padded with ``-1``.
+    """
+    queries = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+    n_queries = queries.shape[0]
+    total = matrix.shape[0]
+    k = max(0, min(k, total))
+    if k == 0:
+        return np.empty((n_queries, 0), dtype=np.float32), np.empty((n_queries, 0), dtype=np.int64)
+
+    block_scores: List[np.ndarray] = []
+    block_indices: List[np.ndarray] = []
+    for start in range(0, total, block_rows):
+        stop = min(start + block_rows, total)
+        scores = np.asarray(matrix[start:stop], dtype=np.float32) @ queries.T
+        scores = scores.T
+        if mask is not None:
+            scores[:, ~mask[start:stop]] = -np.inf
+        take = min(k, stop - start)
+        top = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+        block_scores.append(np.take_along_axis(scores, top, axis=1))
+        block_indices.append(top + start)
+
+    merged_scores = np.concatenate(block_scores, axis=1)
+    merged_indices = np.concatenate(block_indices, axis=1)
+    top = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(merged_scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    out_scores = np.take_along_axis(top_scores, order, axis=1)
+    out_indices = np.take_along_axis(np.take_along_axis(merged_indices, top, axis=1), order, axis=1)
+    out_indices[~np.isfinite(out_scores)] = -1
+    return out_scores, out_indices
+
+
+def numpy_vector_stats(matrix: np.ndarray, path: Path) -> Dict[str, Any]:
+    return {
+        "index_type": "numpy",
+        "ntotal": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+        "dtype": str(matrix.dtype),
+        "bytes_per_vector": int(matrix.shape[1] * matrix.dtype.itemsize) if matrix.ndim == 2 else 0,
+        "code_bytes": int(matrix.nbytes),
+        "file_bytes": path.stat().st_size if path.exists() else 0,
+    }
+
+
+VECTOR_COARSE_MODES = ("none", "binary", "truncate")
+_POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount_rows(codes: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(codes).sum(axis=1, dtype=np.int32)
+    return _POPCOUNT_LUT[codes.view(np.uint8)].sum(axis=1, dtype=np.int32)
+
+
+def build_coarse_codes(matrix: np.ndarray, mode: str, dims: int = 128, block_rows: int = 16384) -> np.ndarray:
+    """
+    Build the in-memory first-stage representation for two-stage search.
+
+    ``binary`` keeps one sign bit per dimension (packed, viewed as uint64 when
+    the width allows); ``truncate`` keeps the first ``dims`` dimensions
+    re-normalized, which suits Matryoshka-trained embedders.
+    """
+    if mode not in VECTOR_COARSE_MODES or mode == "none":
+        raise ValueError(f"Unsupported vector_coarse: {mode}. Expected one of: binary, truncate")
+    parts: List[np.ndarray] = []
+    for start in range(0, matrix.shape[0], block_rows):
+        block = np.asarray(matrix[start : start + block_rows], dtype=np.float32)
+        if mode == "binary":
+            parts.append(np.packbits(block > 0, axis=1))
+        else:
+            head = block[:, :dims]
+            norms = np.linalg.norm(head, axis=1, keepdims=True)
+            parts.append(head / np.maximum(norms, 1e-12))
+    codes = np.ascontiguousarray(np.concatenate(parts) if parts else np.empty((0, 0), dtype=np.float32))
+    if mode == "binary" and codes.shape[1] % 8 == 0:
+        return codes.view(np.uint64)
+    return codes
+
+
+def _coarse_scores(codes: np.ndarray, query: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "binary":
+        query_code = np.packbits(query > 0).view(codes.dtype) if codes.dtype == np.uint64 else np.packbits(query > 0)
+        # Higher is better, so negate the Hamming distance.
+        return -_popcount_rows(np.bitwise_xor(codes, query_code)).astype(np.float32)
+    head = query[: codes.shape[1]]
+    return codes @ (head / max(float(np.linalg.norm(head)), 1e-12))
 
 
-def search_faiss(index: Any, query_vec: np.ndarray, k: int = 10) -> Tuple[np.ndarray, np.ndarray]:
-    return index.search(query_vec.astype("float32"), k)
+def search_two_stage(
+    matrix: np.ndarray,
+    codes: np.ndarray,
+    query_vecs: np.ndarray,
+    k: int = 10,
+    mode: str = "binary",
+    rescore_pool: int = 256,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Coarse Hamming / truncated-dimension pass over ``codes``, then exact
+    inner-product rescoring of the best ``rescore_pool`` rows of ``matrix``.
+    Output matches :func:`search_numpy`.
+    """
+    queries = np.atleast_2d(np.asarray(query_vecs, dtype=np.float32))
+    total = matrix.shape[0]
+    k = max(0, min(k, total))
+    out_scores = np.full((queries.shape[0], k), -np.inf, dtype=np.float32)
+    out_indices = np.full((queries.shape[0], k), -1, dtype=np.int64)
+    if k == 0:
+        return out_scores, out_indices
+    pool = min(max(rescore_pool, k), total)
+    for row, query in enumerate(queries):
+        coarse = _coarse_scores(codes, query, mode)
+        if mask is not None:
+            coarse[~mask] = -np.inf
+        candidates = np.argpartition(-coarse, pool - 1)[:pool]
+        candidates = candidates[np.isfinite(coarse[candidates])]
+        if len(candidates) == 0:
+            continue
+        candidates.sort()  # sequential reads from a memory-mapped matrix
+        exact = np.asarray(matrix[candidates], dtype=np.float32) @ query
+        take = min(k, len(candidates))
+        order = np.argsort(-exact, kind="stable")[:take]
+        out_scores[row, :take] = exact[order]
+        out_indices[row, :take] = candidates[order]
+    return out_scores, out_indices
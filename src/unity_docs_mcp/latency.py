@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+import math
+from typing import Iterable
+
+
+def percentile(values: Iterable[float], pct: float) -> float:
+    """Nearest-rank percentile (``pct`` in 0..100) of ``values``; 0.0 when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return float(ordered[min(len(ordered), max(1, rank)) - 1])
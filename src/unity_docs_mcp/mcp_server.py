@@ -1,50 +1,62 @@
 from __future__ import annotations
 
 import contextlib
+import functools
 import json
 import asyncio
 import os
 import sys
+import threading
 from pathlib import Path
 from typing import Any, List, Optional
 
+import anyio
 from mcp.server.fastmcp import FastMCP
 
 from unity_docs_mcp.config import load_config, retrieval_mode
+from unity_docs_mcp.index.deadline import Deadline
 from unity_docs_mcp.setup.ensure_artifacts import ensure
-from unity_docs_mcp.tools.ops import DocStore
+from unity_docs_mcp.tools.ops import RELATED_MODES, RELATED_ORDERS, DocStore
 
 app = FastMCP("unity-docs")
 
 _docstore: Optional[DocStore] = None
 _ensured: bool = False
+# Tool calls run on worker threads; concurrent first calls must not run
+# ensure() or build the DocStore twice.
+_docstore_lock = threading.Lock()
 
 
 def _get_docstore() -> DocStore:
     """
-    FastMCP version in this environment lacks startup hooks, so we lazily
-    initialize on first tool call and keep a singleton for reuse.
+    FastMCP version in this environment lacks startup hooks. The servers
+    build the singleton in ``_ensure_startup`` before serving; otherwise it is
+    built on the first tool call and reused.
     """
     global _docstore
     global _ensured
     if _docstore is None:
-        config = load_config()
-        if not _ensured:
-            with contextlib.redirect_stdout(sys.stderr):
-                ensure(config)
-            _ensured = True
-        _docstore = DocStore(config)
+        with _docstore_lock:
+            if _docstore is None:
+                config = load_config()
+                if not _ensured:
+                    # stdout is process-global, so it is only redirected on the
+                    # startup path (main thread), never from a tool's worker thread.
+                    ensure(config)
+                    _ensured = True
+                _docstore = DocStore(config)
     return _docstore
 
 
 def _ensure_startup() -> None:
+    """Ensure artifacts and build the DocStore on the main thread, before serving."""
     global _ensured
-    if _ensured:
-        return
-    config = load_config()
     with contextlib.redirect_stdout(sys.stderr):
-        ensure(config)
-    _ensured = True
+        with _docstore_lock:
+            if not _ensured:
+                ensure(load_config())
+                _ensured = True
+        _get_docstore()
 
 
 def _read_manifest(path: Path) -> dict:
@@ -127,17 +139,63 @@ def _group_results_by_doc(results: list[Any], limit: int) -> list[Any]:
     return grouped
 
 
+def _start_deadline(docstore: DocStore, deadline_ms: Optional[float]) -> Deadline:
+    """Budget for one tool call: the caller's ``deadline_ms`` or the ``mcp.deadline_ms`` default."""
+    return Deadline(docstore.config.mcp.deadline_ms if deadline_ms is None else deadline_ms)
+
+
+def _partial_response(results: List[dict], deadline: Deadline, meta: dict) -> dict:
+    return {"results": results, "partial": True, "timed_out_stage": deadline.timed_out_stage, "meta": meta}
+
+
 @app.tool()
-def search(
+async def search(
     query: str,
     k: int = 6,
     source_types: Optional[List[str] | str] = None,
     group_by: str = "doc",
     debug: bool = False,
+    path_prefix: Optional[str] = None,
+    doc_ids: Optional[List[str] | str] = None,
+    exclude_doc_ids: Optional[List[str] | str] = None,
+    deadline_ms: Optional[float] = None,
+) -> List[dict] | dict:
+    # FastMCP runs sync tools inline on the event loop, one call at a time. A
+    # worker thread per call lets concurrent searches overlap, so their query
+    # embeddings can share one encoder batch.
+    return await anyio.to_thread.run_sync(
+        functools.partial(
+            _search,
+            query,
+            k=k,
+            source_types=source_types,
+            group_by=group_by,
+            debug=debug,
+            path_prefix=path_prefix,
+            doc_ids=doc_ids,
+            exclude_doc_ids=exclude_doc_ids,
+            deadline_ms=deadline_ms,
+        )
+    )
+
+
+def _search(
+    query: str,
+    k: int,
+    source_types: Optional[List[str] | str],
+    group_by: str,
+    debug: bool,
+    path_prefix: Optional[str],
+    doc_ids: Optional[List[str] | str],
+    exclude_doc_ids: Optional[List[str] | str],
+    deadline_ms: Optional[float],
 ) -> List[dict] | dict:
     docstore = _get_docstore()
     meta = _response_meta(docstore)
+    deadline = _start_deadline(docstore, deadline_ms)
     parsed_source_types = _parse_source_types(source_types)
+    parsed_doc_ids = _parse_string_list(doc_ids)
+    parsed_exclude_doc_ids = _parse_string_list(exclude_doc_ids)
     group_by_norm = (group_by or "doc").strip().lower()
     allowed_group_by = {"doc", "chunk"}
     if group_by_norm not in allowed_group_by:
@@ -178,33 +236,52 @@ def search(
             "meta": meta,
         }
 
-    raw_k = k if group_by_norm == "chunk" else max(k * 5, k)
-    raw_results = docstore.search(query=query, k=raw_k, source_types=parsed_source_types)
+    retrieval_debug: Optional[dict] = {} if debug else None
+    # Doc grouping happens inside the searcher, so k results are k distinct docs.
+    raw_results = docstore.search(
+        query=query,
+        k=k,
+        source_types=parsed_source_types,
+        path_prefix=path_prefix,
+        doc_ids=parsed_doc_ids,
+        exclude_doc_ids=parsed_exclude_doc_ids,
+        debug=retrieval_debug,
+        group_by=group_by_norm,
+        deadline=deadline,
+    )
     results = raw_results[:k] if group_by_norm == "chunk" else _group_results_by_doc(raw_results, limit=k)
     serialized = _serialize_search_results(results, meta)
     if not debug:
-        return serialized
+        return _partial_response(serialized, deadline, meta) if deadline.partial else serialized
     return {
         "results": serialized,
+        "partial": deadline.partial,
+        "timed_out_stage": deadline.timed_out_stage,
         "meta": meta,
         "debug": {
             "query": query,
             "k": k,
             "group_by": group_by_norm,
             "requested_source_types": parsed_source_types or [],
+            "path_prefix": path_prefix,
+            "doc_ids": parsed_doc_ids or [],
+            "exclude_doc_ids": parsed_exclude_doc_ids or [],
             "available_source_types": available_source_types,
             "known_source_types": known_source_types,
             "retrieval_mode": meta["retrieval_mode"],
+            "deadline_ms": deadline.budget_ms,
             "raw_result_count": len(raw_results),
             "result_count": len(serialized),
+            "retrieval": retrieval_debug,
         },
     }
 
 
 @app.tool()
-def resolve_symbol(symbol: str, limit: int = 5) -> dict:
+def resolve_symbol(symbol: str, limit: int = 5, deadline_ms: Optional[float] = None, prefix: bool = False) -> dict:
     docstore = _get_docstore()
     meta = _response_meta(docstore)
+    deadline = _start_deadline(docstore, deadline_ms)
     symbol_text = (symbol or "").strip()
     if not symbol_text:
         return {
@@ -212,12 +289,15 @@ def resolve_symbol(symbol: str, limit: int = 5) -> dict:
             "message": "symbol must be a non-empty string.",
             "meta": meta,
         }
-    matches = docstore.resolve_symbol(symbol=symbol_text, limit=limit)
-    return {
+    matches = docstore.resolve_symbol(symbol=symbol_text, limit=limit, deadline=deadline, prefix=prefix)
+    response = {
         "symbol": symbol_text,
         "results": [{**m, "meta": meta} for m in matches],
         "meta": meta,
     }
+    if deadline.partial:
+        response.update(partial=True, timed_out_stage=deadline.timed_out_stage)
+    return response
 
 
 @app.tool()
@@ -253,10 +333,19 @@ def open(
 
 
 @app.tool()
-def list_files(pattern: str, limit: int = 20) -> List[dict]:
+def list_files(pattern: str, limit: int = 20, order: str = "path") -> List[dict] | dict:
     docstore = _get_docstore()
     meta = _response_meta(docstore)
-    matches = docstore.list_files(pattern=pattern, limit=limit)
+    order_norm = (order or "path").strip().lower()
+    allowed_orders = {"path", "title"}
+    if order_norm not in allowed_orders:
+        return {
+            "error": "invalid_order",
+            "message": f"Unsupported order: {order}",
+            "allowed_orders": sorted(allowed_orders),
+            "meta": meta,
+        }
+    matches = docstore.list_files(pattern=pattern, limit=limit, order=order_norm)
     return [
         {
             "doc_id": m.doc_id,
@@ -279,9 +368,14 @@ def related(
     exclude_doc_ids: Optional[List[str] | str] = None,
     exclude_source_types: Optional[List[str] | str] = None,
     exclude_glossary: bool = False,
+    deadline_ms: Optional[float] = None,
+    depth: int = 1,
+    max_nodes: Optional[int] = None,
+    order: str = "link",
 ) -> List[dict] | dict:
     docstore = _get_docstore()
     meta = _response_meta(docstore)
+    deadline = _start_deadline(docstore, deadline_ms)
     resolved_doc_id = doc_id
     if not resolved_doc_id and path:
         record = docstore.open_doc(path=path)
@@ -296,12 +390,25 @@ def related(
         }
 
     mode_norm = (mode or "outgoing").strip().lower()
-    allowed_modes = {"outgoing", "incoming", "bidirectional"}
-    if mode_norm not in allowed_modes:
+    if mode_norm not in RELATED_MODES:
         return {
             "error": "invalid_mode",
             "message": f"Unsupported mode: {mode}",
-            "allowed_modes": sorted(allowed_modes),
+            "allowed_modes": sorted(RELATED_MODES),
+            "meta": meta,
+        }
+    if mode_norm == "similar" and not docstore.has_similar_docs():
+        return {
+            "error": "similar_unavailable",
+            "message": "No similar-docs table in the index; rebuild it with index.similar_docs > 0.",
+            "meta": meta,
+        }
+    order_norm = (order or "link").strip().lower()
+    if order_norm not in RELATED_ORDERS:
+        return {
+            "error": "invalid_order",
+            "message": f"Unsupported order: {order}",
+            "allowed_orders": sorted(RELATED_ORDERS),
             "meta": meta,
         }
 
@@ -316,8 +423,12 @@ def related(
         mode=mode_norm,
         exclude_doc_ids=parsed_exclude_doc_ids,
         exclude_source_types=parsed_exclude_source_types,
+        deadline=deadline,
+        depth=depth,
+        max_nodes=max_nodes,
+        order=order_norm,
     )
-    return [
+    serialized = [
         {
             "doc_id": n.doc_id,
             "title": n.title,
@@ -328,6 +439,7 @@ def related(
         }
         for n in neighbors
     ]
+    return _partial_response(serialized, deadline, meta) if deadline.partial else serialized
 
 
 @app.tool()
@@ -355,6 +467,10 @@ def status() -> dict:
         "index_manifest": index_manifest,
         "available_source_types": available_source_types,
         "source_type_counts": source_type_counts,
+        "vector_store": {**docstore.vector_stats(), "build": index_manifest.get("vector_store", {})},
+        "query_encoder": docstore.query_encoder_stats(),
+        "result_cache": docstore.result_cache_stats(),
+        "lookup_indexes": docstore.lookup_index_stats(),
         "coverage_warnings": coverage_warnings,
     }
 
@@ -180,6 +180,7 @@ def generate_report(
                     "embedder": asdict(cfg.index.embedder),
                     "rerank_enable": cfg.index.rerank_enable,
                     "candidate_pool": cfg.index.candidate_pool,
+                    "candidate_pool_max": cfg.index.candidate_pool_max,
                 },
                 "mcp": asdict(cfg.mcp),
             }
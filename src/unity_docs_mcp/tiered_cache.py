@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# The disk tier keeps this many times the in-memory capacity before pruning.
+_DISK_FACTOR = 16
+_PRUNE_EVERY = 256
+
+
+class TieredLRU:
+    """
+    Thread-safe LRU of ``max_entries`` values with optional per-entry expiry
+    and an optional SQLite tier that survives restarts. Memory misses fall
+    through to disk; disk hits are promoted back into memory. ``encode`` and
+    ``decode`` turn values into SQLite-storable bytes or text and back.
+
+    Rows written under another ``scope`` (e.g. an older index generation) are
+    dropped when the tier is opened, and every ``_PRUNE_EVERY`` writes the
+    tier is cut back to its ``_DISK_FACTOR * max_entries`` newest rows.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        persist_path: Optional[Path] = None,
+        encode: Callable[[Any], Any] = lambda value: value,
+        decode: Callable[[Any], Any] = lambda stored: stored,
+        scope: str = "",
+    ):
+        self.max_entries = max(int(max_entries), 0)
+        self.scope = scope
+        self._encode = encode
+        self._decode = decode
+        self._entries: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "expired": 0}
+        self._inserts = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        if persist_path is not None and self.max_entries:
+            persist_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(persist_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries "
+                "(key TEXT PRIMARY KEY, scope TEXT, expires_at REAL, value BLOB)"
+            )
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE scope != ? OR expires_at < ?", (scope, time.time())
+            )
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.max_entries:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._entries[key]
+                self._stats["expired"] += 1
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expires_at, value FROM cache_entries WHERE key = ? AND (expires_at IS NULL OR expires_at >= ?)",
+                    (key, now),
+                ).fetchone()
+                if row:
+                    value = self._decode(row[1])
+                    self._remember(key, row[0], value)
+                    self._stats["disk_hits"] += 1
+                    return value
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: Any, ttl_s: Optional[float] = None) -> None:
+        if not self.max_entries:
+            return
+        expires_at = time.time() + ttl_s if ttl_s is not None else None
+        with self._lock:
+            self._remember(key, expires_at, value)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries(key, scope, expires_at, value) VALUES (?, ?, ?, ?)",
+                    (key, self.scope, expires_at, self._encode(value)),
+                )
+                self._inserts += 1
+                if self._inserts % _PRUNE_EVERY == 0:
+                    self._prune(self._conn)
+                self._conn.commit()
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        # Drop expired rows, then all but the most recently written ones.
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM cache_entries WHERE rowid NOT IN "
+            "(SELECT rowid FROM cache_entries ORDER BY rowid DESC LIMIT ?)",
+            (self.max_entries * _DISK_FACTOR,),
+        )
+
+    def _remember(self, key: str, expires_at: Optional[float], value: Any) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["size"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        stats["persist"] = self._conn is not None
+        return stats
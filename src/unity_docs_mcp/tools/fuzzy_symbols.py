@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Trigram alphabet: normalized symbol keys are [a-z0-9]; "$" pads key ends and
+# every other byte shares one catch-all code.
+_ALPHABET = b"abcdefghijklmnopqrstuvwxyz0123456789$"
+_BASE = len(_ALPHABET) + 1
+_SYMBOL_CODES = np.full(256, _BASE - 1, dtype=np.int64)
+_SYMBOL_CODES[np.frombuffer(_ALPHABET, dtype=np.uint8)] = np.arange(len(_ALPHABET))
+# Candidates verified per lookup, most shared trigrams first; true neighbours
+# share nearly all of theirs, so this only trims unrelated tails.
+_MAX_VERIFY = 64
+
+
+def _padded(key: str) -> str:
+    return f"$${key}$"
+
+
+def _trigram_codes(text: str) -> np.ndarray:
+    """Trigram codes of every position in ``text`` (callers pad keys first)."""
+    symbols = _SYMBOL_CODES[np.frombuffer(text.encode("utf-8"), dtype=np.uint8)]
+    return symbols[:-2] * _BASE * _BASE + symbols[1:-1] * _BASE + symbols[2:]
+
+
+def bounded_osa(a: str, b: str, bound: int) -> Optional[int]:
+    """
+    Optimal string alignment distance (Damerau-Levenshtein with adjacent
+    transpositions, no substring edited twice), or ``None`` once it is known
+    to exceed ``bound``.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return None
+    if a == b:
+        return 0
+    prev_prev: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            best = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                best = min(best, prev_prev[j - 2] + 1)
+            row[j] = best
+        if min(row) > bound:
+            return None
+        prev_prev, prev = prev, row
+    return prev[-1] if prev[-1] <= bound else None
+
+
+class FuzzySymbolIndex:
+    """
+    Nearest symbol keys for a misspelt query. Padded key trigrams are
+    encoded as integers and stored as sorted postings (an ``int32`` array of
+    key ids plus one offset per trigram code). A query counts shared
+    trigrams with ``bincount``, keeps keys that pass the length and q-gram
+    filters for its edit bound, and verifies them with a bounded OSA distance.
+    """
+
+    def __init__(self, keys: Iterable[str], max_edits: int = 2):
+        started = time.perf_counter()
+        self.max_edits = max(int(max_edits), 0)
+        self.keys: List[str] = sorted(set(k for k in keys if k))
+        n_keys = max(len(self.keys), 1)
+        padded = [_padded(k) for k in self.keys]
+        lengths = np.fromiter((len(p.encode("utf-8")) for p in padded), dtype=np.int64, count=len(padded))
+        self._lengths = np.fromiter((len(k) for k in self.keys), dtype=np.int32, count=len(self.keys))
+        codes = _trigram_codes("".join(padded)) if padded else np.zeros(0, dtype=np.int64)
+        # Drop the windows that straddle two keys.
+        within = np.ones(codes.size + 2, dtype=bool)
+        ends = np.cumsum(lengths)
+        within[ends - 1] = False
+        within[ends - 2] = False
+        key_ids = np.repeat(np.arange(len(self.keys), dtype=np.int64), lengths)[:-2][within[:-2]]
+        # Code-major sort of (code, key) pairs, deduplicated: postings come out grouped by code.
+        pairs = np.sort(codes[within[:-2]] * n_keys + key_ids)
+        if pairs.size:
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        self._postings = (pairs % n_keys).astype(np.int32)
+        self._offsets = np.searchsorted(pairs // n_keys, np.arange(_BASE**3 + 1)).astype(np.int32)
+        self.build_ms = round((time.perf_counter() - started) * 1000.0, 3)
+
+    def _edit_bound(self, query: str) -> int:
+        # One edit in a short key is already a large change; very short keys get none.
+        if len(query) < 4:
+            return 0
+        return min(self.max_edits, 1 if len(query) <= 10 else self.max_edits)
+
+    def lookup(self, query: str, limit: int = 5) -> List[Tuple[str, int]]:
+        """Up to ``limit`` ``(key, distance)`` pairs, closest first, excluding exact matches."""
+        if not query or not self.keys:
+            return []
+        bound = self._edit_bound(query)
+        if bound <= 0:
+            return []
+        grams = np.unique(_trigram_codes(_padded(query)))
+        postings = np.concatenate([self._postings[self._offsets[g] : self._offsets[g + 1]] for g in grams])
+        if not postings.size:
+            return []
+        shared = np.bincount(postings, minlength=len(self.keys))
+        # The query has len + 1 padded trigrams; an edit touches at most three
+        # of them, an adjacent transposition four.
+        needed = max(len(query) + 1 - 4 * bound, 1)
+        candidates = np.flatnonzero((shared >= needed) & (np.abs(self._lengths - len(query)) <= bound))
+        candidates = candidates[np.argsort(-shared[candidates], kind="stable")[:_MAX_VERIFY]]
+        found: List[Tuple[int, int, str]] = []
+        for key_id in candidates:
+            key = self.keys[key_id]
+            distance = bounded_osa(query, key, bound)
+            if distance:
+                found.append((distance, -int(shared[key_id]), key))
+        found.sort()
+        return [(key, distance) for distance, _, key in found[:limit]]
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "keys": len(self.keys),
+            "postings": int(self._postings.size),
+            "bytes": int(self._postings.nbytes + self._offsets.nbytes + self._lengths.nbytes),
+            "build_ms": self.build_ms,
+        }
@@ -3,15 +3,39 @@ from __future__ import annotations
 import fnmatch
 import json
 import re
-from dataclasses import dataclass
+import sqlite3
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
+
+from unity_docs_mcp.bake.link_graph import LinkGraph, corpus_digest
 from unity_docs_mcp.config import Config
-from unity_docs_mcp.index.search import HybridSearcher
+from unity_docs_mcp.index.deadline import Deadline
+from unity_docs_mcp.index.filters import SearchFilters
+from unity_docs_mcp.index.search import HybridSearcher, SearchResult
+from unity_docs_mcp.index.similar_docs import SimilarDocTable
+from unity_docs_mcp.index.trigram import has_trigram, search_trigram
 from unity_docs_mcp.paths import make_paths
+from unity_docs_mcp.tools.fuzzy_symbols import FuzzySymbolIndex
+from unity_docs_mcp.tools.query_router import NATURAL, SYMBOL, classify_query, symbol_core
+from unity_docs_mcp.tools.result_cache import ResultCache, index_generation
+from unity_docs_mcp.tools.symbol_index import SortedKeyIndex
 
 _DEFAULT_SOURCE_TYPES = ("manual", "scriptref")
+RELATED_MODES = ("outgoing", "incoming", "bidirectional", "similar")
+RELATED_ORDERS = ("link", "weight", "in_degree", "pagerank")
+_GLOB_CHARS_RE = re.compile(r"[*?\[]")
+_GLOB_LITERAL_SPLIT_RE = re.compile(r"\[[^\]]*\]|[*?]")
+
+
+@lru_cache(maxsize=256)
+def _glob_regex(pattern: str) -> "re.Pattern[str]":
+    # Case-insensitive on every platform (fnmatch.fnmatch only is on Windows),
+    # matching the lowercased prefix and trigram candidate lookups.
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
 
 
 @dataclass
@@ -29,14 +53,32 @@ class DocStore:
         self.config = config
         self.paths = make_paths(config)
         self.corpus = self._load_corpus(self.paths.baked_dir / "corpus.jsonl")
+        # Lookup indexes store corpus positions; ``_doc_ids`` maps them back.
+        self._doc_ids: List[str] = list(self.corpus)
+        self._corpus_position = {doc_id: pos for pos, doc_id in enumerate(self._doc_ids)}
+        self._trigram_conn = self._open_trigram(self.paths.index_dir / "fts.sqlite")
         self._origin_path_index = self._build_origin_path_index(self.corpus)
+        self._path_order, self._path_rank = self._build_path_order(self._origin_path_index, len(self._doc_ids))
+        self._origin_paths = [doc.origin_path for doc in self.corpus.values()]
+        self._paths_in_order = [self._origin_paths[pos] for pos in self._path_order.tolist()]
         self._canonical_url_index = self._build_canonical_url_index(self.corpus)
         self._symbol_exact_index, self._symbol_norm_index = self._build_symbol_indexes(self.corpus)
+        self._fuzzy_symbols = FuzzySymbolIndex(self._symbol_norm_index.keys, max_edits=config.mcp.symbol_fuzzy_max_edits)
         self._doc_source_type_counts = self._count_source_types(self.corpus.values())
-        self.link_index = self._load_links(self.paths.baked_dir / "link_graph.jsonl")
-        self.reverse_link_index = self._build_reverse_links(self.link_index)
+        self.link_graph, self._link_graph_source = self._load_link_graph(self.paths.baked_dir)
+        self._similar_docs, self._similar_rows, self._similar_stats = self._load_similar_docs(self.paths.index_dir / "similar_docs.npz")
         self.searcher = HybridSearcher(config, self.paths.index_dir)
+        set_doc_prior = getattr(self.searcher, "set_doc_prior", None)
+        if callable(set_doc_prior):
+            prior = self.link_graph.pagerank_prior()
+            set_doc_prior({self._doc_ids[pos]: float(prior[pos]) for pos in np.flatnonzero(prior).tolist()})
         self._chunk_source_type_counts = self._count_source_types(getattr(self.searcher, "chunk_meta", {}).values())
+        self.result_cache = ResultCache(
+            config.mcp.result_cache_size,
+            ttl_s=config.mcp.result_cache_ttl_s,
+            generation=index_generation(self.paths.baked_dir / "manifest.json", self.paths.index_dir / "manifest.json"),
+            persist_path=self.paths.index_dir / "result_cache.sqlite" if config.mcp.result_cache_persist else None,
+        )
 
     def _load_corpus(self, path: Path) -> Dict[str, DocRecord]:
         records: Dict[str, DocRecord] = {}
@@ -55,56 +97,96 @@ class DocStore:
                 )
         return records
 
-    def _load_links(self, path: Path) -> Dict[str, List[str]]:
-        links: Dict[str, List[str]] = {}
-        with path.open("r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                row = json.loads(line)
-                links.setdefault(row["from_doc_id"], []).append(row["to_doc_id"])
-        return links
-
     @staticmethod
-    def _build_reverse_links(links: Dict[str, List[str]]) -> Dict[str, List[str]]:
-        reverse_links: Dict[str, List[str]] = {}
-        for from_doc, neighbors in links.items():
-            for to_doc in neighbors:
-                reverse_links.setdefault(to_doc, []).append(from_doc)
-        return reverse_links
-
-    def _build_origin_path_index(self, records: Dict[str, DocRecord]) -> Dict[str, str]:
-        index: Dict[str, str] = {}
-        for doc in records.values():
-            if not doc.origin_path:
-                continue
-            index[doc.origin_path] = doc.doc_id
-            index[self._normalize_path_lookup_key(doc.origin_path)] = doc.doc_id
-        return index
+    def _open_trigram(path: Path) -> Optional[sqlite3.Connection]:
+        if not path.exists():
+            return None
+        conn = sqlite3.connect(str(path), check_same_thread=False)
+        if has_trigram(conn):
+            return conn
+        conn.close()
+        return None
+
+    def _load_link_graph(self, baked_dir: Path) -> Tuple[LinkGraph, str]:
+        """
+        The CSR link graph written by bake, if it was built over this corpus
+        order; otherwise (older bakes) it is rebuilt from ``link_graph.jsonl``.
+        PageRank is computed here when the bake did not store it.
+        """
+        csr_path = baked_dir / "link_graph.npz"
+        graph: Optional[LinkGraph] = None
+        source = csr_path.name
+        if csr_path.exists():
+            graph = LinkGraph.load(csr_path)
+            if graph.digest != corpus_digest(self._doc_ids):
+                graph = None
+        if graph is None:
+            edges: List[Tuple[str, str]] = []
+            with (baked_dir / "link_graph.jsonl").open("r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    row = json.loads(line)
+                    edges.append((row["from_doc_id"], row["to_doc_id"]))
+            graph, source = LinkGraph.from_edges(self._doc_ids, edges), "link_graph.jsonl"
+        if graph.pagerank is None:
+            graph.pagerank, _ = graph.compute_pagerank(damping=self.config.bake.pagerank_damping)
+        return graph, source
+
+    def _load_similar_docs(self, path: Path) -> Tuple[Optional[np.ndarray], np.ndarray, Dict[str, Any]]:
+        """
+        The index-time neighbour table remapped to corpus positions: row
+        ``rows[pos]`` of the returned matrix lists the similar docs of the doc
+        at ``pos`` (``-1`` pads rows and marks docs missing from the corpus).
+        """
+        rows = np.full(len(self._doc_ids), -1, dtype=np.int32)
+        if not path.exists():
+            return None, rows, {"enabled": False}
+        table = SimilarDocTable.load(path)
+        to_corpus = np.fromiter(
+            (self._corpus_position.get(doc_id, -1) for doc_id in table.doc_ids), dtype=np.int32, count=len(table.doc_ids)
+        )
+        present = to_corpus >= 0
+        rows[to_corpus[present]] = np.flatnonzero(present)
+        neighbors = np.where(table.neighbors >= 0, to_corpus[np.maximum(table.neighbors, 0)], -1)
+        return neighbors.astype(np.int32), rows, table.stats()
+
+    def has_similar_docs(self) -> bool:
+        return self._similar_docs is not None
+
+    def _build_origin_path_index(self, records: Dict[str, DocRecord]) -> SortedKeyIndex:
+        return SortedKeyIndex(
+            (self._normalize_path_lookup_key(doc.origin_path), pos)
+            for pos, doc in enumerate(records.values())
+            if doc.origin_path
+        )
 
-    def _build_canonical_url_index(self, records: Dict[str, DocRecord]) -> Dict[str, str]:
-        index: Dict[str, str] = {}
-        for doc in records.values():
-            if doc.canonical_url:
-                index[doc.canonical_url.strip()] = doc.doc_id
-        return index
+    @staticmethod
+    def _build_path_order(index: SortedKeyIndex, n_docs: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Corpus positions in origin_path order (path-less docs last) and each position's rank in it."""
+        with_path = index.positions()
+        pathless = np.setdiff1d(np.arange(n_docs, dtype=np.int32), with_path)
+        order = np.concatenate([with_path, pathless]).astype(np.int32)
+        rank = np.empty(n_docs, dtype=np.int32)
+        rank[order] = np.arange(n_docs, dtype=np.int32)
+        return order, rank
+
+    def _build_canonical_url_index(self, records: Dict[str, DocRecord]) -> SortedKeyIndex:
+        return SortedKeyIndex(
+            (doc.canonical_url.strip(), pos) for pos, doc in enumerate(records.values()) if doc.canonical_url
+        )
+
+    def _docs_for(self, index: SortedKeyIndex, key: str) -> List[str]:
+        return [self._doc_ids[pos] for pos in index.get(key)]
 
     @staticmethod
     def _normalize_symbol_key(value: str) -> str:
         return re.sub(r"[^a-z0-9]+", "", (value or "").lower())
 
-    @staticmethod
-    def _append_unique(index: Dict[str, List[str]], key: str, doc_id: str) -> None:
-        if not key:
-            return
-        bucket = index.setdefault(key, [])
-        if doc_id not in bucket:
-            bucket.append(doc_id)
-
-    def _build_symbol_indexes(self, records: Dict[str, DocRecord]) -> tuple[Dict[str, List[str]], Dict[str, List[str]]]:
-        exact_index: Dict[str, List[str]] = {}
-        norm_index: Dict[str, List[str]] = {}
-        for doc in records.values():
+    def _build_symbol_indexes(self, records: Dict[str, DocRecord]) -> tuple[SortedKeyIndex, SortedKeyIndex]:
+        exact_pairs: List[Tuple[str, int]] = []
+        norm_pairs: List[Tuple[str, int]] = []
+        for pos, doc in enumerate(records.values()):
             candidates = set()
             title = (doc.title or "").strip()
             if title:
@@ -122,10 +204,9 @@ class DocStore:
                     candidates.add(stem)
 
             for candidate in candidates:
-                self._append_unique(exact_index, candidate, doc.doc_id)
-                normalized = self._normalize_symbol_key(candidate)
-                self._append_unique(norm_index, normalized, doc.doc_id)
-        return exact_index, norm_index
+                exact_pairs.append((candidate, pos))
+                norm_pairs.append((self._normalize_symbol_key(candidate), pos))
+        return SortedKeyIndex(exact_pairs), SortedKeyIndex(norm_pairs)
 
     @staticmethod
     def _normalize_path_lookup_key(path: str) -> str:
@@ -168,13 +249,15 @@ class DocStore:
 
         if path:
             path_key_exact = path.strip()
-            if path_key_exact in self._canonical_url_index:
-                record = self.corpus.get(self._canonical_url_index[path_key_exact])
-                if record:
-                    return record
-
-            normalized_path = self._normalize_path_lookup_key(path)
-            target_id = self._origin_path_index.get(path_key_exact) or self._origin_path_index.get(normalized_path)
+            for url_doc_id in self._docs_for(self._canonical_url_index, path_key_exact):
+                return self.corpus[url_doc_id]
+
+            path_doc_ids = self._docs_for(self._origin_path_index, self._normalize_path_lookup_key(path))
+            # Paths that differ only in case share a key; prefer the exact spelling.
+            target_id = next(
+                (d for d in path_doc_ids if self.corpus[d].origin_path == path_key_exact),
+                path_doc_ids[0] if path_doc_ids else None,
+            )
             if target_id:
                 record = self.corpus.get(target_id)
                 if record:
@@ -188,14 +271,78 @@ class DocStore:
 
         return None
 
-    def list_files(self, pattern: str, limit: int = 20) -> List[DocRecord]:
+    @staticmethod
+    def _glob_literal(pattern: str) -> str:
+        """Longest run of ``pattern`` without wildcards or character classes."""
+        return max(_GLOB_LITERAL_SPLIT_RE.split(pattern or ""), key=len, default="")
+
+    def _trigram_path_positions(self, pattern: str) -> Optional[List[int]]:
+        """
+        Docs whose doc_id or origin_path contains the longest literal run of
+        ``pattern`` (trigram lookup, case-insensitive so it is a superset of
+        the glob/substring matches). ``None`` means no usable literal.
+        """
+        if self._trigram_conn is None:
+            return None
+        literal = self._glob_literal(pattern)
+        if len(literal.strip()) < 3:
+            return None
+        doc_ids = search_trigram(self._trigram_conn, literal, limit=None, columns=("doc_id", "origin_path"))
+        return [self._corpus_position[d] for d in set(doc_ids) if d in self._corpus_position]
+
+    def _list_candidates(self, pattern: str) -> Iterable[int]:
+        """Corpus positions that may match ``pattern``, in origin_path order."""
+        by_path = self._path_rank.__getitem__
+        first_glob = _GLOB_CHARS_RE.search(pattern)
+        if first_glob is None:
+            # Plain text: an exact origin_path, or a doc_id containing it.
+            found = set(self._origin_path_index.get(self._normalize_path_lookup_key(pattern)))
+            trigram = self._trigram_path_positions(pattern)
+            if trigram is None:
+                needle = pattern.lower()
+                trigram = [pos for pos, doc_id in enumerate(self._doc_ids) if needle in doc_id.lower()]
+            return sorted(found.union(trigram), key=by_path)
+        prefix = self._normalize_path_lookup_key(pattern[: first_glob.start()])
+        if prefix:
+            return (pos for _, positions in self._origin_path_index.prefix(prefix) for pos in positions)
+        trigram = self._trigram_path_positions(pattern)
+        if trigram is not None:
+            return sorted(trigram, key=by_path)
+        # Full scan: match the path-ordered strings directly so only hits are mapped back to positions.
+        match, order = _glob_regex(pattern).match, self._path_order
+        return (int(order[i]) for i, path in enumerate(self._paths_in_order) if match(path))
+
+    def list_files(self, pattern: str, limit: int = 20, order: str = "path") -> List[DocRecord]:
+        """
+        Docs whose origin_path matches the glob ``pattern`` or whose doc_id
+        contains it, in origin_path order. A literal prefix narrows the sorted
+        origin_path index by bisection; other patterns use the trigram index
+        when it exists. ``order="title"`` ranks docs whose title equals,
+        starts with or contains the pattern's literal text first.
+        """
+        pattern = pattern or ""
+        match = _glob_regex(pattern).match
+        # doc_ids never contain glob characters, so only plain text can be a doc_id substring.
+        needle = None if _GLOB_CHARS_RE.search(pattern) else pattern.lower()
+        paths, doc_ids = self._origin_paths, self._doc_ids
         matches: List[DocRecord] = []
-        for doc in self.corpus.values():
-            if fnmatch.fnmatch(doc.origin_path, pattern) or pattern.lower() in doc.doc_id.lower():
-                matches.append(doc)
-            if len(matches) >= limit:
-                break
-        return matches
+        for pos in self._list_candidates(pattern):
+            if match(paths[pos]) or (needle is not None and needle in doc_ids[pos].lower()):
+                matches.append(self.corpus[doc_ids[pos]])
+                if order != "title" and len(matches) >= limit:
+                    break
+        if order == "title":
+            # Titles never contain path separators or the page extension.
+            literal = self._glob_literal(pattern).rsplit("/", 1)[-1].lower().removesuffix(".html")
+
+            def _title_rank(doc: DocRecord) -> int:
+                title = (doc.title or "").lower()
+                if not literal:
+                    return 3
+                return 0 if title == literal else 1 if title.startswith(literal) else 2 if literal in title else 3
+
+            matches.sort(key=_title_rank)
+        return matches[:limit]
 
     def related(
         self,
@@ -204,31 +351,91 @@ class DocStore:
         mode: str = "outgoing",
         exclude_doc_ids: Optional[List[str]] = None,
         exclude_source_types: Optional[List[str]] = None,
+        deadline: Optional[Deadline] = None,
+        depth: int = 1,
+        max_nodes: Optional[int] = None,
+        order: str = "link",
     ) -> List[DocRecord]:
+        args = {
+            "doc_id": doc_id,
+            "limit": limit,
+            "mode": (mode or "outgoing").strip().lower(),
+            "exclude_doc_ids": sorted(set(exclude_doc_ids or [])),
+            "exclude_source_types": sorted({s.lower() for s in (exclude_source_types or [])}),
+            "depth": depth,
+            "max_nodes": max_nodes,
+            "order": (order or "link").strip().lower(),
+        }
+        cached = self.result_cache.get("related", args)
+        if cached is None:
+            deadline = deadline or Deadline()
+            docs = self._related(
+                doc_id, limit, mode, exclude_doc_ids, exclude_source_types, deadline, depth, max_nodes, order
+            )
+            if deadline.cacheable:
+                self.result_cache.put("related", args, [doc.doc_id for doc in docs])
+            return docs
+        return [self.corpus[neighbor_id] for neighbor_id in cached if neighbor_id in self.corpus]
+
+    def _related(
+        self,
+        doc_id: str,
+        limit: int,
+        mode: str,
+        exclude_doc_ids: Optional[List[str]],
+        exclude_source_types: Optional[List[str]],
+        deadline: Deadline,
+        depth: int = 1,
+        max_nodes: Optional[int] = None,
+        order: str = "link",
+    ) -> List[DocRecord]:
+        """
+        Docs within ``depth`` link hops of ``doc_id`` (BFS over the CSR link
+        graph, at most ``max_nodes`` visited), or with ``mode="similar"`` its
+        precomputed nearest docs, most similar first. ``order="link"`` keeps visit
+        order: nearer hops first, then the order links appear on the page.
+        ``weight`` (repeated links from the previous hop), ``in_degree``
+        (distinct docs linking in) and ``pagerank`` re-rank within each hop.
+        """
         exclude_doc_ids_set = set(exclude_doc_ids or [])
         exclude_source_types_set = {s.lower() for s in (exclude_source_types or [])}
 
         mode_norm = (mode or "outgoing").strip().lower()
-        if mode_norm == "outgoing":
-            candidates = self.link_index.get(doc_id, [])
-        elif mode_norm == "incoming":
-            candidates = self.reverse_link_index.get(doc_id, [])
-        elif mode_norm == "bidirectional":
-            candidates = self.link_index.get(doc_id, []) + self.reverse_link_index.get(doc_id, [])
-        else:
+        order_norm = (order or "link").strip().lower()
+        position = self._corpus_position.get(doc_id)
+        if mode_norm not in RELATED_MODES or order_norm not in RELATED_ORDERS or position is None:
             return []
+        if mode_norm == "similar":
+            row = int(self._similar_rows[position])
+            if self._similar_docs is None or row < 0:
+                return []
+            nodes = self._similar_docs[row]
+            nodes = nodes[nodes >= 0]
+            order_norm = "link"
+        else:
+            max_depth = max(self.config.mcp.related_max_depth, 1)
+            node_cap = self.config.mcp.related_max_nodes
+            nodes, hops, weights = self.link_graph.traverse(
+                [position],
+                direction=mode_norm,
+                depth=min(max(int(depth), 1), max_depth),
+                max_nodes=min(max_nodes, node_cap) if max_nodes else node_cap,
+            )
+        if order_norm == "weight":
+            nodes = nodes[np.lexsort((-weights, hops))]
+        elif order_norm == "in_degree":
+            nodes = nodes[np.lexsort((-self.link_graph.in_degree()[nodes], hops))]
+        elif order_norm == "pagerank":
+            nodes = nodes[np.lexsort((-self.link_graph.pagerank[nodes], hops))]
 
-        seen = set()
         related_docs: List[DocRecord] = []
-        for neighbor_id in candidates:
-            if neighbor_id in seen:
-                continue
-            seen.add(neighbor_id)
+        for pos in nodes.tolist():
+            if not deadline.check("related"):
+                break
+            neighbor_id = self._doc_ids[pos]
             if neighbor_id in exclude_doc_ids_set:
                 continue
-            doc = self.corpus.get(neighbor_id)
-            if not doc:
-                continue
+            doc = self.corpus[neighbor_id]
             if doc.source_type.lower() in exclude_source_types_set:
                 continue
             related_docs.append(doc)
@@ -236,16 +443,159 @@ class DocStore:
                 break
         return related_docs
 
-    def search(self, query: str, k: int = 6, source_types: Optional[List[str]] = None) -> List:
-        return self.searcher.search(query=query, k=k, source_types=source_types)
+    def search(
+        self,
+        query: str,
+        k: int = 6,
+        source_types: Optional[List[str]] = None,
+        path_prefix: Optional[str] = None,
+        doc_ids: Optional[List[str]] = None,
+        exclude_doc_ids: Optional[List[str]] = None,
+        debug: Optional[Dict[str, Any]] = None,
+        group_by: str = "chunk",
+        deadline: Optional[Deadline] = None,
+        route: bool = True,
+    ) -> List:
+        """
+        Hybrid search. With ``route``, symbol- and path-like queries first try
+        the in-memory symbol/path maps (see ``_routed_search``).
+        """
+        filters = SearchFilters.build(
+            source_types=source_types,
+            path_prefix=path_prefix,
+            doc_ids=doc_ids,
+            exclude_doc_ids=exclude_doc_ids,
+        )
+        args = {
+            "query": " ".join((query or "").split()),
+            "k": k,
+            "filters": asdict(filters),
+            "group_by": group_by,
+            "route": route,
+        }
+        # Debug requests describe a fresh retrieval, so they never answer from the cache.
+        if debug is not None:
+            debug["result_cache"] = "bypass"
+        else:
+            cached = self.result_cache.get("search", args)
+            if cached is not None:
+                return [SearchResult(**row) for row in cached]
+        deadline = deadline or Deadline()
+        kind = classify_query(query) if route else NATURAL
+        results = None
+        if kind != NATURAL:
+            results = self._routed_search(kind, query, k, filters, debug, group_by, deadline)
+        elif debug is not None:
+            debug["route"] = {"kind": kind}
+        if results is None:
+            results = self.searcher.search(query=query, k=k, filters=filters, debug=debug, group_by=group_by, deadline=deadline)
+        # Partial answers (a stage ran out of time) are not worth keeping.
+        if deadline.cacheable:
+            self.result_cache.put("search", args, [asdict(r) for r in results])
+        return results
 
-    def resolve_symbol(self, symbol: str, limit: int = 5) -> List[Dict]:
+    def _routed_search(
+        self,
+        kind: str,
+        query: str,
+        k: int,
+        filters: SearchFilters,
+        debug: Optional[Dict[str, Any]],
+        group_by: str,
+        deadline: Deadline,
+    ) -> Optional[List[SearchResult]]:
+        """
+        Fast path for symbol- and path-like queries: docs resolved from the
+        symbol or path maps come first, and lexical-only FTS tops the list up
+        to ``k`` without embedding the query. ``None`` when nothing resolves,
+        so the caller runs the full hybrid search.
+        """
+        if kind == SYMBOL:
+            best: Dict[str, float] = {}
+            for doc_id, score, _ in self._symbol_lookup(symbol_core(query)):
+                best.setdefault(doc_id, score)
+            resolved = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        else:
+            record = self.open_doc(path=query)
+            resolved = [(record.doc_id, 1.0)] if record else []
+        hits = self.searcher.doc_results(resolved, filters=filters)[:k]
+        route_debug: Dict[str, Any] = {"kind": kind, "resolved": len(hits), "topped_up": 0}
+        if debug is not None:
+            debug["route"] = route_debug
+        if not hits:
+            route_debug["fallback"] = "hybrid"
+            return None
+        if len(hits) < k:
+            seen_docs = {hit.doc_id for hit in hits}
+            seen_chunks = {hit.chunk_id for hit in hits}
+            top_up = self.searcher.search(
+                query=query,
+                k=k + len(hits),
+                filters=filters,
+                debug=debug,
+                group_by=group_by,
+                deadline=deadline,
+                lexical_only=True,
+            )
+            fresh = [
+                hit
+                for hit in top_up
+                if hit.chunk_id not in seen_chunks and (group_by != "doc" or hit.doc_id not in seen_docs)
+            ]
+            # Same scale as resolve_symbol's search fallback, below every resolved doc.
+            extra = [replace(hit, score=0.60 / (rank + 1)) for rank, hit in enumerate(fresh[: k - len(hits)])]
+            hits.extend(extra)
+            route_debug["topped_up"] = len(extra)
+        return hits
+
+    def _symbol_lookup(self, symbol_text: str) -> List[Tuple[str, float, str]]:
+        """Exact and normalized symbol matches as ``(doc_id, score, match_kind)``, best kinds first."""
+        symbol_lower = symbol_text.lower()
+        symbol_norm = self._normalize_symbol_key(symbol_text)
+        found: List[Tuple[str, float, str]] = []
+        if symbol_lower in self.corpus:
+            found.append((symbol_lower, 1.0, "doc_id_exact"))
+        found.extend((doc_id, 0.95, "symbol_exact") for doc_id in self._docs_for(self._symbol_exact_index, symbol_lower))
+        if symbol_norm:
+            found.extend(
+                (doc_id, 0.90, "symbol_normalized") for doc_id in self._docs_for(self._symbol_norm_index, symbol_norm)
+            )
+        return [match for match in found if match[0] in self.corpus]
+
+    def _symbol_completions(self, symbol_text: str, limit: int) -> List[str]:
+        """Docs whose exact or normalized symbol key starts with ``symbol_text``, shortest keys first."""
+        completions: List[Tuple[str, int]] = []
+        for index, prefix in (
+            (self._symbol_exact_index, symbol_text.lower()),
+            (self._symbol_norm_index, self._normalize_symbol_key(symbol_text)),
+        ):
+            if prefix:
+                for key, positions in index.prefix(prefix, max_keys=limit * 8):
+                    completions.extend((key, pos) for pos in positions)
+        completions.sort(key=lambda item: (len(item[0]), item[0], item[1]))
+        return list(dict.fromkeys(self._doc_ids[pos] for _, pos in completions))
+
+    def resolve_symbol(
+        self, symbol: str, limit: int = 5, deadline: Optional[Deadline] = None, prefix: bool = False
+    ) -> List[Dict]:
+        """
+        Docs for an API symbol, best match first. ``prefix`` completes a
+        partial symbol from the sorted symbol keys (``symbol_prefix``) instead
+        of the fuzzy, substring and search fallbacks.
+        """
         symbol_text = (symbol or "").strip()
         if not symbol_text:
             return []
-
-        symbol_lower = symbol_text.lower()
-        symbol_norm = self._normalize_symbol_key(symbol_text)
+        args = {"symbol": symbol_text, "limit": limit, "prefix": prefix}
+        cached = self.result_cache.get("resolve_symbol", args)
+        if cached is None:
+            deadline = deadline or Deadline()
+            cached = self._resolve_symbol(symbol_text, limit, deadline, prefix)
+            if deadline.cacheable:
+                self.result_cache.put("resolve_symbol", args, cached)
+        return [dict(match) for match in cached]
+
+    def _resolve_symbol(self, symbol_text: str, limit: int, deadline: Deadline, prefix: bool = False) -> List[Dict]:
         matches: Dict[str, float] = {}
         match_kind: Dict[str, str] = {}
 
@@ -257,19 +607,34 @@ class DocStore:
                 match_kind[doc_id] = kind
 
         # Direct and high-confidence symbol matches first.
-        if symbol_lower in self.corpus:
-            _add(symbol_lower, 1.0, "doc_id_exact")
+        for doc_id, score, kind in self._symbol_lookup(symbol_text):
+            _add(doc_id, score, kind)
 
-        for doc_id in self._symbol_exact_index.get(symbol_lower, []):
-            _add(doc_id, 0.95, "symbol_exact")
+        if prefix and len(matches) < limit:
+            for rank, doc_id in enumerate(self._symbol_completions(symbol_text, limit)):
+                _add(doc_id, max(0.62, 0.80 - 0.01 * rank), "symbol_prefix")
+                if len(matches) >= limit:
+                    break
 
-        if symbol_norm:
-            for doc_id in self._symbol_norm_index.get(symbol_norm, []):
-                _add(doc_id, 0.90, "symbol_normalized")
+        # Typos and unfamiliar spellings: nearest normalized symbol keys by edit distance.
+        if not prefix and len(matches) < limit:
+            for key, distance in self._fuzzy_symbols.lookup(self._normalize_symbol_key(symbol_text), limit=limit):
+                for doc_id in self._docs_for(self._symbol_norm_index, key):
+                    _add(doc_id, round(0.85 - 0.05 * distance, 2), "symbol_fuzzy")
 
-        # Backfill from retrieval results if exact symbol matching is sparse.
-        if len(matches) < limit:
-            fallback_hits = self.search(query=symbol_text, k=max(limit * 3, 10))
+        # Partial identifiers (``NativeArr``, ``Vertices(``) via the trigram index.
+        if not prefix and len(matches) < limit and self._trigram_conn is not None and deadline.check("symbol_substring"):
+            substring_hits = search_trigram(
+                self._trigram_conn, symbol_text, limit=limit * 2, columns=("title", "doc_id", "identifiers")
+            )
+            for rank, doc_id in enumerate(substring_hits):
+                _add(doc_id, max(0.61, 0.75 - 0.01 * rank), "symbol_substring")
+                if len(matches) >= limit:
+                    break
+
+        # Last resort: backfill from retrieval results.
+        if not prefix and len(matches) < limit and deadline.check("search_fallback"):
+            fallback_hits = self.search(query=symbol_text, k=max(limit * 3, 10), deadline=deadline, route=False)
             for rank, hit in enumerate(fallback_hits):
                 _add(hit.doc_id, 0.60 / (rank + 1), "search_fallback")
                 if len(matches) >= limit:
@@ -292,6 +657,31 @@ class DocStore:
             )
         return results
 
+    def vector_stats(self) -> Dict[str, Any]:
+        stats = getattr(self.searcher, "vector_stats", None)
+        return stats() if callable(stats) else {"enabled": False}
+
+    def query_encoder_stats(self) -> Dict[str, Any]:
+        stats = getattr(self.searcher, "query_encoder_stats", None)
+        return stats() if callable(stats) else {"encoder": None}
+
+    def result_cache_stats(self) -> Dict[str, Any]:
+        return self.result_cache.stats()
+
+    def lookup_index_stats(self) -> Dict[str, Any]:
+        """Keys and approximate resident bytes of the in-memory symbol, path and link indexes."""
+        indexes = {
+            "symbol_exact": self._symbol_exact_index,
+            "symbol_normalized": self._symbol_norm_index,
+            "origin_path": self._origin_path_index,
+            "canonical_url": self._canonical_url_index,
+        }
+        stats: Dict[str, Any] = {name: {"keys": len(index), "bytes": index.nbytes()} for name, index in indexes.items()}
+        stats["symbol_fuzzy"] = self._fuzzy_symbols.stats()
+        stats["link_graph"] = {**self.link_graph.stats(), "source": self._link_graph_source}
+        stats["similar_docs"] = self._similar_stats
+        return stats
+
     def available_source_types(self) -> List[str]:
         all_types = set(self._doc_source_type_counts) | set(self._chunk_source_type_counts)
         return sorted(all_types)
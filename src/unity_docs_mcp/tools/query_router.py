@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import re
+
+SYMBOL = "symbol"
+PATH = "path"
+NATURAL = "natural"
+
+_SYMBOL_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+# Trailing call arguments or generic parameters: ``AddForce(Vector3)``, ``NativeArray<T>``.
+_SYMBOL_TRAILER_RE = re.compile(r"(?:<[^<>]*>|\([^()]*\))+$")
+
+
+def symbol_core(query: str) -> str:
+    """``query`` without trailing call arguments or generic parameters."""
+    return _SYMBOL_TRAILER_RE.sub("", (query or "").strip())
+
+
+def classify_query(query: str) -> str:
+    """
+    Route a search query: ``path`` for doc paths and URLs, ``symbol`` for a
+    single API identifier (dotted, or with an upper-case letter or
+    underscore, so plain words stay natural language), else ``natural``.
+    """
+    text = (query or "").strip()
+    if not text or any(ch.isspace() for ch in text):
+        return NATURAL
+    lowered = text.lower()
+    if "/" in text or "\\" in text or lowered.endswith(".html") or lowered.startswith(("http://", "https://")):
+        return PATH
+    symbol = symbol_core(text)
+    if _SYMBOL_RE.fullmatch(symbol) and (symbol != symbol.lower() or "." in symbol or "_" in symbol):
+        return SYMBOL
+    return NATURAL
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from unity_docs_mcp.tiered_cache import TieredLRU
+
+
+def index_generation(*manifest_paths: Path) -> str:
+    """
+    Identify the artifacts a result was computed from. Rebuilding the bake or
+    the index rewrites its manifest, which changes the generation and so
+    invalidates every cached result.
+    """
+    digest = hashlib.sha1()
+    for path in manifest_paths:
+        digest.update(path.read_bytes() if path.exists() else b"missing")
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    Bounded TTL + LRU cache of tool results keyed on (tool, normalized args,
+    index generation). Values must be JSON-serializable so the optional
+    SQLite tier can keep warm answers across server restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_s: float = 300.0,
+        generation: str = "",
+        persist_path: Optional[Path] = None,
+    ):
+        self.ttl_s = float(ttl_s)
+        self.generation = generation
+        # Results from other generations can never be hit again; the tier drops them on open.
+        self._cache = TieredLRU(max_entries, persist_path, encode=json.dumps, decode=json.loads, scope=generation)
+        self.max_entries = self._cache.max_entries
+
+    def _key(self, tool: str, args: Dict[str, Any]) -> str:
+        payload = json.dumps([self.generation, tool, args], sort_keys=True, separators=(",", ":"))
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, tool: str, args: Dict[str, Any]) -> Optional[Any]:
+        if not self.max_entries:
+            return None
+        return self._cache.get(self._key(tool, args))
+
+    def put(self, tool: str, args: Dict[str, Any], value: Any) -> None:
+        if not self.max_entries:
+            return
+        self._cache.put(self._key(tool, args), value, ttl_s=self.ttl_s)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        stats["generation"] = self.generation
+        stats["ttl_s"] = self.ttl_s
+        return stats
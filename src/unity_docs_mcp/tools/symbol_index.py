@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import bisect
+import sys
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class SortedKeyIndex:
+    """
+    Read-only multimap from string keys to integer doc ids. Keys live in one
+    sorted list of interned strings and doc ids in a CSR pair of ``int32``
+    arrays (``offsets[i]:offsets[i + 1]`` slices ``postings`` for key ``i``,
+    ascending), so exact lookups and prefix scans are bisections and there is
+    no per-key Python list or dict entry.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[str, int]]):
+        keys: List[str] = []
+        offsets: List[int] = []
+        postings: List[int] = []
+        last: Tuple[str, int] = ("", -1)
+        for pair in sorted(p for p in pairs if p[0]):
+            if pair == last:
+                continue
+            if pair[0] != last[0]:
+                keys.append(sys.intern(pair[0]))
+                offsets.append(len(postings))
+            postings.append(pair[1])
+            last = pair
+        offsets.append(len(postings))
+        self.keys = keys
+        self._offsets = np.asarray(offsets, dtype=np.int32)
+        self._postings = np.asarray(postings, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return self._position(key) is not None
+
+    def _position(self, key: str) -> Optional[int]:
+        pos = bisect.bisect_left(self.keys, key)
+        return pos if pos < len(self.keys) and self.keys[pos] == key else None
+
+    def get(self, key: str) -> List[int]:
+        """Doc ids for ``key`` (ascending), or an empty list."""
+        pos = self._position(key)
+        if pos is None:
+            return []
+        return self._postings[self._offsets[pos] : self._offsets[pos + 1]].tolist()
+
+    def prefix(self, prefix: str, max_keys: Optional[int] = None) -> Iterator[Tuple[str, List[int]]]:
+        """``(key, doc ids)`` for keys starting with ``prefix``, in key order."""
+        pos = bisect.bisect_left(self.keys, prefix)
+        end = len(self.keys) if max_keys is None else min(len(self.keys), pos + max_keys)
+        while pos < end and self.keys[pos].startswith(prefix):
+            yield self.keys[pos], self._postings[self._offsets[pos] : self._offsets[pos + 1]].tolist()
+            pos += 1
+
+    def positions(self) -> np.ndarray:
+        """Every doc id, grouped by key in key order."""
+        return self._postings
+
+    def nbytes(self) -> int:
+        """Approximate resident size: the key list, its strings and both arrays."""
+        strings = sum(sys.getsizeof(key) for key in self.keys)
+        return int(sys.getsizeof(self.keys) + strings + self._offsets.nbytes + self._postings.nbytes)
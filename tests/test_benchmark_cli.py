@@ -3,6 +3,7 @@ from types import SimpleNamespace
 from pathlib import Path
 
 from unity_docs_mcp.bench import benchmark_cli
+from unity_docs_mcp.latency import percentile
 
 
 def _write(path: Path, text: str) -> None:
@@ -42,3 +43,39 @@ def test_run_benchmark_warn_only_skip_when_artifacts_missing(monkeypatch, tmp_pa
     assert code == 0
     payload = json.loads(output.read_text(encoding="utf-8"))
     assert payload["status"] == "skipped_missing_artifacts"
+
+
+def test_run_cases_reports_latency_percentiles():
+    class _Store:
+        def search(self, query, k=5, source_types=None):
+            return [SimpleNamespace(doc_id="manual/a")]
+
+    cases = [
+        benchmark_cli.EvalCase(case_id="q1", query="a", expected_doc_ids=["manual/a"]),
+        benchmark_cli.EvalCase(case_id="q2", query="b", expected_doc_ids=["manual/z"]),
+    ]
+    results, metrics = benchmark_cli._run_cases(_Store(), cases, k=5)
+
+    assert metrics["recall_at_k"] == 0.5
+    assert set(metrics["latency_ms"]) == {"p50", "p95", "mean"}
+    assert all("latency_ms" in row for row in results)
+
+
+def test_allocation_profile_reports_peak_per_query():
+    class _Store:
+        def search(self, query, k=5, source_types=None):
+            return [SimpleNamespace(doc_id="manual/a", payload=bytearray(64 * 1024))]
+
+    cases = [benchmark_cli.EvalCase(case_id="q1", query="a", expected_doc_ids=["manual/a"])]
+    profile = benchmark_cli._allocation_profile(_Store(), cases, k=5)
+
+    assert profile["peak_kib"]["p50"] >= 64
+
+
+def test_percentile_uses_nearest_rank():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == 5.0
+    assert percentile(values, 0) == 1.0
+    assert percentile([], 50) == 0.0
@@ -70,6 +70,52 @@ def test_load_config_rejects_legacy_version_keys(monkeypatch, tmp_path: Path):
         config_mod.load_config()
 
 
+def test_load_config_rejects_unknown_vector_storage(monkeypatch, tmp_path: Path):
+    _write(tmp_path / "config.yaml", "index:\n  vector_storage: \"int4\"\n")
+    monkeypatch.setattr(config_mod, "_repo_root", lambda: tmp_path)
+    monkeypatch.setenv("UNITY_DOCS_MCP_UNITY_VERSION", "6000.3")
+
+    with pytest.raises(ValueError, match="index.vector_storage"):
+        config_mod.load_config()
+
+
+def test_load_config_rejects_unknown_vector_numpy_dtype(monkeypatch, tmp_path: Path):
+    _write(tmp_path / "config.yaml", "index:\n  vector_numpy_dtype: \"float64\"\n")
+    monkeypatch.setattr(config_mod, "_repo_root", lambda: tmp_path)
+    monkeypatch.setenv("UNITY_DOCS_MCP_UNITY_VERSION", "6000.3")
+
+    with pytest.raises(ValueError, match="index.vector_numpy_dtype"):
+        config_mod.load_config()
+
+
+def test_load_config_rejects_unknown_vector_coarse(monkeypatch, tmp_path: Path):
+    _write(tmp_path / "config.yaml", "index:\n  vector_coarse: \"ivf\"\n")
+    monkeypatch.setattr(config_mod, "_repo_root", lambda: tmp_path)
+    monkeypatch.setenv("UNITY_DOCS_MCP_UNITY_VERSION", "6000.3")
+
+    with pytest.raises(ValueError, match="index.vector_coarse"):
+        config_mod.load_config()
+
+
+def test_load_config_normalizes_query_encoder(monkeypatch, tmp_path: Path):
+    _write(tmp_path / "config.yaml", "index:\n  query_encoder: \"Static\"\n")
+    monkeypatch.setattr(config_mod, "_repo_root", lambda: tmp_path)
+    monkeypatch.setenv("UNITY_DOCS_MCP_UNITY_VERSION", "6000.3")
+
+    assert config_mod.load_config().index.query_encoder == "static"
+    _write(tmp_path / "config.yaml", "index:\n  query_encoder: \"onnx\"\n")
+    with pytest.raises(ValueError, match="index.query_encoder"):
+        config_mod.load_config()
+
+
+def test_load_config_normalizes_enum_options(monkeypatch, tmp_path: Path):
+    _write(tmp_path / "config.yaml", "index:\n  vector_storage: \" SQ8 \"\n")
+    monkeypatch.setattr(config_mod, "_repo_root", lambda: tmp_path)
+    monkeypatch.setenv("UNITY_DOCS_MCP_UNITY_VERSION", "6000.3")
+
+    assert config_mod.load_config().index.vector_storage == "sq8"
+
+
 def test_load_config_env_override_applies_after_local(monkeypatch, tmp_path: Path):
     _write(tmp_path / "config.yaml", "index:\n  vector: \"faiss\"\n")
     _write(tmp_path / "config.local.yaml", "index:\n  vector: \"none\"\n")
@@ -0,0 +1,84 @@
+import time
+from pathlib import Path
+
+from unity_docs_mcp.index.deadline import Deadline
+from unity_docs_mcp.index.fts import ingest_chunks, init_db, search_fts
+
+
+class _ExpiresAfter(Deadline):
+    """Expires once ``expired()`` has been asked ``calls`` times, independent of the clock."""
+
+    def __init__(self, calls: int):
+        super().__init__(60_000)
+        self._calls = calls
+
+    def expired(self) -> bool:
+        self._calls -= 1
+        return self._calls < 0
+
+
+def _conn(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(
+        conn,
+        [
+            (f"chunk-{i}", f"manual/page-{i}", "manual", "Mesh", "Mesh", f"Documentation/en/Manual/page-{i}.html", "", "mesh vertices " * 20)
+            for i in range(2000)
+        ],
+    )
+    return conn
+
+
+def test_unbounded_deadline_never_expires():
+    deadline = Deadline(0)
+
+    assert deadline.budget_ms is None
+    assert deadline.remaining_s() is None
+    assert deadline.check("lexical")
+    assert not deadline.partial
+
+
+def test_degraded_stage_blocks_caching_without_marking_partial():
+    deadline = Deadline(0)
+    deadline.degrade("vector_load")
+    deadline.degrade("vector")
+
+    assert not deadline.partial
+    assert deadline.degraded_stage == "vector_load"
+    assert not deadline.cacheable
+
+
+def test_first_stage_to_time_out_is_recorded():
+    deadline = Deadline(1)
+    time.sleep(0.01)
+
+    assert deadline.remaining_s() == 0.0
+    assert not deadline.check("vector")
+    assert not deadline.check("substring")
+    assert deadline.partial
+    assert deadline.timed_out_stage == "vector"
+
+
+def test_search_fts_skips_the_statement_when_already_expired(tmp_path: Path):
+    conn = _conn(tmp_path)
+    deadline = Deadline(1)
+    time.sleep(0.01)
+    debug: dict = {}
+
+    assert search_fts(conn, "mesh", limit=5, debug=debug, deadline=deadline) == []
+    assert debug["statements"] == 0
+    assert deadline.timed_out_stage == "lexical"
+
+
+def test_search_fts_interrupts_a_running_statement(tmp_path: Path):
+    conn = _conn(tmp_path)
+    deadline = _ExpiresAfter(calls=2)
+    debug: dict = {}
+
+    hits = search_fts(conn, "mesh vertices", limit=5, debug=debug, deadline=deadline)
+
+    assert hits == []
+    assert debug["vm_steps"] > 0
+    assert deadline.timed_out_stage == "lexical"
+    # The progress handler is removed, so the connection keeps working.
+    assert len(search_fts(conn, "mesh vertices", limit=5)) == 5
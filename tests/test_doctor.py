@@ -89,3 +89,18 @@ def test_doctor_can_include_latest_setup_snapshot(monkeypatch, tmp_path: Path):
     assert "setup_snapshot" in report
     assert report["setup_snapshot"]["exists"] is True
     assert report["setup_snapshot"]["status"] == "failed"
+
+
+def test_doctor_numpy_backend_does_not_require_faiss(monkeypatch):
+    cfg = Config()
+    cfg.index.vector = "numpy"
+    checked = []
+
+    def _fake_import(name):
+        checked.append(name)
+        return True, "1.0", None
+
+    monkeypatch.setattr(doctor, "_import_optional", _fake_import)
+    result = doctor._check_dependencies(cfg)
+    assert result.status == "pass"
+    assert "faiss" not in checked
@@ -5,7 +5,7 @@ import pytest
 
 from unity_docs_mcp.bake.extract_manual import extract_manual
 from unity_docs_mcp.bake.extract_scriptref import extract_scriptref
-from unity_docs_mcp.bake.html_to_md import HtmlToTextOptions
+from unity_docs_mcp.bake.html_to_md import HtmlToTextOptions, index_text
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 REAL_DOCS_ROOT = Path("data/unity/6000.3/raw/UnityDocumentation/Documentation/en")
@@ -28,6 +28,42 @@ def test_scriptref_extraction_smoke():
     assert len(res["text_md"]) > 200
 
 
+def test_index_text_strips_hrefs_and_markup_but_keeps_code():
+    text_md = "\n".join(
+        [
+            "## Mesh.SetVertices",
+            "- See Rigidbody (Rigidbody.html) and jobs (../Manual/job-system.html#intro) (see below).",
+            "| Name | Description |",
+            "| --- | --- |",
+            "| `vertices` | Positions. |",
+            "![Mesh wireframe](../uploads/mesh.png)",
+            "```csharp",
+            "#if UNITY_EDITOR",
+            "var ok = a || b;",
+            "```",
+        ]
+    )
+
+    assert index_text(text_md).splitlines() == [
+        "Mesh.SetVertices",
+        "See Rigidbody and jobs (see below).",
+        "Name Description",
+        "vertices Positions.",
+        "Mesh wireframe",
+        "#if UNITY_EDITOR",
+        "var ok = a || b;",
+    ]
+
+
+def test_index_text_shrinks_fixture_pages():
+    res = extract_scriptref(FIXTURES_DIR / "scriptref_iJobParallelFor.html", HtmlToTextOptions())
+    projected = index_text(res["text_md"])
+
+    assert "IJobParallelFor" in projected
+    assert ".html" not in projected
+    assert len(projected) < len(res["text_md"])
+
+
 @pytest.mark.skipif(not ENABLE_E2E, reason="set UNITYDOCS_E2E=1 to run real-doc integration tests")
 def test_manual_extraction_real_docs():
     sample = REAL_DOCS_ROOT / "Manual/index.html"
@@ -1,9 +1,11 @@
 import json
 from pathlib import Path
 
+import numpy as np
+
 from unity_docs_mcp.config import Config, PathsConfig
 from unity_docs_mcp.index.index_cli import index
-from unity_docs_mcp.index.search import HybridSearcher
+from unity_docs_mcp.index.search import HybridSearcher, top_k_indices
 
 
 def _write_chunks(path: Path) -> None:
@@ -71,3 +73,182 @@ def test_search_fts_only_returns_lexical_results(tmp_path: Path):
 
     assert results
     assert results[0].doc_id == "manual/job-system-parallel-for-jobs"
+
+
+def test_search_debug_reports_single_fts_statement(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+    debug: dict = {}
+    results = searcher.search("how to schedule jobs with IJobParallelFor", k=3, debug=debug)
+
+    assert results
+    assert debug["lexical"]["statements"] == 1
+    assert debug["lexical"]["rows"] == 2
+    assert "IJobParallelFor" in debug["lexical"]["expression"]
+
+
+def test_search_tops_up_identifier_fragments_from_trigram_index(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))
+
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+    debug: dict = {}
+    results = searcher.search("ParallelF", k=3, debug=debug)
+
+    assert manifest["fts"]["trigram_docs"] == 2
+    assert [r.doc_id for r in results] == ["manual/job-system-parallel-for-jobs"]
+    assert debug["substring"]["added"] == 1
+
+
+def test_index_uses_index_text_projection_when_baked(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    chunk = {
+        "chunk_id": "chunk-1",
+        "doc_id": "manual/job-system-overview",
+        "source_type": "manual",
+        "title": "Job system overview",
+        "heading_path": ["Job system overview"],
+        "origin_path": "Documentation/en/Manual/job-system-overview.html",
+        "text": "Schedule jobs with JobHandle (../ScriptReference/Unity.Jobs.JobHandle.html).",
+        "index_text": "Schedule jobs with JobHandle.",
+    }
+    chunks_path = tmp_path / "baked" / "chunks.jsonl"
+    chunks_path.parent.mkdir(parents=True)
+    chunks_path.write_text(json.dumps(chunk) + "\n", encoding="utf-8")
+    index(cfg)
+
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))
+
+    assert manifest["fts"]["text_source"] == "index_text"
+    assert searcher.search("JobHandle", k=3)[0].snippet.endswith("JobHandle.html).")
+    assert searcher.search("ScriptReference", k=3) == []
+
+
+def test_top_k_indices_keeps_position_order_for_ties_and_groups():
+    scores = np.array([0.2, 0.9, 0.5, 0.9, 0.5, 0.1])
+    groups = np.array(["a", "b", "a", "b", "c", "c"], dtype=object)
+
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 2]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 2, 4, 0, 5]
+    assert top_k_indices(scores, 3, groups).tolist() == [1, 2, 4]
+    assert top_k_indices(scores, 0).tolist() == []
+
+
+def test_search_group_by_doc_returns_distinct_docs_and_materializes_only_survivors(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    chunks = [
+        {
+            "chunk_id": f"chunk-{i}",
+            "doc_id": f"manual/jobs-{i % 3}",
+            "source_type": "manual",
+            "title": f"Jobs {i % 3}",
+            "heading_path": [f"Section {i}"],
+            "origin_path": f"Documentation/en/Manual/jobs-{i % 3}.html",
+            "text": "Schedule jobs " * (i + 1),
+        }
+        for i in range(9)
+    ]
+    chunks_path = tmp_path / "baked" / "chunks.jsonl"
+    chunks_path.parent.mkdir(parents=True)
+    chunks_path.write_text("".join(json.dumps(c) + "\n" for c in chunks), encoding="utf-8")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    debug: dict = {}
+    by_chunk = searcher.search("schedule jobs", k=9)
+    by_doc = searcher.search("schedule jobs", k=3, group_by="doc", debug=debug)
+
+    assert len({r.doc_id for r in by_doc}) == 3
+    assert [r.chunk_id for r in by_doc] == [
+        next(r.chunk_id for r in by_chunk if r.doc_id == doc_id) for doc_id in [r.doc_id for r in by_doc]
+    ]
+    assert [r.score for r in by_chunk] == sorted((r.score for r in by_chunk), reverse=True)
+    assert debug["fusion"] == {"candidates": 3, "eligible": 3, "materialized": 3}
+
+
+def test_group_by_doc_lexical_leg_returns_one_chunk_per_doc(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    cfg.index.candidate_pool = 2
+    cfg.index.candidate_pool_max = 100
+    chunks = [
+        {
+            "chunk_id": f"big-{i}",
+            "doc_id": "manual/job-system",
+            "source_type": "manual",
+            "title": "Schedule jobs",
+            "heading_path": [f"Section {i}"],
+            "origin_path": "Documentation/en/Manual/job-system.html",
+            "text": f"Schedule jobs part {i}.",
+        }
+        for i in range(12)
+    ] + [
+        {
+            "chunk_id": f"other-{i}",
+            "doc_id": f"manual/other-{i}",
+            "source_type": "manual",
+            "title": f"Other {i}",
+            "heading_path": [f"Other {i}"],
+            "origin_path": f"Documentation/en/Manual/other-{i}.html",
+            "text": "You can schedule jobs from the main thread.",
+        }
+        for i in range(2)
+    ]
+    chunks_path = tmp_path / "baked" / "chunks.jsonl"
+    chunks_path.parent.mkdir(parents=True)
+    chunks_path.write_text("".join(json.dumps(c) + "\n" for c in chunks), encoding="utf-8")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    by_chunk_debug: dict = {}
+    by_doc_debug: dict = {}
+    by_chunk = searcher.search("schedule jobs", k=3, debug=by_chunk_debug)
+    by_doc = searcher.search("schedule jobs", k=3, group_by="doc", debug=by_doc_debug)
+
+    assert [r.doc_id for r in by_chunk] == ["manual/job-system"] * 3
+    assert by_chunk_debug["candidate_pool"] == {"initial": 6, "max": 100, "rounds": 1, "used": 6}
+    assert [r.doc_id for r in by_doc][0] == "manual/job-system"
+    assert {r.doc_id for r in by_doc[1:]} == {"manual/other-0", "manual/other-1"}
+    # One statement, one candidate per doc: no widening and nothing to discard.
+    assert by_doc_debug["candidate_pool"]["rounds"] == 1
+    assert by_doc_debug["lexical"]["statements"] == 1
+    assert by_doc_debug["fusion"] == {"candidates": 3, "eligible": 3, "materialized": 3}
+
+
+def test_search_adds_the_link_prior_after_min_score(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    cfg.index.pagerank_weight = 0.6
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+    plain = searcher.search("job", k=2)
+
+    searcher.set_doc_prior({plain[1].doc_id: 1.0})
+    boosted = searcher.search("job", k=2)
+    cfg.mcp.min_score = (plain[0].score + plain[1].score) / 2
+    thresholded = searcher.search("job", k=2)
+
+    assert [r.doc_id for r in boosted] == [plain[1].doc_id, plain[0].doc_id]
+    assert boosted[0].score == plain[1].score + 0.6
+    # Below min_score the boosted doc is not fused; it can only come back as a trigram top-up after it.
+    assert thresholded[0].doc_id == plain[0].doc_id
+
+
+def test_index_fts_only_precomputes_similar_docs_from_term_overlap(tmp_path: Path):
+    cfg = _fts_only_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+
+    index(cfg)
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))
+    cfg.index.similar_docs = 0
+    index(cfg)
+
+    assert manifest["similar_docs"]["source"] == "bm25"
+    assert manifest["similar_docs"]["docs"] == 2
+    assert manifest["similar_docs"]["top_n"] == 10
+    assert not (tmp_path / "index" / "similar_docs.npz").exists()
@@ -0,0 +1,99 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index.fts import (
+    FTS_PROFILES,
+    FtsProfile,
+    build_term_stats,
+    ingest_chunks,
+    init_db,
+    load_fts_profile,
+    plan_fts_query,
+    resolve_fts_profile,
+    search_fts,
+)
+from unity_docs_mcp.index.index_cli import index
+
+
+def _row(chunk_id: str, doc_id: str, source_type: str, title: str, folder: str, text: str):
+    return (chunk_id, doc_id, source_type, title, title, f"Documentation/en/{folder}/{title}.html", "", text)
+
+
+def _rows():
+    return [
+        _row("chunk-1", "scriptreference/rigidbody-addforce", "scriptref", "Rigidbody.AddForce", "ScriptReference",
+             "Adds a force to the Rigidbody."),
+        _row("chunk-2", "scriptreference/mesh-setvertices", "scriptref", "Mesh.SetVertices", "ScriptReference",
+             "Assigns new vertex positions to the mesh."),
+        _row("chunk-3", "manual/urp-introduction", "manual", "Introduction to URP", "Manual",
+             "The Universal Render Pipeline renders scenes."),
+    ]
+
+
+@pytest.mark.parametrize("name", sorted(FTS_PROFILES))
+def test_every_profile_answers_the_same_queries(tmp_path: Path, name: str):
+    profile = FTS_PROFILES[name]
+    conn = init_db(tmp_path / "fts.sqlite", profile=profile)
+    ingest_chunks(conn, _rows())
+    build_term_stats(conn, prune_df_ratio=0.25)
+    phrases = load_fts_profile(conn).detail == "full"
+
+    assert load_fts_profile(conn) == profile
+    assert search_fts(conn, "Rigidbody.AddForce", limit=3, phrases=phrases)[0][0] == "chunk-1"
+    assert search_fts(conn, "set vertices", limit=3, phrases=phrases)[0][0] == "chunk-2"
+    assert search_fts(conn, '"universal render" pipeline', limit=3, phrases=phrases)[0][0] == "chunk-3"
+    assert search_fts(conn, "Univers*", limit=3, phrases=phrases)[0][0] == "chunk-3"
+
+
+def test_plan_without_phrases_ands_multi_word_groups():
+    plan = plan_fts_query('"universal render" Mesh_Set*', phrases=False)
+
+    assert plan.expression == '(("universal" AND "render") AND ("Mesh" AND "Set"*)) OR ("universal" AND "render") OR ("Mesh" AND "Set"*)'
+
+
+def test_resolve_fts_profile_applies_and_validates_overrides():
+    assert resolve_fts_profile("compact", {"prefix": [3, 2, 2]}) == FtsProfile(
+        detail="column", prefix=(2, 3), content="external"
+    )
+    with pytest.raises(ValueError):
+        resolve_fts_profile("tiny")
+    with pytest.raises(ValueError):
+        resolve_fts_profile("full", {"detial": "none"})
+    with pytest.raises(ValueError):
+        resolve_fts_profile("lean", {"columnsize": False})
+
+
+def test_index_manifest_reports_profile_size_and_latency(tmp_path: Path):
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    cfg.index.vector = "none"
+    cfg.index.fts_profile = "lean"
+    chunks_path = tmp_path / "baked" / "chunks.jsonl"
+    chunks_path.parent.mkdir(parents=True)
+    chunks_path.write_text(
+        "".join(
+            json.dumps(dict(zip(("chunk_id", "doc_id", "source_type", "title"), r), origin_path=r[5], text=r[7]))
+            + "\n"
+            for r in _rows()
+        ),
+        encoding="utf-8",
+    )
+
+    index(cfg)
+    fts = json.loads((tmp_path / "index" / "manifest.json").read_text(encoding="utf-8"))["fts"]
+
+    assert fts["profile"] == "lean"
+    assert fts["options"]["content"] == "contentless"
+    assert fts["size_bytes"] > 0
+    assert fts["build_s"] >= 0
+    assert fts["latency_ms"]["queries"] == 3
+    assert fts["latency_ms"]["p50_ms"] <= fts["latency_ms"]["p99_ms"]
@@ -1,63 +1,143 @@
 import sqlite3
+from pathlib import Path
 
-from unity_docs_mcp.index.fts import search_fts
+import pytest
 
+from unity_docs_mcp.index import fts
+from unity_docs_mcp.index.filters import SearchFilters
+from unity_docs_mcp.index.fts import build_term_stats, ingest_chunks, init_db, plan_fts_query, search_fts
 
-class _FakeCursor:
-    def __init__(self, rows):
-        self._rows = rows
 
-    def fetchall(self):
-        return self._rows
+def _row(chunk_id: str, doc_id: str, title: str, text: str):
+    return (chunk_id, doc_id, "scriptref", title, title, f"Documentation/en/ScriptReference/{title}.html", "", text)
 
 
-class _FakeConn:
-    def __init__(self, responses):
-        self.responses = responses
-        self.seen_queries = []
+def _conn(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(
+        conn,
+        [
+            _row("chunk-1", "scriptreference/rigidbody-addforce", "Rigidbody.AddForce", "Adds a force to the Rigidbody."),
+            _row("chunk-2", "scriptreference/rigidbody", "Rigidbody", "Control of an object position through physics."),
+            _row("chunk-3", "scriptreference/list", "List", "A List of Vector3 values for the mesh."),
+            _row("chunk-4", "manual/upgrade", "Upgrade", "Use the API Updater to add force field changes."),
+        ],
+    )
+    return conn
+
+
+def test_plan_quotes_tokens_into_one_expression():
+    plan = plan_fts_query("Rigidbody.AddForce")
 
-    def execute(self, _sql, params):
-        query = params[0]
-        self.seen_queries.append(query)
-        response = self.responses.get(query, [])
-        if isinstance(response, Exception):
-            raise response
-        return _FakeCursor(response)
+    assert plan.expression == '("Rigidbody" AND "AddForce") OR "Rigidbody" OR "AddForce"'
+    assert plan.terms == ["rigidbody", "addforce"]
+    assert plan_fts_query("Rigidbody").expression == '"Rigidbody"'
 
 
-def test_search_fts_returns_raw_hits_without_fallback():
-    conn = _FakeConn(
-        {
-            "Rigidbody.AddForce": [("chunk-1", 0.1)],
-        }
+def test_plan_and_search_keep_non_ascii_terms(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(
+        conn,
+        [
+            _row("chunk-5", "manual/kamera", "Kamera", "Überblick über die Kamera."),
+            _row("chunk-6", "manual/camera-ja", "カメラ", "カメラ の 概要"),
+        ],
     )
-    result = search_fts(conn, "Rigidbody.AddForce", limit=3)
 
-    assert result == [("chunk-1", 0.1)]
-    assert conn.seen_queries == ["Rigidbody.AddForce"]
+    assert plan_fts_query("Überblick Kamera").expression == '("Überblick" AND "Kamera") OR "Überblick" OR "Kamera"'
+    assert plan_fts_query("カメラ").expression == '"カメラ"'
+    assert search_fts(conn, "Überblick", limit=3)[0][0] == "chunk-5"
+    assert search_fts(conn, "カメラ", limit=3)[0][0] == "chunk-6"
 
 
-def test_search_fts_retries_sanitized_query_after_zero_hit():
-    conn = _FakeConn(
-        {
-            "Rigidbody.AddForce": [],
-            "Rigidbody AddForce": [("chunk-2", 0.2)],
-        }
-    )
-    result = search_fts(conn, "Rigidbody.AddForce", limit=3)
+def test_plan_prunes_high_df_terms_but_never_everything():
+    plan = plan_fts_query("how to use the Rigidbody", high_df_terms={"how", "to", "use", "the"})
+    only_common = plan_fts_query("the", high_df_terms={"the"})
+
+    assert plan.expression == '("how" AND "to" AND "use" AND "the" AND "Rigidbody") OR "Rigidbody"'
+    assert plan.pruned_terms == ["how", "to", "use", "the"]
+    assert only_common.expression == '"the"'
+
+
+def test_search_fts_runs_one_statement_and_ranks_full_matches_first(tmp_path: Path):
+    conn = _conn(tmp_path)
+    debug: dict = {}
+
+    hits = search_fts(conn, "Rigidbody.AddForce", limit=5, debug=debug)
+
+    assert hits[0][0] == "chunk-1"
+    assert {cid for cid, _ in hits} == {"chunk-1", "chunk-2"}
+    assert search_fts(conn, "rigidbody add force", limit=5)[0][0] == "chunk-1"
+    assert debug["statements"] == 1
+    assert debug["rows"] == len(hits)
+    assert debug["vm_steps"] >= 0
+
+
+def test_search_fts_handles_operator_characters_and_long_queries(tmp_path: Path):
+    conn = _conn(tmp_path)
+    build_term_stats(conn, prune_df_ratio=0.0)
+
+    generic = search_fts(conn, "List<Vector3>", limit=3)
+    long_query = search_fts(conn, "how do I keep a List of Vector3 positions for my procedural mesh", limit=3)
+    syntax = search_fts(conn, 'AND OR ( "unbalanced', limit=3)
 
-    assert result == [("chunk-2", 0.2)]
-    assert conn.seen_queries == ["Rigidbody.AddForce", "Rigidbody AddForce"]
+    assert generic[0][0] == "chunk-3"
+    assert long_query[0][0] == "chunk-3"
+    assert syntax == []
 
 
-def test_search_fts_retries_next_variant_after_operational_error():
-    conn = _FakeConn(
-        {
-            "List<Vector3>": sqlite3.OperationalError("malformed MATCH expression"),
-            "List Vector3": [("chunk-3", 0.3)],
-        }
+def test_build_term_stats_records_high_df_terms(tmp_path: Path):
+    conn = _conn(tmp_path)
+
+    stats = build_term_stats(conn, prune_df_ratio=0.5, min_df=1)
+    terms = {row[0] for row in conn.execute("SELECT term FROM fts_high_df_terms")}
+
+    assert stats["rows"] == 4
+    assert "scriptreference" in terms
+    assert "mesh" not in terms
+    assert build_term_stats(conn, prune_df_ratio=0.5)["high_df_terms"] == 0
+
+
+def test_search_fts_per_doc_keeps_the_best_chunk_of_each_doc(tmp_path: Path, monkeypatch):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(
+        conn,
+        [
+            _row("chunk-1", "scriptreference/rigidbody", "Rigidbody", "Rigidbody physics."),
+            _row("chunk-2", "scriptreference/rigidbody", "Rigidbody", "Rigidbody rigidbody rigidbody mass."),
+            _row("chunk-3", "scriptreference/rigidbody", "Rigidbody", "Rigidbody drag."),
+            _row("chunk-4", "manual/physics", "Physics", "Add a Rigidbody component."),
+        ],
+    )
+    chunks = search_fts(conn, "rigidbody", limit=10)
+    debug: dict = {}
+
+    per_doc = search_fts(conn, "rigidbody", limit=10, per_doc=True, debug=debug)
+    filtered = search_fts(
+        conn, "rigidbody", limit=10, per_doc=True, filters=SearchFilters.build(exclude_doc_ids=["manual/physics"])
     )
-    result = search_fts(conn, "List<Vector3>", limit=3)
 
-    assert result == [("chunk-3", 0.3)]
-    assert conn.seen_queries == ["List<Vector3>", "List Vector3"]
+    best_rigidbody = next(cid for cid, _ in chunks if cid != "chunk-4")
+    assert [cid for cid, _ in per_doc] == [best_rigidbody, "chunk-4"]
+    assert [rank for _, rank in per_doc] == sorted(rank for _, rank in per_doc)
+    assert debug["statements"] == 1
+    assert [cid for cid, _ in filtered] == [best_rigidbody]
+
+    # Only the top limit * _PER_DOC_OVERFETCH chunks are grouped.
+    monkeypatch.setattr(fts, "_PER_DOC_OVERFETCH", 1)
+    assert search_fts(conn, "rigidbody", limit=2, per_doc=True) == per_doc[:1]
+    assert search_fts(conn, "rigidbody", limit=4, per_doc=True) == per_doc
+
+
+def test_search_fts_reports_rejected_match_and_raises_other_errors(tmp_path: Path, monkeypatch):
+    conn = _conn(tmp_path)
+    monkeypatch.setattr(fts, "plan_fts_query", lambda *args, **kwargs: fts.FtsQueryPlan(expression="AND AND"))
+    debug = {}
+
+    assert search_fts(conn, "anything", debug=debug) == []
+    assert debug["error"].startswith("fts5: syntax error")
+
+    monkeypatch.undo()
+    conn.execute("DROP TABLE chunks_fts")
+    with pytest.raises(sqlite3.OperationalError):
+        search_fts(conn, "Rigidbody")
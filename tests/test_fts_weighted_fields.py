@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from unity_docs_mcp.index.fts import ingest_chunks, init_db, search_fts
+from unity_docs_mcp.index.fts import expand_identifiers, ingest_chunks, init_db, search_fts
 
 
 def test_search_fts_matches_structured_fields_when_text_lacks_symbol(tmp_path: Path):
@@ -67,3 +67,53 @@ def test_search_fts_prioritizes_title_docid_matches_over_text_only(tmp_path: Pat
     hits = search_fts(conn, "Mesh.SetVertices", limit=5)
     assert hits
     assert hits[0][0] == "chunk-strong"
+
+
+def test_expand_identifiers_emits_whole_and_camel_parts():
+    expanded = expand_identifiers("Mesh.SetVertices", "Use IJobParallelFor with plain words.").split()
+
+    assert expanded[:4] == ["mesh", "setvertices", "set", "vertices"]
+    assert {"ijobparallelfor", "job", "parallel", "for"} <= set(expanded)
+    assert "plain" not in expanded
+
+
+def test_search_fts_matches_camel_parts_and_whole_identifier(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(
+        conn,
+        [
+            (
+                "chunk-scriptref",
+                "scriptreference/mesh-setvertices",
+                "scriptref",
+                "Mesh.SetVertices",
+                "Mesh/SetVertices",
+                "Documentation/en/ScriptReference/Mesh.SetVertices.html",
+                "",
+                "Assigns a new vertex positions array.",
+            ),
+            (
+                "chunk-other",
+                "manual/lighting",
+                "manual",
+                "Lighting",
+                "Lighting",
+                "Documentation/en/Manual/lighting.html",
+                "",
+                "Lights illuminate the scene.",
+            ),
+        ],
+    )
+
+    assert search_fts(conn, "set vertices", limit=5)[0][0] == "chunk-scriptref"
+    assert search_fts(conn, "SetVertices", limit=5)[0][0] == "chunk-scriptref"
+
+
+def test_init_db_optional_porter_stemming(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite", stemming=True)
+    ingest_chunks(
+        conn,
+        [("chunk-1", "manual/lights", "manual", "Lights", "Lights", "", "", "Baking lightmaps for scenes.")],
+    )
+
+    assert search_fts(conn, "bake scene", limit=5)[0][0] == "chunk-1"
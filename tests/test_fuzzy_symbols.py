@@ -0,0 +1,30 @@
+from unity_docs_mcp.tools.fuzzy_symbols import FuzzySymbolIndex, bounded_osa
+
+
+def test_bounded_osa_counts_transpositions_and_stops_at_the_bound():
+    assert bounded_osa("addforce", "addforce", 2) == 0
+    assert bounded_osa("addfroce", "addforce", 2) == 1
+    assert bounded_osa("kitten", "sitting", 3) == 3
+    assert bounded_osa("kitten", "sitting", 2) is None
+    assert bounded_osa("mesh", "meshrenderer", 2) is None
+
+
+def test_lookup_returns_nearest_keys_closest_first():
+    index = FuzzySymbolIndex(["rigidbody", "rigidbody2d", "rigidbodyaddforce", "nativearray", "mesh"])
+
+    assert index.lookup("rigidbdy") == [("rigidbody", 1)]
+    assert index.lookup("rigidbodyadforce") == [("rigidbodyaddforce", 1)]
+    # Ties on distance go to the key sharing more trigrams.
+    assert index.lookup("rigidbody2") == [("rigidbody2d", 1), ("rigidbody", 1)]
+    assert index.lookup("rigidbodyaddforc") == [("rigidbodyaddforce", 1)]
+    assert index.lookup("rigidbody") == []  # the exact key itself is not a fuzzy match
+    # Short keys tolerate a single edit, keys under four characters none.
+    assert index.lookup("mseh") == [("mesh", 1)]
+    assert index.lookup("nativarary") == []
+    assert index.lookup("msh") == []
+    assert index.stats()["keys"] == 5
+
+
+def test_zero_edits_or_no_keys_disable_lookups():
+    assert FuzzySymbolIndex(["rigidbody"], max_edits=0).lookup("rigidbdy") == []
+    assert FuzzySymbolIndex([]).lookup("rigidbdy") == []
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+from unity_docs_mcp.bake.link_graph import LinkGraph, corpus_digest
+
+_DOC_IDS = ["manual/hub", "manual/a", "manual/b", "manual/c", "manual/d"]
+_EDGES = [
+    ("manual/a", "manual/hub"),
+    ("manual/a", "manual/b"),
+    ("manual/a", "manual/b"),  # repeated link
+    ("manual/b", "manual/hub"),
+    ("manual/c", "manual/hub"),
+    ("manual/hub", "manual/d"),
+    ("manual/a", "manual/missing"),
+]
+
+
+def test_from_edges_builds_weighted_forward_and_reverse_csr():
+    graph = LinkGraph.from_edges(_DOC_IDS, _EDGES)
+
+    assert graph.out_indptr.tolist() == [0, 1, 3, 4, 5, 5]
+    assert graph.out_indices[1:3].tolist() == [0, 2]
+    assert graph.out_weights[1:3].tolist() == [1, 2]
+    assert graph.in_degree().tolist() == [3, 0, 1, 0, 1]
+    assert {key: graph.stats()[key] for key in ("nodes", "edges", "links", "dangling")} == {
+        "nodes": 5,
+        "edges": 5,
+        "links": 6,
+        "dangling": 1,
+    }
+    assert graph.digest == corpus_digest(_DOC_IDS)
+
+
+def test_traverse_walks_hops_in_link_order_within_max_nodes():
+    graph = LinkGraph.from_edges(_DOC_IDS, _EDGES)
+
+    nodes, hops, weights = graph.traverse([1], direction="outgoing", depth=2)
+    both, both_hops, _ = graph.traverse([2], direction="bidirectional", depth=2)
+    capped, _, _ = graph.traverse([1], direction="outgoing", depth=2, max_nodes=2)
+
+    assert nodes.tolist() == [0, 2, 4]
+    assert hops.tolist() == [1, 1, 2]
+    assert weights.tolist() == [1, 2, 1]
+    assert both.tolist() == [0, 1, 4, 3]
+    assert both_hops.tolist() == [1, 1, 2, 2]
+    assert capped.tolist() == [0, 2]
+    assert graph.traverse([3], direction="incoming")[0].tolist() == []
+
+
+def test_save_and_load_round_trip(tmp_path: Path):
+    graph = LinkGraph.from_edges(_DOC_IDS, _EDGES)
+
+    graph.save(tmp_path / "link_graph.npz")
+    loaded = LinkGraph.load(tmp_path / "link_graph.npz")
+
+    assert loaded.stats() == graph.stats()
+    assert loaded.digest == graph.digest
+    assert loaded.in_indices.tolist() == graph.in_indices.tolist()
+
+
+def test_pagerank_favours_hubs_and_survives_a_round_trip(tmp_path: Path):
+    graph = LinkGraph.from_edges(_DOC_IDS, _EDGES + [("manual/d", "manual/hub")])
+
+    graph.pagerank, iterations = graph.compute_pagerank()
+    prior = graph.pagerank_prior()
+    graph.save(tmp_path / "link_graph.npz")
+
+    assert abs(float(graph.pagerank.sum()) - 1.0) < 1e-5
+    assert int(graph.pagerank.argmax()) == 0
+    assert 1 < iterations < 100
+    assert prior[0] == 1.0 and prior.min() == 0.0
+    assert LinkGraph.load(tmp_path / "link_graph.npz").pagerank.tolist() == graph.pagerank.tolist()
+    assert LinkGraph.from_edges(_DOC_IDS, []).pagerank_prior().tolist() == [0.0] * 5
@@ -1,15 +1,22 @@
+import asyncio
 from types import SimpleNamespace
 
 import unity_docs_mcp.mcp_server as mcp_server
 from unity_docs_mcp.config import Config
 
 
+def _search(*args, **kwargs):
+    return asyncio.run(mcp_server.search(*args, **kwargs))
+
+
 class _FakeDocStore:
     def __init__(self) -> None:
         self.config = Config()
         self._available_source_types = ["manual"]
 
-    def search(self, query: str, k: int = 6, source_types=None):
+    def search(self, query: str, k: int = 6, source_types=None, path_prefix=None, doc_ids=None, exclude_doc_ids=None, debug=None, group_by="chunk", deadline=None):
+        if query == "slow":
+            deadline.expire("vector")
         return [
             SimpleNamespace(
                 chunk_id="chunk-1",
@@ -58,7 +65,7 @@ class _FakeDocStore:
             text_md="ParallelFor jobs split work into batches.",
         )
 
-    def list_files(self, pattern: str, limit: int = 20):
+    def list_files(self, pattern: str, limit: int = 20, order: str = "path"):
         return [
             SimpleNamespace(
                 doc_id="manual/job-system-parallel-for-jobs",
@@ -76,6 +83,10 @@ class _FakeDocStore:
         mode: str = "outgoing",
         exclude_doc_ids=None,
         exclude_source_types=None,
+        deadline=None,
+        depth=1,
+        max_nodes=None,
+        order="link",
     ):
         docs = [
             SimpleNamespace(
@@ -111,7 +122,19 @@ class _FakeDocStore:
     def source_type_counts(self):
         return {"docs": {"manual": 1}, "chunks": {"manual": 1}}
 
-    def resolve_symbol(self, symbol: str, limit: int = 5):
+    def vector_stats(self):
+        return {"enabled": False}
+
+    def query_encoder_stats(self):
+        return {"encoder": None}
+
+    def result_cache_stats(self):
+        return {"hits": 0, "misses": 0}
+
+    def lookup_index_stats(self):
+        return {"symbol_exact": {"keys": 1, "bytes": 64}}
+
+    def resolve_symbol(self, symbol: str, limit: int = 5, deadline=None, prefix=False):
         if symbol == "Rigidbody.AddForce":
             return [
                 {
@@ -135,7 +158,7 @@ def _install_fake_docstore(monkeypatch):
 
 def test_search_includes_meta(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("IJobParallelFor batch size", k=3)
+    result = _search("IJobParallelFor batch size", k=3)
     assert isinstance(result, list)
     assert result
     assert len(result) == 2
@@ -144,10 +167,28 @@ def test_search_includes_meta(monkeypatch):
     assert result[0]["meta"]["retrieval_mode"] == "hybrid"
 
 
+def test_search_flags_partial_results_with_the_timed_out_stage(monkeypatch):
+    fake = _install_fake_docstore(monkeypatch)
+    fake.config.mcp.deadline_ms = 250
+
+    result = _search("slow", k=3)
+    debug_result = _search("slow", k=3, debug=True, deadline_ms=100)
+
+    assert result["partial"] is True
+    assert result["timed_out_stage"] == "vector"
+    assert [r["doc_id"] for r in result["results"]] == [
+        "manual/job-system-parallel-for-jobs",
+        "manual/job-system-creating-jobs",
+    ]
+    assert debug_result["partial"] is True
+    assert debug_result["debug"]["deadline_ms"] == 100
+    assert isinstance(_search("IJobParallelFor", k=3, deadline_ms=100), list)
+
+
 def test_search_meta_reports_fts_only_when_vector_disabled(monkeypatch):
     fake = _install_fake_docstore(monkeypatch)
     fake.config.index.vector = "none"
-    result = mcp_server.search("IJobParallelFor batch size", k=3)
+    result = _search("IJobParallelFor batch size", k=3)
     assert result[0]["meta"]["retrieval_mode"] == "fts_only"
 
 
@@ -164,7 +205,7 @@ def test_open_includes_meta_even_when_missing(monkeypatch):
 
 def test_search_invalid_source_types_returns_actionable_error(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("Rigidbody.AddForce", source_types="scripting")
+    result = _search("Rigidbody.AddForce", source_types="scripting")
     assert result["error"] == "invalid_source_types"
     assert result["invalid_source_types"] == ["scripting"]
     assert "manual" in result["available_source_types"]
@@ -172,7 +213,7 @@ def test_search_invalid_source_types_returns_actionable_error(monkeypatch):
 
 def test_search_unavailable_source_types_returns_actionable_error(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("Rigidbody.AddForce", source_types="scriptref")
+    result = _search("Rigidbody.AddForce", source_types="scriptref")
     assert result["error"] == "invalid_source_types"
     assert result["invalid_source_types"] == []
     assert result["unavailable_source_types"] == ["scriptref"]
@@ -180,7 +221,7 @@ def test_search_unavailable_source_types_returns_actionable_error(monkeypatch):
 
 def test_search_debug_returns_results_and_debug_block(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("IJobParallelFor batch size", k=3, debug=True)
+    result = _search("IJobParallelFor batch size", k=3, debug=True)
     assert "results" in result
     assert "debug" in result
     assert result["debug"]["query"] == "IJobParallelFor batch size"
@@ -208,7 +249,7 @@ def test_resolve_symbol_rejects_empty_symbol(monkeypatch):
 
 def test_search_group_by_chunk_preserves_chunk_level_hits(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("IJobParallelFor batch size", k=3, group_by="chunk")
+    result = _search("IJobParallelFor batch size", k=3, group_by="chunk")
     assert isinstance(result, list)
     assert len(result) == 3
     assert result[0]["doc_id"] == "manual/job-system-parallel-for-jobs"
@@ -217,7 +258,7 @@ def test_search_group_by_chunk_preserves_chunk_level_hits(monkeypatch):
 
 def test_search_rejects_invalid_group_by(monkeypatch):
     _install_fake_docstore(monkeypatch)
-    result = mcp_server.search("IJobParallelFor batch size", k=3, group_by="weird")
+    result = _search("IJobParallelFor batch size", k=3, group_by="weird")
     assert result["error"] == "invalid_group_by"
     assert "doc" in result["allowed_group_by"]
 
@@ -249,6 +290,18 @@ def test_related_rejects_invalid_mode(monkeypatch):
     assert "outgoing" in rel["allowed_modes"]
 
 
+def test_related_similar_mode_needs_the_neighbour_table(monkeypatch):
+    fake = _install_fake_docstore(monkeypatch)
+    fake.has_similar_docs = lambda: False
+
+    rel = mcp_server.related(doc_id="manual/job-system-parallel-for-jobs", mode="similar")
+    bad_order = mcp_server.related(doc_id="manual/job-system-parallel-for-jobs", order="alphabetical")
+
+    assert rel["error"] == "similar_unavailable"
+    assert bad_order["error"] == "invalid_order"
+    assert "in_degree" in bad_order["allowed_orders"]
+
+
 def test_status_includes_meta_and_manifest_fields(monkeypatch):
     _install_fake_docstore(monkeypatch)
 
@@ -270,3 +323,34 @@ def test_status_includes_meta_and_manifest_fields(monkeypatch):
     assert status["available_source_types"] == ["manual"]
     assert status["source_type_counts"]["docs"]["manual"] == 1
     assert status["coverage_warnings"]
+
+
+def test_concurrent_first_calls_build_the_docstore_once(monkeypatch):
+    import threading
+    import time
+
+    calls = {"ensure": 0, "docstore": 0}
+
+    def _ensure(config):
+        calls["ensure"] += 1
+        time.sleep(0.02)
+
+    def _docstore(config):
+        calls["docstore"] += 1
+        time.sleep(0.02)
+        return _FakeDocStore()
+
+    monkeypatch.setattr(mcp_server, "_docstore", None)
+    monkeypatch.setattr(mcp_server, "_ensured", False)
+    monkeypatch.setattr(mcp_server, "load_config", Config)
+    monkeypatch.setattr(mcp_server, "ensure", _ensure)
+    monkeypatch.setattr(mcp_server, "DocStore", _docstore)
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(mcp_server._get_docstore())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == {"ensure": 1, "docstore": 1}
+    assert len({id(store) for store in stores}) == 1
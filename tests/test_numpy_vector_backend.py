@@ -0,0 +1,321 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index import embed
+from unity_docs_mcp.index.deadline import Deadline
+from unity_docs_mcp.index.index_cli import index
+from unity_docs_mcp.index.search import HybridSearcher
+
+_VOCAB = ["parallel", "job", "mesh", "vertices", "shader"]
+
+
+def _fake_embed_texts(texts, model_name, device="auto"):
+    rows = []
+    for text in texts:
+        lowered = text.lower()
+        row = np.array([1.0 if word in lowered else 0.0 for word in _VOCAB], dtype=np.float32) + 1e-3
+        rows.append(row / np.linalg.norm(row))
+    return np.vstack(rows)
+
+
+def _write_chunks(path: Path) -> None:
+    chunks = [
+        ("chunk-1", "manual/job-system-parallel-for-jobs", "manual", "Parallel jobs", "Use parallel job batches."),
+        ("chunk-2", "scriptreference/mesh-setvertices", "scriptref", "Mesh.SetVertices", "Assigns mesh vertices."),
+        ("chunk-3", "manual/shader-intro", "manual", "Shaders", "Shader programs run on the GPU."),
+    ]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for chunk_id, doc_id, source_type, title, text in chunks:
+            row = {
+                "chunk_id": chunk_id,
+                "doc_id": doc_id,
+                "source_type": source_type,
+                "title": title,
+                "heading_path": [title],
+                "origin_path": f"Documentation/en/{doc_id}.html",
+                "canonical_url": None,
+                "text": text,
+            }
+            f.write(json.dumps(row) + "\n")
+
+
+def _numpy_config(tmp_path: Path) -> Config:
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    cfg.index.vector = "numpy"
+    cfg.mcp.min_score = 0.0
+    return cfg
+
+
+def test_index_numpy_backend_writes_matrix_without_faiss(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+
+    manifest = json.loads((tmp_path / "index" / "manifest.json").read_text())
+    assert (tmp_path / "index" / "vectors.npy").exists()
+    assert not (tmp_path / "index" / "vectors.faiss").exists()
+    assert manifest["vector_store"]["backend"] == "numpy"
+
+
+def test_numpy_backend_search_filters_by_source_type_mask(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    batched = searcher.search_vectors(_fake_embed_texts(["mesh vertices", "shader"], "m"), k=3)
+    filtered = searcher.search_vectors(_fake_embed_texts(["mesh vertices"], "m"), k=3, source_types=["manual"])
+    results = searcher.search("mesh vertices", k=2)
+
+    assert max(batched[0], key=batched[0].get) == "chunk-2"
+    assert max(batched[1], key=batched[1].get) == "chunk-3"
+    assert "chunk-2" not in filtered[0]
+    assert results[0].doc_id == "scriptreference/mesh-setvertices"
+    assert searcher.vector_stats()["backend"] == "numpy"
+
+
+def test_numpy_backend_two_stage_mode_matches_flat_ranking(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    cfg.index.vector_coarse = "truncate"
+    cfg.index.vector_coarse_dims = 3
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    hits = searcher.search_vectors(_fake_embed_texts(["mesh vertices"], "m"), k=1)
+
+    assert list(hits[0]) == ["chunk-2"]
+    assert searcher.vector_stats()["coarse"] == "truncate"
+
+
+def test_repeated_queries_reuse_cached_embedding(monkeypatch, tmp_path: Path):
+    calls = []
+
+    def _counting_encode(texts, model_name, device="auto"):
+        calls.append(list(texts))
+        return _fake_embed_texts(texts, model_name, device)
+
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _counting_encode)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    searcher.search("Mesh vertices", k=2)
+    searcher.search("  Mesh   vertices", k=2)
+
+    assert calls == [["Mesh vertices"]]
+    assert searcher.query_encoder_stats()["cache"]["hits"] == 1
+
+
+def test_parallel_legs_match_sequential_results_and_report_timings(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    parallel = HybridSearcher(cfg, tmp_path / "index")
+    sequential_cfg = _numpy_config(tmp_path)
+    sequential_cfg.index.retrieval_workers = 0
+    sequential = HybridSearcher(sequential_cfg, tmp_path / "index")
+
+    debug: dict = {}
+    results = parallel.search("parallel job", k=3, debug=debug)
+
+    assert [(r.chunk_id, r.score) for r in results] == [
+        (r.chunk_id, r.score) for r in sequential.search("parallel job", k=3)
+    ]
+    assert debug["parallel_legs"] is True
+    assert debug["lexical"]["ms"] >= 0
+    assert debug["vector"]["rows"] == 3
+    assert debug["vector"]["ms"] >= debug["vector"]["embed_ms"]
+
+
+def test_slow_vector_leg_falls_back_to_lexical_results(monkeypatch, tmp_path: Path):
+    import threading
+
+    release = threading.Event()
+
+    def _slow_encode(texts, model_name, device="auto"):
+        release.wait(5)
+        return _fake_embed_texts(texts, model_name, device)
+
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _slow_encode)
+    cfg = _numpy_config(tmp_path)
+    cfg.index.vector_leg_timeout_ms = 50
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    debug: dict = {}
+    deadline = Deadline(0)
+    try:
+        results = searcher.search("mesh vertices", k=3, debug=debug, deadline=deadline)
+    finally:
+        release.set()
+
+    assert [r.chunk_id for r in results] == ["chunk-2"]
+    assert results[0].score == 0.4
+    assert debug["vector"]["leg_timed_out"] is True
+    assert "timed_out" not in debug["vector"]
+    # No deadline was set, so the answer is not partial, but it is not cached either.
+    assert not deadline.partial
+    assert deadline.degraded_stage == "vector"
+    assert not deadline.cacheable
+
+
+def test_abandoned_vector_legs_do_not_queue_new_ones(monkeypatch, tmp_path: Path):
+    import threading
+
+    release = threading.Event()
+
+    def _slow_encode(texts, model_name, device="auto"):
+        release.wait(5)
+        return _fake_embed_texts(texts, model_name, device)
+
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _slow_encode)
+    cfg = _numpy_config(tmp_path)
+    cfg.index.retrieval_workers = 1
+    cfg.index.vector_leg_timeout_ms = 50
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    try:
+        searcher.search("mesh vertices", k=3, deadline=Deadline(0))
+        debug: dict = {}
+        deadline = Deadline(0)
+        results = searcher.search("shader", k=3, debug=debug, deadline=deadline)
+    finally:
+        release.set()
+
+    assert debug["vector"]["skipped"] is True
+    assert debug["vector"]["abandoned_legs"] == 1
+    assert "ms" not in debug["vector"]
+    assert deadline.degraded_stage == "vector"
+    assert [r.chunk_id for r in results] == ["chunk-3"]
+
+    searcher._leg_pool.submit(lambda: None).result(5)
+    debug = {}
+    searcher.search("shader", k=3, debug=debug, deadline=Deadline(0))
+    assert "skipped" not in debug["vector"]
+    assert debug["vector"]["rows"] > 0
+
+
+def test_failed_vector_load_degrades_to_lexical_results(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+
+    for workers in (2, 0):
+        cfg.index.retrieval_workers = workers
+        searcher = HybridSearcher(cfg, tmp_path / "index")
+        searcher._vector_load_error = RuntimeError("vectors.faiss is truncated")
+
+        debug: dict = {}
+        deadline = Deadline(0)
+        results = searcher.search("mesh vertices", k=3, debug=debug, deadline=deadline)
+
+        assert [r.chunk_id for r in results] == ["chunk-2"]
+        assert debug["vector"] == {"stage": "vector_load", "error": "vectors.faiss is truncated"}
+        assert not deadline.partial
+        assert deadline.degraded_stage == "vector_load"
+
+
+def test_search_deadline_returns_lexical_results_flagged_partial(monkeypatch, tmp_path: Path):
+    import threading
+
+    release = threading.Event()
+
+    def _slow_encode(texts, model_name, device="auto"):
+        release.wait(5)
+        return _fake_embed_texts(texts, model_name, device)
+
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _slow_encode)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    deadline = Deadline(50)
+    try:
+        results = searcher.search("mesh vertices", k=3, deadline=deadline)
+    finally:
+        release.set()
+
+    assert [r.chunk_id for r in results] == ["chunk-2"]
+    assert deadline.partial
+    assert deadline.timed_out_stage == "vector"
+
+
+def test_candidate_pool_widens_when_doc_grouping_leaves_fewer_than_k(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    cfg.index.candidate_pool = 2
+    cfg.index.candidate_pool_max = 100
+    rows = [
+        {"chunk_id": f"big-{i}", "doc_id": "manual/job-system", "title": "Jobs", "text": f"parallel job part {i}"}
+        for i in range(12)
+    ] + [
+        # Close in vector space, but no lexical match for "parallel job".
+        {"chunk_id": f"other-{i}", "doc_id": f"manual/other-{i}", "title": "Other", "text": "jobs parallelism shader"}
+        for i in range(2)
+    ]
+    chunks_path = tmp_path / "baked" / "chunks.jsonl"
+    chunks_path.parent.mkdir(parents=True)
+    chunks_path.write_text(
+        "".join(json.dumps({**row, "source_type": "manual", "heading_path": [row["title"]]}) + "\n" for row in rows),
+        encoding="utf-8",
+    )
+    index(cfg)
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+
+    chunk_debug: dict = {}
+    doc_debug: dict = {}
+    by_chunk = searcher.search("parallel job", k=3, debug=chunk_debug)
+    by_doc = searcher.search("parallel job", k=3, group_by="doc", debug=doc_debug)
+
+    assert [r.doc_id for r in by_chunk] == ["manual/job-system"] * 3
+    assert chunk_debug["candidate_pool"] == {"initial": 6, "max": 100, "rounds": 1, "used": 6}
+    assert [r.doc_id for r in by_doc] == ["manual/job-system", "manual/other-0", "manual/other-1"]
+    assert doc_debug["candidate_pool"] == {"initial": 6, "max": 100, "rounds": 2, "used": 24}
+    assert doc_debug["vector"]["k"] == 24
+
+
+def test_static_query_encoder_falls_back_to_model_when_table_is_missing(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed_texts)
+    monkeypatch.setattr(embed, "encode_queries", _fake_embed_texts)
+    cfg = _numpy_config(tmp_path)
+    _write_chunks(tmp_path / "baked" / "chunks.jsonl")
+    index(cfg)
+    cfg.index.query_encoder = "static"
+
+    searcher = HybridSearcher(cfg, tmp_path / "index")
+    query_vec = searcher.embed_query("mesh vertices")
+
+    assert not (tmp_path / "index" / "static_encoder.npz").exists()
+    assert searcher.query_encoder == "model"
+    assert "re-run index" in searcher.query_encoder_stats()["fallback"]
+    assert np.allclose(query_vec, _fake_embed_texts(["mesh vertices"], "m"))
@@ -0,0 +1,108 @@
+import json
+from pathlib import Path
+
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.tools import ops
+
+
+class _FakeSearcher:
+    def __init__(self, config, base_path):
+        self.config = config
+        self.base_path = base_path
+        self.chunk_meta = {}
+
+    def search(self, query: str, k: int = 6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
+        return []
+
+
+def _doc(doc_id: str, title: str, origin_path: str) -> dict:
+    return {
+        "doc_id": doc_id,
+        "source_type": "scriptref" if "ScriptReference" in origin_path else "manual",
+        "title": title,
+        "text_md": title,
+        "origin_path": origin_path,
+        "canonical_url": None,
+    }
+
+
+def _build_store(monkeypatch, tmp_path: Path) -> ops.DocStore:
+    monkeypatch.setattr(ops, "HybridSearcher", _FakeSearcher)
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    rows = [
+        _doc("scriptreference/rigidbody", "Rigidbody", "Documentation/en/ScriptReference/Rigidbody.html"),
+        _doc("manual/rigidbodiesoverview", "Introduction to rigid body physics", "Documentation/en/Manual/RigidbodiesOverview.html"),
+        _doc("scriptreference/rigidbody.addforce", "Rigidbody.AddForce", "Documentation/en/ScriptReference/Rigidbody.AddForce.html"),
+        _doc("manual/physics-section", "Physics", "Documentation/en/Manual/PhysicsSection.html"),
+        _doc("scriptreference/rigidbody2d", "Rigidbody2D", "Documentation/en/ScriptReference/Rigidbody2D.html"),
+    ]
+    baked = tmp_path / "baked"
+    baked.mkdir(parents=True, exist_ok=True)
+    (baked / "corpus.jsonl").write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+    (baked / "link_graph.jsonl").write_text("", encoding="utf-8")
+    return ops.DocStore(cfg)
+
+
+def test_list_files_returns_matches_in_origin_path_order(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    prefix = store.list_files("Documentation/en/ScriptReference/Rigidbody*")
+    anywhere = store.list_files("*Rigidbod*")
+
+    assert [d.doc_id for d in prefix] == [
+        "scriptreference/rigidbody.addforce",
+        "scriptreference/rigidbody",
+        "scriptreference/rigidbody2d",
+    ]
+    assert [d.doc_id for d in anywhere] == [
+        "manual/rigidbodiesoverview",
+        "scriptreference/rigidbody.addforce",
+        "scriptreference/rigidbody",
+        "scriptreference/rigidbody2d",
+    ]
+    assert [d.doc_id for d in store.list_files("*Rigidbod*", limit=2)] == [d.doc_id for d in anywhere[:2]]
+
+
+def test_list_files_globs_ignore_case_and_plain_text_matches_doc_ids(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    expected = ["scriptreference/rigidbody.addforce", "scriptreference/rigidbody", "scriptreference/rigidbody2d"]
+    assert [d.doc_id for d in store.list_files("documentation/en/scriptreference/rigidbody*")] == expected
+    # Mixed case through both the sorted-prefix and the full-scan paths.
+    assert [d.doc_id for d in store.list_files("DOCUMENTATION/en/ScriptReference/rigidBODY*")] == expected
+    assert [d.doc_id for d in store.list_files("*rigidBODY2d*")] == ["scriptreference/rigidbody2d"]
+    assert [d.doc_id for d in store.list_files("*/manual/?HYSICS*")] == ["manual/physics-section"]
+    assert [d.doc_id for d in store.list_files("Documentation/en/Manual/?hysics*")] == ["manual/physics-section"]
+    assert [d.doc_id for d in store.list_files("PHYSICS-SEC")] == ["manual/physics-section"]
+    assert [d.doc_id for d in store.list_files("Documentation/en/ScriptReference/Rigidbody.html")] == [
+        "scriptreference/rigidbody"
+    ]
+
+
+def test_list_files_title_order_ranks_title_matches_first(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    by_title = store.list_files("*Rigidbod*", order="title")
+
+    exact = store.list_files("*/Rigidbody*", order="title")
+
+    # "Rigidbod" starts every Rigidbody title but only appears inside the overview's title.
+    assert [d.doc_id for d in by_title] == [
+        "scriptreference/rigidbody.addforce",
+        "scriptreference/rigidbody",
+        "scriptreference/rigidbody2d",
+        "manual/rigidbodiesoverview",
+    ]
+    assert [d.doc_id for d in exact] == [
+        "scriptreference/rigidbody",
+        "scriptreference/rigidbody.addforce",
+        "scriptreference/rigidbody2d",
+    ]
+    assert [d.doc_id for d in store.list_files("*Rigidbod*", limit=1, order="title")] == ["scriptreference/rigidbody.addforce"]
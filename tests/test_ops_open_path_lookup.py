@@ -11,7 +11,7 @@ class _FakeSearcher:
         self.base_path = base_path
         self.chunk_meta = {}
 
-    def search(self, query: str, k: int = 6, source_types=None):
+    def search(self, query: str, k: int = 6, source_types=None, filters=None, debug=None, group_by="chunk"):
         return []
 
 
@@ -1,7 +1,10 @@
 import json
 from pathlib import Path
 
+import numpy as np
+
 from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index.similar_docs import SimilarDocTable
 from unity_docs_mcp.tools import ops
 
 
@@ -11,7 +14,7 @@ class _FakeSearcher:
         self.base_path = base_path
         self.chunk_meta = {}
 
-    def search(self, query: str, k: int = 6, source_types=None):
+    def search(self, query: str, k: int = 6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
         return []
 
 
@@ -113,3 +116,123 @@ def test_related_supports_exclusion_filters(monkeypatch, tmp_path: Path):
         exclude_source_types=["manual"],
     )
     assert docs == []
+
+
+def test_related_results_are_cached_per_arguments(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    first = store.related("manual/a", limit=10, mode="outgoing")
+    store.link_graph = ops.LinkGraph.from_edges(store._doc_ids, [])
+    cached = store.related("manual/a", limit=10, mode=" Outgoing ")
+    uncached = store.related("manual/a", limit=1, mode="outgoing")
+
+    assert [d.doc_id for d in cached] == [d.doc_id for d in first]
+    assert uncached == []
+    assert store.result_cache_stats()["hits"] == 1
+
+
+def test_search_does_not_cache_partial_results(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    calls = []
+
+    def _search(query, k=6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
+        calls.append(query)
+        if len(calls) == 1:
+            deadline.expire("vector")
+        return []
+
+    store.searcher.search = _search
+
+    for _ in range(3):
+        store.search("mesh vertices", k=3)
+
+    assert len(calls) == 2
+
+
+def test_search_debug_bypasses_the_result_cache(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    calls = []
+
+    def _search(query, k=6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
+        calls.append(query)
+        if debug is not None:
+            debug["lexical"] = {"hits": 0}
+        return []
+
+    store.searcher.search = _search
+    store.search("mesh vertices", k=3)
+    debug = {}
+    store.search("mesh vertices", k=3, debug=debug)
+
+    assert len(calls) == 2
+    assert debug["result_cache"] == "bypass"
+    assert debug["lexical"] == {"hits": 0}
+    assert debug["route"] == {"kind": "natural"}
+
+
+def test_related_traverses_multiple_hops_within_max_nodes(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    two_hops = store.related("manual/c", mode="outgoing", depth=2)
+    capped = store.related("manual/c", mode="outgoing", depth=2, max_nodes=2)
+
+    assert [d.doc_id for d in two_hops] == ["manual/a", "manual/b", "manual/glossary"]
+    assert [d.doc_id for d in capped] == ["manual/a", "manual/b"]
+    assert store.related("manual/c", mode="outgoing", order="sideways") == []
+
+
+def test_related_loads_the_baked_csr_graph_when_it_matches_the_corpus(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    assert store.lookup_index_stats()["link_graph"]["source"] == "link_graph.jsonl"
+
+    edges = [
+        ("manual/b", "manual/a"),
+        ("manual/b", "manual/c"),
+        ("manual/b", "manual/c"),
+        ("manual/b", "manual/glossary"),
+        ("manual/glossary", "manual/a"),
+        ("manual/c", "manual/a"),
+        ("manual/c", "manual/glossary"),
+    ]
+    ops.LinkGraph.from_edges(store._doc_ids, edges).save(tmp_path / "baked" / "link_graph.npz")
+    baked = ops.DocStore(store.config)
+    ops.LinkGraph.from_edges(["manual/other"], edges).save(tmp_path / "baked" / "link_graph.npz")
+    stale = ops.DocStore(store.config)
+
+    assert baked.lookup_index_stats()["link_graph"]["source"] == "link_graph.npz"
+    assert [d.doc_id for d in baked.related("manual/b")] == ["manual/a", "manual/c", "manual/glossary"]
+    assert [d.doc_id for d in baked.related("manual/b", order="weight")] == ["manual/c", "manual/a", "manual/glossary"]
+    assert [d.doc_id for d in baked.related("manual/b", order="in_degree")] == ["manual/a", "manual/glossary", "manual/c"]
+    assert [d.doc_id for d in stale.related("manual/b")] == ["manual/a"]
+
+
+def test_related_orders_by_pagerank_within_a_hop(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    by_link = store.related("manual/a", mode="incoming")
+    by_pagerank = store.related("manual/a", mode="incoming", order="pagerank")
+
+    # manual/b is linked from manual/a, while nothing links to manual/c.
+    assert store.lookup_index_stats()["link_graph"]["pagerank"] is True
+    assert [d.doc_id for d in by_link] == ["manual/c", "manual/b"]
+    assert [d.doc_id for d in by_pagerank] == ["manual/b", "manual/c"]
+
+
+def test_related_similar_mode_reads_the_precomputed_table(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    assert not store.has_similar_docs()
+    assert store.related("manual/a", mode="similar") == []
+
+    SimilarDocTable(
+        ["manual/a", "manual/removed", "manual/c", "manual/b"],
+        np.array([[2, 1, 3], [0, -1, -1], [0, 3, -1], [2, 0, -1]]),
+        np.array([[0.9, 0.8, 0.5], [0.7, 0, 0], [0.9, 0.4, 0], [0.6, 0.5, 0]]),
+        source="bm25",
+    ).save(tmp_path / "index" / "similar_docs.npz")
+    store = ops.DocStore(store.config)
+
+    assert store.has_similar_docs()
+    assert [d.doc_id for d in store.related("manual/a", mode="similar")] == ["manual/c", "manual/b"]
+    assert [d.doc_id for d in store.related("manual/a", mode="similar", exclude_doc_ids=["manual/c"])] == ["manual/b"]
+    assert store.related("manual/glossary", mode="similar") == []
+    assert store.lookup_index_stats()["similar_docs"]["top_n"] == 3
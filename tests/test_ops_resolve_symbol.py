@@ -12,7 +12,7 @@ class _FakeSearcher:
         self.base_path = base_path
         self.chunk_meta = {}
 
-    def search(self, query: str, k: int = 6, source_types=None):
+    def search(self, query: str, k: int = 6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
         return []
 
 
@@ -79,7 +79,7 @@ def test_resolve_symbol_matches_exact_title_and_normalized_form(monkeypatch, tmp
 def test_resolve_symbol_falls_back_to_search(monkeypatch, tmp_path: Path):
     store = _build_store(monkeypatch, tmp_path)
 
-    def _fake_search(query: str, k: int = 6, source_types=None):
+    def _fake_search(query: str, k: int = 6, source_types=None, deadline=None, route=True):
         return [
             SimpleNamespace(doc_id="manual/rigidbodiesoverview"),
         ]
@@ -90,3 +90,34 @@ def test_resolve_symbol_falls_back_to_search(monkeypatch, tmp_path: Path):
     assert result
     assert result[0]["doc_id"] == "manual/rigidbodiesoverview"
     assert result[0]["match_kind"] == "search_fallback"
+
+
+def test_resolve_symbol_matches_typos_without_searching(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    searched = []
+
+    def _fake_search(query: str, k: int = 6, source_types=None, deadline=None, route=True):
+        searched.append(query)
+        return []
+
+    store.search = _fake_search  # type: ignore[method-assign]
+    result = store.resolve_symbol("Rigidbody.AddFroce", limit=1)
+
+    assert result[0]["doc_id"] == "scriptreference/rigidbody-addforce"
+    assert result[0]["match_kind"] == "symbol_fuzzy"
+    assert result[0]["score"] == 0.8
+    assert searched == []
+
+
+def test_resolve_symbol_prefix_completes_partial_symbols(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    completions = store.resolve_symbol("Rigidbody.Add", limit=3, prefix=True)
+    stats = store.lookup_index_stats()
+
+    assert [m["doc_id"] for m in completions] == ["scriptreference/rigidbody-addforce"]
+    assert completions[0]["match_kind"] == "symbol_prefix"
+    assert store.resolve_symbol("Rigidbody.AddForce", limit=3, prefix=True)[0]["match_kind"] == "symbol_exact"
+    assert store.resolve_symbol("Zzz", limit=3, prefix=True) == []
+    assert stats["symbol_exact"]["keys"] > 0
+    assert stats["origin_path"]["bytes"] > 0
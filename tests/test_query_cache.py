@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.index.query_cache import QueryEmbeddingCache, normalize_query
+
+
+def test_normalize_query_collapses_whitespace_but_keeps_case():
+    assert normalize_query("  Mesh.SetVertices \n") == "Mesh.SetVertices"
+    assert normalize_query("IJobParallelFor   schedule") == "IJobParallelFor schedule"
+
+
+def test_query_cache_lru_eviction_and_counters():
+    cache = QueryEmbeddingCache(max_entries=2)
+    cache.put("m", "Rigidbody", np.ones((1, 3)))
+    cache.put("m", "Mesh", np.zeros((1, 3)))
+
+    assert cache.get("m", " Rigidbody ") is not None
+    cache.put("m", "Shader", np.ones((1, 3)))
+
+    assert cache.get("m", "Mesh") is None
+    assert cache.get("m", "Rigidbody") is not None
+    assert cache.get("m", "rigidbody") is None
+    assert cache.get("other-model", "Rigidbody") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 3
+    assert stats["size"] == 2
+
+
+def test_query_cache_disk_tier_survives_restart(tmp_path: Path):
+    path = tmp_path / "query_cache.sqlite"
+    first = QueryEmbeddingCache(max_entries=4, persist_path=path)
+    first.put("m", "IJobParallelFor", np.array([[0.5, 0.25]], dtype=np.float32))
+
+    second = QueryEmbeddingCache(max_entries=4, persist_path=path)
+    vec = second.get("m", "IJobParallelFor ")
+
+    assert vec is not None
+    assert np.allclose(vec, [[0.5, 0.25]])
+    assert second.stats()["disk_hits"] == 1
+    assert second.get("m", "IJobParallelFor") is not None
+    assert second.stats()["hits"] == 1
+
+
+def test_query_cache_disabled_when_size_is_zero(tmp_path: Path):
+    cache = QueryEmbeddingCache(max_entries=0, persist_path=tmp_path / "query_cache.sqlite")
+    cache.put("m", "mesh", np.ones((1, 2)))
+
+    assert cache.get("m", "mesh") is None
+    assert not (tmp_path / "query_cache.sqlite").exists()
@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import unity_docs_mcp.mcp_server as mcp_server
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index import embed
+from unity_docs_mcp.index.index_cli import index
+from unity_docs_mcp.index.query_encoder import QueryBatcher
+from unity_docs_mcp.tools.ops import DocStore
+
+
+def _slow_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        time.sleep(0.02)
+        return np.array([[float(len(text)), 1.0] for text in texts], dtype=np.float32)
+
+    return encode
+
+
+def _write_docs(baked: Path) -> None:
+    topics = ["mesh vertices", "shader programs", "parallel jobs", "audio mixer", "light probes", "physics joints"]
+    baked.mkdir(parents=True, exist_ok=True)
+    with (baked / "chunks.jsonl").open("w", encoding="utf-8") as chunks, (baked / "corpus.jsonl").open("w", encoding="utf-8") as corpus:
+        for n, topic in enumerate(topics):
+            doc_id = f"manual/{topic.replace(' ', '-')}"
+            origin_path = f"Documentation/en/Manual/{topic.replace(' ', '-')}.html"
+            chunks.write(json.dumps({
+                "chunk_id": f"chunk-{n}",
+                "doc_id": doc_id,
+                "source_type": "manual",
+                "title": topic.title(),
+                "heading_path": [topic.title()],
+                "origin_path": origin_path,
+                "canonical_url": None,
+                "text": f"About {topic}.",
+            }) + "\n")
+            corpus.write(json.dumps({
+                "doc_id": doc_id,
+                "source_type": "manual",
+                "title": topic.title(),
+                "text_md": f"About {topic}.",
+                "origin_path": origin_path,
+                "canonical_url": None,
+            }) + "\n")
+    (baked / "link_graph.jsonl").write_text("", encoding="utf-8")
+
+
+def test_concurrent_search_tool_calls_share_encoder_batches(monkeypatch, tmp_path: Path):
+    calls = []
+    encode = _slow_encode(calls)
+    monkeypatch.setattr(embed, "embed_texts", lambda texts, model_name, device="auto": encode(texts))
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    cfg.index.vector = "numpy"
+    cfg.index.retrieval_workers = 8
+    cfg.index.query_batch_window_ms = 50.0
+    _write_docs(tmp_path / "baked")
+    index(cfg)
+    calls.clear()
+    monkeypatch.setattr(embed, "encode_queries", lambda texts, model_name, device="auto": encode(texts))
+    monkeypatch.setattr(mcp_server, "_docstore", DocStore(cfg))
+    queries = ["mesh vertices", "shader programs", "parallel jobs", "audio mixer", "light probes", "physics joints"]
+
+    async def run_all():
+        return await asyncio.gather(*(mcp_server.app.call_tool("search", {"query": q, "k": 2}) for q in queries))
+
+    responses = asyncio.run(run_all())
+
+    stats = mcp_server._docstore.query_encoder_stats()["batching"]
+    assert len(responses) == len(queries)
+    assert stats["queries"] == len(queries)
+    assert stats["largest_batch"] > 1
+    assert len(calls) < len(queries)
+
+
+def test_query_batcher_encodes_inline_when_window_is_zero():
+    calls = []
+    batcher = QueryBatcher(_slow_encode(calls), window_ms=0, max_batch=8)
+
+    vec = batcher.encode("mesh")
+
+    assert calls == [["mesh"]]
+    assert vec.shape == (1, 2)
+    assert batcher._thread is None
+
+
+def test_query_batcher_does_not_hold_a_lone_query_for_the_window():
+    calls = []
+    batcher = QueryBatcher(_slow_encode(calls), window_ms=5000.0, max_batch=8)
+
+    start = time.perf_counter()
+    vec = batcher.encode("mesh")
+
+    assert time.perf_counter() - start < 1.0
+    assert calls == [["mesh"]]
+    assert vec.shape == (1, 2)
+
+
+def test_query_batcher_propagates_encode_errors():
+    def broken(texts):
+        raise RuntimeError("model unavailable")
+
+    batcher = QueryBatcher(broken, window_ms=1.0)
+
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.encode("mesh")
@@ -0,0 +1,105 @@
+import json
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index import embed
+from unity_docs_mcp.index.index_cli import index
+from unity_docs_mcp.tools.ops import DocStore
+from unity_docs_mcp.tools.query_router import NATURAL, PATH, SYMBOL, classify_query, symbol_core
+
+_DOCS = [
+    ("scriptreference/rigidbody-addforce", "scriptref", "Rigidbody.AddForce", "ScriptReference/Rigidbody.AddForce.html", "Adds a force to the Rigidbody."),
+    ("scriptreference/rigidbody", "scriptref", "Rigidbody", "ScriptReference/Rigidbody.html", "Control of an object position through physics."),
+    ("manual/rigidbodiesoverview", "manual", "Introduction to rigid body physics", "Manual/RigidbodiesOverview.html", "Use Rigidbody.AddForce to push."),
+]
+
+
+def _fake_embed(texts, model_name, device="auto"):
+    return np.ones((len(texts), 4), dtype=np.float32) / 2.0
+
+
+def _build_store(monkeypatch, tmp_path: Path):
+    encoded = []
+
+    def _encode(texts, model_name, device="auto"):
+        encoded.extend(texts)
+        return _fake_embed(texts, model_name, device)
+
+    monkeypatch.setattr(embed, "embed_texts", _fake_embed)
+    monkeypatch.setattr(embed, "encode_queries", _encode)
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    cfg.index.vector = "numpy"
+    cfg.mcp.min_score = 0.0
+    baked = tmp_path / "baked"
+    baked.mkdir(parents=True)
+    corpus, chunks = [], []
+    for doc_id, source_type, title, path, text in _DOCS:
+        origin_path = f"Documentation/en/{path}"
+        corpus.append(
+            {"doc_id": doc_id, "source_type": source_type, "title": title, "text_md": text, "origin_path": origin_path, "canonical_url": None}
+        )
+        chunks.append(
+            {
+                "chunk_id": f"{doc_id}#0",
+                "doc_id": doc_id,
+                "source_type": source_type,
+                "title": title,
+                "heading_path": [title],
+                "origin_path": origin_path,
+                "text": text,
+            }
+        )
+    (baked / "corpus.jsonl").write_text("".join(json.dumps(r) + "\n" for r in corpus), encoding="utf-8")
+    (baked / "chunks.jsonl").write_text("".join(json.dumps(r) + "\n" for r in chunks), encoding="utf-8")
+    (baked / "link_graph.jsonl").write_text("", encoding="utf-8")
+    index(cfg)
+    return DocStore(cfg), encoded
+
+
+def test_classify_query_routes_symbols_paths_and_prose():
+    assert classify_query("Rigidbody.AddForce") == SYMBOL
+    assert classify_query("NativeArray<T>") == SYMBOL
+    assert classify_query("Rigidbody.AddForce(Vector3)") == SYMBOL
+    assert classify_query("Documentation/en/Manual/class-Rigidbody.html") == PATH
+    assert classify_query("https://docs.unity3d.com/Manual/index.html") == PATH
+    assert classify_query("mesh") == NATURAL
+    assert classify_query("how to add force") == NATURAL
+    assert classify_query("e.g.") == NATURAL
+    assert symbol_core("NativeArray<T>") == "NativeArray"
+
+
+def test_symbol_queries_skip_embedding_and_top_up_from_fts(monkeypatch, tmp_path: Path):
+    store, encoded = _build_store(monkeypatch, tmp_path)
+    debug: dict = {}
+
+    results = store.search("Rigidbody.AddForce", k=2, group_by="doc", debug=debug)
+
+    assert [r.doc_id for r in results] == ["scriptreference/rigidbody-addforce", "manual/rigidbodiesoverview"]
+    assert results[0].score > results[1].score
+    assert debug["route"] == {"kind": "symbol", "resolved": 1, "topped_up": 1}
+    assert "vector" not in debug
+    assert encoded == []
+
+
+def test_unresolved_symbols_and_prose_run_the_hybrid_search(monkeypatch, tmp_path: Path):
+    store, encoded = _build_store(monkeypatch, tmp_path)
+    symbol_debug: dict = {}
+    prose_debug: dict = {}
+
+    store.search("AddForceMode", k=2, debug=symbol_debug)
+    store.search("rigid body physics", k=2, debug=prose_debug)
+    path_hit = store.search("Documentation/en/ScriptReference/Rigidbody.html", k=1)
+
+    assert symbol_debug["route"] == {"kind": "symbol", "resolved": 0, "topped_up": 0, "fallback": "hybrid"}
+    assert prose_debug["route"] == {"kind": "natural"}
+    assert encoded == ["AddForceMode", "rigid body physics"]
+    assert path_hit[0].doc_id == "scriptreference/rigidbody"
@@ -0,0 +1,61 @@
+import sqlite3
+from pathlib import Path
+
+from unity_docs_mcp import tiered_cache
+from unity_docs_mcp.tools.result_cache import ResultCache, index_generation
+
+
+def test_result_cache_lru_and_ttl():
+    cache = ResultCache(max_entries=2, ttl_s=60, generation="g1")
+    cache.put("search", {"query": "mesh"}, [1])
+    cache.put("search", {"query": "shader"}, [2])
+    assert cache.get("search", {"query": "mesh"}) == [1]
+    cache.put("related", {"doc_id": "manual/a"}, ["manual/b"])
+
+    assert cache.get("search", {"query": "shader"}) is None
+    assert cache.get("related", {"doc_id": "manual/a"}) == ["manual/b"]
+
+    expired = ResultCache(max_entries=2, ttl_s=-1, generation="g1")
+    expired.put("search", {"query": "mesh"}, [1])
+    assert expired.get("search", {"query": "mesh"}) is None
+    assert expired.stats()["expired"] == 1
+
+
+def test_result_cache_persists_within_generation_only(tmp_path: Path):
+    path = tmp_path / "result_cache.sqlite"
+    ResultCache(max_entries=4, generation="g1", persist_path=path).put("search", {"query": "mesh"}, [{"doc_id": "a"}])
+
+    warm = ResultCache(max_entries=4, generation="g1", persist_path=path)
+    assert warm.get("search", {"query": "mesh"}) == [{"doc_id": "a"}]
+    assert warm.stats()["disk_hits"] == 1
+
+    rebuilt = ResultCache(max_entries=4, generation="g2", persist_path=path)
+    assert rebuilt.get("search", {"query": "mesh"}) is None
+
+
+def test_result_cache_disk_tier_is_pruned_to_a_row_cap(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(tiered_cache, "_DISK_FACTOR", 2)
+    monkeypatch.setattr(tiered_cache, "_PRUNE_EVERY", 4)
+    path = tmp_path / "result_cache.sqlite"
+    cache = ResultCache(max_entries=2, generation="g1", persist_path=path)
+
+    for n in range(10):
+        cache.put("search", {"query": f"q{n}"}, [n])
+
+    with sqlite3.connect(str(path)) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+    warm = ResultCache(max_entries=2, generation="g1", persist_path=path)
+    assert rows == 6  # pruned to 4 at the 8th insert, then two more
+    assert warm.get("search", {"query": "q9"}) == [9]
+    assert warm.get("search", {"query": "q4"}) == [4]
+    assert warm.get("search", {"query": "q3"}) is None
+
+
+def test_index_generation_tracks_manifest_contents(tmp_path: Path):
+    manifest = tmp_path / "manifest.json"
+    missing = index_generation(manifest)
+    manifest.write_text('{"generation": "a"}')
+    first = index_generation(manifest)
+    manifest.write_text('{"generation": "b"}')
+
+    assert missing != first != index_generation(manifest)
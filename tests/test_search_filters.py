@@ -0,0 +1,108 @@
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.index.filters import SearchFilters
+from unity_docs_mcp.index.fts import ingest_chunks, init_db, search_fts
+from unity_docs_mcp.index.search import HybridSearcher
+
+
+def _row(i: int, source_type: str, folder: str):
+    return (
+        f"chunk-{i}",
+        f"{folder.lower()}/page-{i}",
+        source_type,
+        f"Mesh page {i}",
+        f"Mesh page {i}",
+        f"Documentation/en/{folder}/page-{i}.html",
+        "",
+        "Mesh vertices and mesh buffers." if source_type == "scriptref" else "Overview page.",
+    )
+
+
+def _skewed_rows():
+    # Scriptref rows outrank every manual row, so a post-filter over the
+    # unfiltered top candidates would return no manual hits at all.
+    return [_row(i, "scriptref", "ScriptReference") for i in range(20)] + [
+        _row(100 + i, "manual", "Manual") for i in range(5)
+    ]
+
+
+def test_search_fts_pushes_filters_before_limit(tmp_path: Path):
+    conn = init_db(tmp_path / "fts.sqlite")
+    ingest_chunks(conn, _skewed_rows())
+
+    unfiltered = search_fts(conn, "mesh vertices", limit=5)
+    manual = search_fts(conn, "mesh vertices", limit=5, filters=SearchFilters.build(source_types=["manual"]))
+    by_path = search_fts(
+        conn,
+        "mesh vertices",
+        limit=5,
+        filters=SearchFilters.build(path_prefix="documentation/EN/manual/", exclude_doc_ids=["manual/page-100"]),
+    )
+
+    assert all(cid.startswith("chunk-") and int(cid.split("-")[1]) < 100 for cid, _ in unfiltered)
+    assert len(manual) == 5
+    assert {cid for cid, _ in manual} == {f"chunk-{100 + i}" for i in range(5)}
+    assert len(by_path) == 4
+    assert "chunk-100" not in {cid for cid, _ in by_path}
+
+
+def test_search_filters_escape_like_wildcards():
+    where, params = SearchFilters.build(path_prefix="Documentation/en/Manual_%").sql_where()
+
+    assert "ESCAPE" in where
+    assert params == ["Documentation/en/Manual\\_\\%%"]
+
+
+def test_search_filters_match_meta_rows():
+    filters = SearchFilters.build(source_types=["manual"], doc_ids=["manual/a", "manual/b"], exclude_doc_ids=["manual/b"])
+
+    assert filters.matches({"source_type": "manual", "doc_id": "manual/a"})
+    assert not filters.matches({"source_type": "manual", "doc_id": "manual/b"})
+    assert not filters.matches({"source_type": "scriptref", "doc_id": "manual/a"})
+    assert SearchFilters.build().is_empty()
+
+
+def _mask_searcher() -> HybridSearcher:
+    searcher = HybridSearcher.__new__(HybridSearcher)
+    searcher.vector_meta = ["a", "b", "c"]
+    searcher._vector_source_types = np.array(["manual", "manual", "scriptref"], dtype=object)
+    searcher._vector_doc_ids = np.array(["manual/a", "manual/b", "scriptreference/c"], dtype=object)
+    searcher._vector_origin_paths = np.array(
+        ["documentation/en/manual/a.html", "documentation/en/manual/b.html", "documentation/en/scriptreference/c.html"]
+    )
+    searcher._mask_cache = {}
+    searcher._mask_lock = threading.Lock()
+    return searcher
+
+
+def test_vector_mask_combines_filters():
+    searcher = _mask_searcher()
+
+    mask = searcher._vector_mask(SearchFilters.build(path_prefix="Documentation/en/Manual", exclude_doc_ids=["manual/b"]))
+
+    assert mask.tolist() == [True, False, False]
+    assert searcher._vector_mask(SearchFilters.build()) is None
+
+
+def test_vector_mask_cache_stays_bounded_under_concurrent_fills():
+    searcher = _mask_searcher()
+    errors = []
+
+    def fill(worker: int) -> None:
+        try:
+            for n in range(200):
+                searcher._vector_mask(SearchFilters.build(doc_ids=[f"manual/{worker}-{n}"]))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=fill, args=(worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(searcher._mask_cache) <= 64
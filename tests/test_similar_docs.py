@@ -0,0 +1,58 @@
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.index.similar_docs import (
+    SimilarDocTable,
+    bm25_doc_terms,
+    doc_embeddings,
+    similar_from_embeddings,
+    similar_from_terms,
+)
+
+_DOCS = [
+    ("manual/class-boxcollider", "Box Collider component collider shape physics trigger size center"),
+    ("manual/class-spherecollider", "Sphere Collider component collider shape physics trigger radius center"),
+    ("manual/class-capsulecollider", "Capsule Collider component collider shape physics trigger radius height"),
+    ("manual/audio-mixer", "Audio Mixer groups snapshots volume effects"),
+    ("manual/audio-source", "Audio Source clip volume pitch spatial"),
+    ("manual/lighting", "Lighting lightmaps baked realtime probes"),
+]
+
+
+def test_bm25_neighbours_pair_pages_that_share_rare_terms():
+    doc_ids, weights = bm25_doc_terms(_DOCS, max_df_ratio=0.6)
+
+    table = similar_from_terms(doc_ids, weights, top_n=2)
+
+    box = table.neighbors[0].tolist()
+    assert {doc_ids[i] for i in box} == {"manual/class-spherecollider", "manual/class-capsulecollider"}
+    assert table.neighbors[3].tolist() == [4, -1]
+    assert table.neighbors[5].tolist() == [-1, -1]
+    assert table.source == "bm25"
+    assert float(table.scores[0, 0]) >= float(table.scores[0, 1]) > 0
+
+
+def test_embedding_neighbours_mean_pool_chunks_and_skip_self():
+    chunk_doc_ids = ["manual/a", "manual/b", "manual/a", "manual/c"]
+    vectors = np.array([[1.0, 0.0], [0.6, 0.8], [0.8, 0.6], [0.0, 1.0]], dtype=np.float32)
+
+    doc_ids, matrix = doc_embeddings(chunk_doc_ids, vectors)
+    table = similar_from_embeddings(doc_ids, matrix, top_n=3)
+
+    assert doc_ids == ["manual/a", "manual/b", "manual/c"]
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+    assert table.neighbors[0].tolist() == [1, 2, -1]
+    assert table.neighbors[2].tolist() == [1, 0, -1]
+
+
+def test_table_round_trips_through_npz(tmp_path: Path):
+    doc_ids, weights = bm25_doc_terms(_DOCS, max_df_ratio=0.6)
+    table = similar_from_terms(doc_ids, weights, top_n=3)
+
+    table.save(tmp_path / "similar_docs.npz")
+    loaded = SimilarDocTable.load(tmp_path / "similar_docs.npz")
+
+    assert loaded.doc_ids == doc_ids
+    assert loaded.neighbors.tolist() == table.neighbors.tolist()
+    assert loaded.stats() == table.stats()
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import numpy as np
+
+from unity_docs_mcp.index.static_encoder import StaticQueryEncoder
+
+_TOKENS = ["[PAD]", "[UNK]", "mesh", "set", "##vert", "##ices", ".", "rigid", "##body"]
+
+
+def _encoder() -> StaticQueryEncoder:
+    table = np.eye(len(_TOKENS), dtype=np.float16)
+    weights = np.ones(len(_TOKENS), dtype=np.float32)
+    weights[:2] = 0.0
+    return StaticQueryEncoder(_TOKENS, table, weights, lowercase=True)
+
+
+def test_static_encoder_wordpiece_tokenizes_identifiers():
+    encoder = _encoder()
+
+    assert encoder.tokenize("Mesh.SetVertices") == [2, 6, 3, 4, 5]
+    assert encoder.tokenize("Rigidbody") == [7, 8]
+    assert encoder.tokenize("unknownword") == []
+
+
+def test_static_encoder_pools_and_normalizes_rows():
+    vecs = _encoder().encode(["Rigidbody", "zzz"])
+
+    assert vecs.shape == (2, len(_TOKENS))
+    assert np.isclose(np.linalg.norm(vecs[0]), 1.0)
+    assert vecs[0][7] > 0 and vecs[0][8] > 0
+    assert not vecs[1].any()
+
+
+def test_static_encoder_load_round_trip(tmp_path: Path):
+    path = tmp_path / "static_encoder.npz"
+    np.savez(
+        path,
+        tokens=np.asarray(_TOKENS),
+        table=np.eye(len(_TOKENS), dtype=np.float16),
+        weights=np.ones(len(_TOKENS), dtype=np.float32),
+        lowercase=np.asarray(True),
+    )
+    encoder = StaticQueryEncoder.load(path)
+
+    assert encoder.tokenize("mesh") == [2]
+    assert encoder.dim == len(_TOKENS)
@@ -0,0 +1,24 @@
+from unity_docs_mcp.tools.symbol_index import SortedKeyIndex
+
+
+def test_sorted_key_index_deduplicates_and_keeps_doc_ids_ascending():
+    index = SortedKeyIndex([("rigidbody", 3), ("rigidbody", 1), ("rigidbody", 3), ("mesh", 0), ("", 7)])
+
+    assert index.keys == ["mesh", "rigidbody"]
+    assert index.get("rigidbody") == [1, 3]
+    assert index.get("missing") == []
+    assert "mesh" in index
+    assert "" not in index
+    assert len(index) == 2
+    assert index.nbytes() > 0
+
+
+def test_prefix_scans_keys_in_order_and_stops_at_the_bound():
+    index = SortedKeyIndex(
+        [("rigidbody", 0), ("rigidbody.addforce", 1), ("rigidbody.addtorque", 2), ("rigidbody2d", 3), ("ridge", 4)]
+    )
+
+    assert [key for key, _ in index.prefix("rigidbody.add")] == ["rigidbody.addforce", "rigidbody.addtorque"]
+    assert [key for key, _ in index.prefix("rigidbody", max_keys=2)] == ["rigidbody", "rigidbody.addforce"]
+    assert list(index.prefix("zzz")) == []
+    assert list(SortedKeyIndex([]).prefix("a")) == []
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from unity_docs_mcp import tiered_cache
+from unity_docs_mcp.tiered_cache import TieredLRU
+
+
+def test_tiered_lru_evicts_least_recent_and_expires_entries():
+    cache = TieredLRU(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2, ttl_s=-1)
+    cache.put("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["expired"] == 1
+
+
+def test_tiered_lru_disk_tier_drops_other_scopes_and_prunes(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(tiered_cache, "_DISK_FACTOR", 2)
+    monkeypatch.setattr(tiered_cache, "_PRUNE_EVERY", 4)
+    path = tmp_path / "cache.sqlite"
+    first = TieredLRU(max_entries=2, persist_path=path, encode=str, decode=int, scope="g1")
+    for n in range(8):
+        first.put(f"k{n}", n)
+
+    warm = TieredLRU(max_entries=2, persist_path=path, encode=str, decode=int, scope="g1")
+    assert warm.get("k7") == 7
+    assert warm.get("k4") == 4
+    assert warm.get("k3") is None
+    assert warm.stats()["disk_hits"] == 2
+    assert TieredLRU(max_entries=2, persist_path=path, scope="g2").get("k7") is None
@@ -0,0 +1,121 @@
+import json
+import sqlite3
+from pathlib import Path
+
+from unity_docs_mcp.config import Config, PathsConfig
+from unity_docs_mcp.index.trigram import (
+    code_identifiers,
+    has_trigram,
+    ingest_trigram_docs,
+    init_trigram,
+    normalize_fragment,
+    search_trigram,
+)
+from unity_docs_mcp.tools import ops
+
+_DOCS = [
+    {
+        "doc_id": "scriptreference/mesh.setvertices",
+        "source_type": "scriptref",
+        "title": "Mesh.SetVertices",
+        "text_md": "Assigns a new vertex positions array from a NativeArray<Vector3>.",
+        "origin_path": "Documentation/en/ScriptReference/Mesh.SetVertices.html",
+        "canonical_url": "https://docs.unity3d.com/6000.3/Documentation/ScriptReference/Mesh.SetVertices.html",
+    },
+    {
+        "doc_id": "manual/urp-introduction",
+        "source_type": "manual",
+        "title": "Introduction to URP",
+        "text_md": "The Universal Render Pipeline.",
+        "origin_path": "Documentation/en/Manual/urp/urp-introduction.html",
+        "canonical_url": "https://docs.unity3d.com/6000.3/Documentation/Manual/urp/urp-introduction.html",
+    },
+]
+
+
+class _FakeSearcher:
+    def __init__(self, config, base_path):
+        self.config = config
+        self.base_path = base_path
+        self.chunk_meta = {}
+
+    def search(self, query: str, k: int = 6, source_types=None, filters=None, debug=None, group_by="chunk", deadline=None):
+        return []
+
+
+def _chunks():
+    return [
+        {
+            "doc_id": doc["doc_id"],
+            "title": doc["title"],
+            "origin_path": doc["origin_path"],
+            "heading_path": [doc["title"]],
+            "text": doc["text_md"],
+        }
+        for doc in _DOCS
+    ]
+
+
+def _trigram_conn(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path))
+    assert init_trigram(conn)
+    ingest_trigram_docs(conn, _chunks())
+    return conn
+
+
+def _build_store(monkeypatch, tmp_path: Path, with_index: bool = True) -> ops.DocStore:
+    monkeypatch.setattr(ops, "HybridSearcher", _FakeSearcher)
+    cfg = Config()
+    cfg.paths = PathsConfig(
+        root=str(tmp_path),
+        raw_zip=str(tmp_path / "raw" / "UnityDocumentation.zip"),
+        raw_unzipped=str(tmp_path / "raw" / "UnityDocumentation"),
+        baked_dir=str(tmp_path / "baked"),
+        index_dir=str(tmp_path / "index"),
+    )
+    (tmp_path / "baked").mkdir(parents=True, exist_ok=True)
+    (tmp_path / "baked" / "corpus.jsonl").write_text("".join(json.dumps(d) + "\n" for d in _DOCS), encoding="utf-8")
+    (tmp_path / "baked" / "link_graph.jsonl").write_text("", encoding="utf-8")
+    if with_index:
+        _trigram_conn(tmp_path / "index" / "fts.sqlite").close()
+    return ops.DocStore(cfg)
+
+
+def test_code_identifiers_and_fragment_normalization():
+    assert code_identifiers("Call Mesh.SetVertices with a NativeArray<Vector3> or a URPAsset.") == [
+        "Mesh.SetVertices",
+        "NativeArray",
+        "URPAsset",
+    ]
+    assert normalize_fragment(" SetVertices( ") == "SetVertices"
+    assert normalize_fragment('"List<T>"') == "List<T"
+
+
+def test_search_trigram_matches_partial_identifiers_and_paths(tmp_path: Path):
+    conn = _trigram_conn(tmp_path / "fts.sqlite")
+
+    assert has_trigram(conn)
+    assert search_trigram(conn, "Vertices(") == ["scriptreference/mesh.setvertices"]
+    assert search_trigram(conn, "nativearr") == ["scriptreference/mesh.setvertices"]
+    assert search_trigram(conn, "urp-intro", columns=("doc_id", "origin_path")) == ["manual/urp-introduction"]
+    assert search_trigram(conn, "UR") == []
+
+
+def test_list_files_uses_trigram_candidates_and_matches_the_full_scan(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+    scan = _build_store(monkeypatch, tmp_path / "scan", with_index=False)
+
+    assert store._trigram_conn is not None
+    assert scan._trigram_conn is None
+    for pattern in ("urp", "*/Manual/urp/*.html", "Documentation/en/*", "*Mesh.Set*", "??"):
+        assert [d.doc_id for d in store.list_files(pattern)] == [d.doc_id for d in scan.list_files(pattern)]
+
+
+def test_resolve_symbol_reports_substring_matches(monkeypatch, tmp_path: Path):
+    store = _build_store(monkeypatch, tmp_path)
+
+    result = store.resolve_symbol("SetVert", limit=3)
+
+    assert result[0]["doc_id"] == "scriptreference/mesh.setvertices"
+    assert result[0]["match_kind"] == "symbol_substring"
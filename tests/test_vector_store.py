@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from unity_docs_mcp.index.vector_store import (
+    build_coarse_codes,
+    build_faiss_index,
+    faiss_index_stats,
+    load_faiss,
+    load_numpy_vectors,
+    numpy_vector_stats,
+    save_faiss,
+    save_numpy_vectors,
+    search_faiss,
+    search_numpy,
+    search_two_stage,
+    storage_recall,
+)
+
+
+def _vectors(n: int = 512, dim: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    data = rng.standard_normal((n, dim)).astype("float32")
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def test_build_faiss_index_rejects_unknown_storage():
+    pytest.importorskip("faiss")
+    with pytest.raises(ValueError, match="vector_storage"):
+        build_faiss_index(_vectors(), storage="int4")
+
+
+@pytest.mark.parametrize("storage", ["fp16", "sq8", "pq"])
+def test_compressed_storage_shrinks_codes_and_keeps_recall(tmp_path: Path, storage: str):
+    pytest.importorskip("faiss")
+    vectors = _vectors()
+    flat = build_faiss_index(vectors, storage="flat")
+    compressed = build_faiss_index(vectors, storage=storage, pq_m=8)
+
+    assert faiss_index_stats(compressed, tmp_path / "missing")["storage"] == storage
+    assert faiss_index_stats(compressed, tmp_path / "missing")["code_bytes"] < faiss_index_stats(flat, tmp_path / "missing")["code_bytes"]
+    assert storage_recall(compressed, vectors, k=10) > 0.3
+
+
+def test_load_faiss_mmap_round_trip(tmp_path: Path):
+    pytest.importorskip("faiss")
+    vectors = _vectors()
+    path = tmp_path / "vectors.faiss"
+    save_faiss(build_faiss_index(vectors, storage="sq8"), path)
+
+    mapped, is_mapped = load_faiss(path, mmap=True)
+    _, indices = search_faiss(mapped, vectors[:3], k=1)
+
+    assert is_mapped
+    assert load_faiss(path, mmap=False)[1] is False
+    assert mapped.ntotal == len(vectors)
+    assert list(indices[:, 0]) == [0, 1, 2]
+
+
+def test_load_faiss_reports_when_mmap_falls_back_to_memory(monkeypatch, tmp_path: Path):
+    faiss = pytest.importorskip("faiss")
+    path = tmp_path / "vectors.faiss"
+    save_faiss(build_faiss_index(_vectors(), storage="flat"), path)
+    read_index = faiss.read_index
+
+    def _no_mmap(fname, *flags):
+        if flags:
+            raise RuntimeError("mmap not supported for this index type")
+        return read_index(fname)
+
+    monkeypatch.setattr(faiss, "read_index", _no_mmap)
+    index, mapped = load_faiss(path, mmap=True)
+
+    assert not mapped
+    assert index.ntotal == 512
+
+
+def test_search_numpy_matches_exact_top_k_in_blocks():
+    vectors = _vectors(n=300)
+    queries = vectors[:4]
+    scores, indices = search_numpy(vectors.astype("float16"), queries, k=5, block_rows=64)
+
+    exact = np.argsort(-(queries @ vectors.T), axis=1)[:, :5]
+    assert indices.shape == (4, 5)
+    assert list(indices[:, 0]) == [0, 1, 2, 3]
+    assert all(set(indices[i]) == set(exact[i]) for i in range(4))
+    assert np.all(np.diff(scores, axis=1) <= 0)
+
+
+def test_search_numpy_applies_row_mask_and_pads_missing_hits():
+    vectors = _vectors(n=10)
+    mask = np.zeros(10, dtype=bool)
+    mask[[2, 7]] = True
+    scores, indices = search_numpy(vectors, vectors[:1], k=4, mask=mask)
+
+    assert set(indices[0][:2]) == {2, 7}
+    assert list(indices[0][2:]) == [-1, -1]
+
+
+def test_numpy_vectors_round_trip_memory_mapped(tmp_path: Path):
+    path = tmp_path / "vectors.npy"
+    save_numpy_vectors(_vectors(n=20), path)
+    matrix = load_numpy_vectors(path, mmap=True)
+
+    assert isinstance(matrix, np.memmap)
+    assert matrix.dtype == np.float16
+    assert numpy_vector_stats(matrix, path)["code_bytes"] == 20 * 32 * 2
+
+
+@pytest.mark.parametrize("mode", ["binary", "truncate"])
+def test_two_stage_search_rescores_coarse_candidates_exactly(mode: str):
+    vectors = _vectors(n=400, dim=64)
+    codes = build_coarse_codes(vectors, mode, dims=32)
+    scores, indices = search_two_stage(vectors, codes, vectors[:5], k=3, mode=mode, rescore_pool=64)
+
+    assert list(indices[:, 0]) == [0, 1, 2, 3, 4]
+    exact = np.take_along_axis(vectors[:5] @ vectors.T, indices, axis=1)
+    assert np.allclose(scores, exact, atol=1e-5)
+
+
+def test_two_stage_search_respects_mask():
+    vectors = _vectors(n=50, dim=64)
+    codes = build_coarse_codes(vectors, "binary")
+    mask = np.zeros(50, dtype=bool)
+    mask[10:20] = True
+    _, indices = search_two_stage(vectors, codes, vectors[:1], k=5, mode="binary", rescore_pool=8, mask=mask)
+
+    assert all(10 <= idx < 20 for idx in indices[0])
+
+
+def test_build_coarse_codes_packs_sign_bits():
+    codes = build_coarse_codes(_vectors(n=10, dim=64), "binary")
+    assert codes.dtype == np.uint64
+    assert codes.shape == (10, 1)